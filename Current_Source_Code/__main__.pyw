@@ -1,3 +1,6 @@
+import time
+STARTED_AT = time.perf_counter()  # Before the heavy imports, so startup time includes them
+
 import tkinter as tk
 from resizer_app import ImageResizerApp
 from utils import resource_path # RESTORED
@@ -27,15 +30,6 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"[Warning] Failed to load icon: {e}")
 
-    # Load manual_contents
-    manual_contents_for_app = None
-    try:
-        manual_path_val = resource_path("manual.md")
-        with open(manual_path_val, "r", encoding="utf-8") as f:
-            manual_contents_for_app = f.read()
-    except Exception as e:
-        print(f"[Error] Failed to load manual.md for app: {e}")
-        # manual_contents_for_app remains None
-
-    app = ImageResizerApp(root, manual_contents=manual_contents_for_app) # MODIFIED to pass manual_contents
+    # manual.md is read when the Manual is first opened (show_manual), not at launch
+    app = ImageResizerApp(root, started_at=STARTED_AT)
     root.mainloop()
@@ -0,0 +1,195 @@
+"""Headless batch export, no Tk required.
+
+Usage:
+    python batch_cli.py path/to/export_manifest.jsonl [--output DIR]
+                        [--sizes 200x200,256x256] [--bg 255,0,255] [--workers N] [--force]
+    python batch_cli.py --auto-center path/to/folder [--output DIR]
+                        [--sizes ...] [--bg ...] [--detect-bg]
+                        [--center-method auto|alpha|bbox|bg_centroid]
+
+With a manifest, every source is re-rendered with the same center it was
+clicked at, using the same crop/paste code as the app. --sizes and --bg
+override what was recorded, so a new resolution list or background colour
+doesn't mean clicking through every frame again.
+
+With --auto-center, every image in the folder (recursively) is centered on
+the suggestion from image_analysis and exported unattended. The centers
+used are written to the output folder's manifest so they can be replayed
+or checked in the app. --detect-bg takes each image's background colour from
+its border instead of using one colour for the whole batch.
+
+Outputs are recorded in the output folder's export ledger. Sources whose
+content, center, background and sizes all match an existing, unmodified
+output are skipped; --force renders everything again.
+"""
+import argparse
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image
+
+from config import TARGET_SIZE, OUTPUT_FOLDER
+from export_ledger import ExportLedger, render_params
+from folder_scan import FolderIndex, iter_images
+from image_analysis import CENTER_METHODS, detect_background, suggest_center
+from manifest import ExportManifest
+from render_core import export_image, output_filename_for
+
+DEFAULT_BG_COLOR = (255, 0, 255)  # Same magenta default as the app
+
+
+def parse_sizes(text):
+    sizes = []
+    for part in text.split(","):
+        w, h = part.lower().strip().split("x")
+        sizes.append((int(w), int(h)))
+    return sizes
+
+
+def parse_color(text):
+    text = text.strip()
+    if text.startswith("#") and len(text) == 7:
+        return tuple(int(text[i:i + 2], 16) for i in (1, 3, 5))
+    r, g, b = (int(c) for c in text.split(","))
+    return (r, g, b)
+
+
+def find_images(folder):
+    """Image paths under folder, found the same way as the GUI's folder scan (sharing its index)."""
+    index = FolderIndex(folder).load()
+    paths = list(iter_images(folder, index))
+    try:
+        index.save()
+    except OSError:
+        pass  # The index is only a cache
+    return paths
+
+
+def export_entry(entry, output_folder, sizes=None, bg_color=None, center_method="auto", detect_bg=False):
+    """Worker: render one entry.
+
+    Entries without a center are auto-centered. With detect_bg the border
+    colour replaces bg_color wherever one is found. Returns (entry used,
+    written paths or None, error text).
+    """
+    source = entry["source"]
+    try:
+        with Image.open(source) as src:
+            image = src.convert("RGBA")
+        sizes = sizes or [tuple(s) for s in entry["sizes"]]
+        bg_color = bg_color or tuple(entry["bg_color"])
+        if detect_bg:
+            bg_color = detect_background(image) or bg_color
+        if entry.get("center") is None:
+            center_x, center_y, _ = suggest_center(image, bg_color, center_method)
+        else:
+            center_x, center_y = entry["center"]
+        written = export_image(image, center_x, center_y, sizes, bg_color,
+                               output_folder, output_filename_for(source))
+        used = {"source": source, "center": (center_x, center_y), "bg_color": bg_color, "sizes": sizes}
+        return used, written, None
+    except Exception:
+        return entry, None, traceback.format_exc()
+
+
+def entry_outputs(entry, output_folder, sizes=None, bg_color=None, center_method="auto", detect_bg=False):
+    """Return [(output path, ledger params)] for every file an entry will write."""
+    sizes = sizes or [tuple(s) for s in entry["sizes"]]
+    bg = "detect" if detect_bg else tuple(bg_color or entry["bg_color"])
+    center = entry["center"] if entry.get("center") is not None else center_method
+    output_filename = output_filename_for(entry["source"])
+    return [(os.path.join(output_folder, f"{w}x{h}", output_filename), render_params(center, bg, (w, h)))
+            for w, h in sizes]
+
+
+def run(entries, output_folder, sizes=None, bg_color=None, workers=None, center_method="auto",
+        detect_bg=False, manifest=None, force=False):
+    """Render entries across a process pool, recording them in manifest if given.
+
+    Entries whose outputs the ledger shows are up to date are skipped unless force.
+    """
+    ledger = ExportLedger(output_folder)
+    pending = []
+    for entry in entries:
+        outputs_for = entry_outputs(entry, output_folder, sizes, bg_color, center_method, detect_bg)
+        if not force and all(ledger.is_current(path, entry["source"], params) for path, params in outputs_for):
+            continue
+        pending.append((entry, outputs_for))
+    skipped = len(entries) - len(pending)
+    if skipped:
+        print(f"Skipping {skipped} up-to-date image(s)")
+    if not pending:
+        print("Nothing to export")
+        ledger.save()
+        return 0
+
+    print(f"Exporting {len(pending)} image(s) to {output_folder}")
+    start = time.perf_counter()
+    done = failed = outputs = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(export_entry, entry, output_folder, sizes, bg_color, center_method, detect_bg):
+                   outputs_for for entry, outputs_for in pending}
+        for future in as_completed(futures):
+            used, written, error = future.result()
+            done += 1
+            if error:
+                failed += 1
+                print(f"[Error] {used['source']}:\n{error}", file=sys.stderr)
+            else:
+                outputs += len(written)
+                if manifest is not None:
+                    manifest.record(used["source"], used["center"], used["bg_color"], used["sizes"])
+                for path, params in futures[future]:
+                    ledger.record(path, used["source"], params)
+            if done % 100 == 0 or done == len(pending):
+                elapsed = time.perf_counter() - start
+                print(f"{done}/{len(pending)} images, {done / elapsed:.1f} images/s")
+                ledger.save()
+
+    ledger.save()
+    elapsed = time.perf_counter() - start
+    print(f"Done: {done - failed} image(s), {outputs} file(s) written, {skipped} skipped, {failed} failed "
+          f"in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f} images/s)")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch export without the GUI.")
+    parser.add_argument("manifest", nargs="?", help="Path to export_manifest.jsonl to replay")
+    parser.add_argument("--auto-center", metavar="FOLDER",
+                        help="Export every image in FOLDER centered on its suggested center")
+    parser.add_argument("--center-method", choices=CENTER_METHODS, default="auto",
+                        help="How --auto-center picks the center (default: auto)")
+    parser.add_argument("--output", help="Output folder (default: the manifest's folder, or "
+                                         f"{OUTPUT_FOLDER} for --auto-center)")
+    parser.add_argument("--sizes", type=parse_sizes, help="Override target sizes, e.g. 200x200,256x256")
+    parser.add_argument("--bg", type=parse_color, help="Override background colour, e.g. 255,0,255 or #ff00ff")
+    parser.add_argument("--detect-bg", action="store_true",
+                        help="Use each image's border colour as its background")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render outputs the export ledger says are up to date")
+    args = parser.parse_args(argv)
+
+    if bool(args.manifest) == bool(args.auto_center):
+        parser.error("give either a manifest or --auto-center FOLDER")
+
+    if args.manifest:
+        entries = ExportManifest.load(args.manifest)
+        output_folder = args.output or os.path.dirname(os.path.abspath(args.manifest))
+        return run(entries, output_folder, args.sizes, args.bg, args.workers, detect_bg=args.detect_bg,
+                   force=args.force)
+
+    output_folder = args.output or os.path.abspath(OUTPUT_FOLDER)
+    sizes = args.sizes or list(TARGET_SIZE)
+    bg_color = args.bg or DEFAULT_BG_COLOR
+    entries = [{"source": os.path.abspath(path), "center": None, "sizes": sizes, "bg_color": bg_color}
+               for path in find_images(args.auto_center)]
+    return run(entries, output_folder, sizes, bg_color, args.workers, args.center_method,
+               args.detect_bg, manifest=ExportManifest(output_folder), force=args.force)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
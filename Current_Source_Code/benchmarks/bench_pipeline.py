@@ -0,0 +1,371 @@
+"""Headless benchmarks for the load/preview/export pipeline.
+
+Run from Current_Source_Code:
+    python benchmarks/bench_pipeline.py [--profile quick|full] [--output results.json]
+                                        [--baseline baseline.json] [--save-baseline baseline.json]
+                                        [--only decode,export] [--data-dir DIR]
+
+Every input is generated: RGB, RGBA and palette PNGs plus JPEGs at each
+source size in the profile, and folder trees of empty image files for the
+scan. Nothing needs a display; the cases call the same modules the app uses:
+
+  decode     Image.open + convert("RGBA") through ImageCache
+  view       display thumbnail, then a zoomed viewport render (with the pixel grid when visible)
+  preview    PreviewEngine.render (what simulate_process_image does per mouse move)
+  export     render_centered_multi for 1-8 target sizes + OutputWriter BMP saves
+  bmp_save   a single BMP encode + write
+  stats      StatsManager.add_processed_file (stats files go to a temp folder)
+  scan       folder_scan.iter_images, cold and with a warm FolderIndex
+  startup    importing resizer_app in a fresh interpreter (the launch cost before
+             any window; the app logs and stores its full startup time itself)
+
+Results are written as JSON (median/min ms per case). With --baseline, each
+median is compared with the stored one and the run exits with status 1 if
+any case is slower by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PIL
+from PIL import Image, ImageDraw
+
+import stats_manager
+from folder_scan import FolderIndex, iter_images
+from image_cache import ImageCache
+from output_writer import OutputWriter
+from preview_engine import PreviewEngine
+from render_core import render_centered_multi
+from viewport_renderer import compute_viewport, draw_pixel_grid, render_viewport
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+PROFILES = {
+    "quick": {"sizes": [64, 512, 2048], "trees": [10, 1000], "repeat": 5},
+    "full": {"sizes": [64, 512, 2048, 4096, 7680], "trees": [10, 1000, 10000, 100000], "repeat": 7},
+}
+FORMATS = ("rgb.png", "rgba.png", "p.png", "rgb.jpg")
+TARGET_SIZES = [(200, 200), (256, 256), (320, 240), (512, 512), (128, 128), (64, 64), (400, 300), (1024, 1024)]
+BG = (255, 0, 255, 255)
+DISPLAY_SIZE = (1820, 980)  # A 1920x1080 screen minus the app's margin
+
+
+def make_image(size, kind):
+    """A sprite-like frame: gradient backdrop, a soft-edged subject and some detail."""
+    width, height = (size * 16 // 9, size) if size >= 1024 else (size, size)
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0) if kind == "rgba.png" else (40, 90, 160, 255))
+    draw = ImageDraw.Draw(image)
+    for y in range(0, height, max(1, height // 64)):
+        draw.line([(0, y), (width, y)], fill=(40 + y * 120 // height, 90, 160, 255 if kind != "rgba.png" else 0))
+    draw.ellipse([width // 4, height // 4, width * 3 // 4, height * 3 // 4], fill=(230, 180, 60, 255))
+    draw.rectangle([width // 3, height // 3, width // 2, height // 2], fill=(20, 20, 20, 200))
+    if kind == "p.png":
+        return image.convert("RGB").quantize(64)
+    if kind == "rgb.jpg" or kind == "rgb.png":
+        return image.convert("RGB")
+    return image
+
+
+def generate_images(data_dir, sizes):
+    paths = {}
+    for size in sizes:
+        for kind in FORMATS:
+            path = os.path.join(data_dir, "images", f"{size}_{kind}")
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                image = make_image(size, kind)
+                if kind.endswith(".jpg"):
+                    image.save(path, quality=90)
+                else:
+                    image.save(path, compress_level=6)
+            paths[(size, kind)] = path
+    return paths
+
+
+def generate_tree(data_dir, file_count):
+    """file_count empty .png files, 100 per folder, two levels deep."""
+    root = os.path.join(data_dir, f"tree_{file_count}")
+    marker = os.path.join(root, ".complete")
+    if os.path.exists(marker):
+        return root
+    shutil.rmtree(root, ignore_errors=True)
+    for i in range(file_count):
+        folder = os.path.join(root, f"group_{i // 10000:03d}", f"take_{i // 100:04d}")
+        if i % 100 == 0:
+            os.makedirs(folder, exist_ok=True)
+        open(os.path.join(folder, f"frame_{i:06d}.png"), "wb").close()
+    open(marker, "w").close()
+    return root
+
+
+def measure(fn, repeat, setup=None):
+    """Run fn repeat times (after one warm-up) and return timings in ms."""
+    state = setup() if setup else None
+    fn(state)
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            state = setup()
+        start = time.perf_counter()
+        fn(state)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3), "runs": repeat}
+
+
+def bench_decode(images, repeat, work_dir):
+    results = {}
+    for (size, kind), path in images.items():
+        # A fresh cache per run so every run decodes
+        results[f"decode/{kind}/{size}"] = measure(lambda cache: cache.get(path), repeat, setup=ImageCache)
+    return results
+
+
+def bench_view(images, repeat, work_dir):
+    results = {}
+    for (size, kind), path in images.items():
+        if kind != "rgba.png":
+            continue
+        source = ImageCache().get(path).image
+
+        def thumbnail(_):
+            thumb = source.copy()
+            thumb.thumbnail(DISPLAY_SIZE)
+        results[f"view/thumbnail/{size}"] = measure(thumbnail, repeat)
+
+        thumb = source.copy()
+        thumb.thumbnail(DISPLAY_SIZE)
+        for zoom in (1.0, 4.0):
+            display = (max(1, int(thumb.width * zoom)), max(1, int(thumb.height * zoom)))
+            viewport = compute_viewport(display[0], display[1], -(display[0] - 1200) // 2,
+                                        -(display[1] - 800) // 2, 1200, 800)
+            results[f"view/zoom{zoom:g}x/{size}"] = measure(
+                lambda _: render_viewport(source, thumb, display, viewport), repeat)
+            cell = display[0] / source.width
+            if cell >= 2:
+                results[f"view/zoom{zoom:g}x_grid/{size}"] = measure(
+                    lambda _: draw_pixel_grid(render_viewport(source, thumb, display, viewport),
+                                              viewport, cell, cell, "#000000"), repeat)
+    return results
+
+
+def bench_preview(images, repeat, work_dir):
+    results = {}
+    for (size, kind), path in images.items():
+        if kind != "rgba.png":
+            continue
+        source = ImageCache().get(path).image
+        engine = PreviewEngine()
+        engine.render(source, BG, 0, 0, 256, 256)  # Builds the flattened buffer once, as the app does
+
+        def moves(_):
+            for i in range(50):
+                engine.render(source, BG, (i * 37) % source.width, (i * 53) % source.height, 256, 256)
+        results[f"preview/50_moves/{size}"] = measure(moves, repeat)
+    return results
+
+
+def bench_export(images, repeat, work_dir):
+    results = {}
+    out_dir = os.path.join(work_dir, "export")
+    writer = OutputWriter()
+    try:
+        for (size, kind), path in images.items():
+            if kind != "rgba.png":
+                continue
+            source = ImageCache().get(path).image
+            center = (source.width // 2, source.height // 2)
+            for count in (1, 2, 4, 8):
+                sizes = TARGET_SIZES[:count]
+
+                def export(_):
+                    rendered = render_centered_multi(source, center[0], center[1], sizes, BG)
+                    for w, h in sizes:
+                        writer.submit(rendered[(w, h)], os.path.join(out_dir, f"{w}x{h}", "frame.bmp"))
+                    writer.flush()
+                results[f"export/{count}_sizes/{size}"] = measure(export, repeat)
+    finally:
+        writer.shutdown()
+    return results
+
+
+def bench_bmp_save(images, repeat, work_dir):
+    results = {}
+    for w, h in (TARGET_SIZES[0], TARGET_SIZES[-1]):
+        image = Image.new("RGBA", (w, h), BG)
+        path = os.path.join(work_dir, f"save_{w}x{h}.bmp")
+        results[f"bmp_save/{w}x{h}"] = measure(lambda _: image.save(path), repeat)
+    return results
+
+
+def bench_stats(images, repeat, work_dir):
+    stats_dir = os.path.join(work_dir, "stats")
+    os.makedirs(stats_dir, exist_ok=True)
+
+    class BenchStatsManager(stats_manager.StatsManager):
+        def get_stats_path(self):
+            return os.path.join(stats_dir, "app_statistics.json")
+
+    manager = BenchStatsManager()
+
+    def record(_):
+        for i in range(1000):
+            manager.add_processed_file(f"take_{i % 7}/frame_{i}.bmp", [(200, 200)], BG)
+    result = {"stats/1000_files": measure(record, repeat)}
+    manager.end_session()
+    if manager.throughput is not None:
+        manager.throughput.close()
+    return result
+
+
+def bench_scan(trees, repeat, work_dir):
+    results = {}
+    for count, root in trees.items():
+        index_path = os.path.join(work_dir, f"index_{count}.json")
+
+        def cold(_):
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            index = FolderIndex(root, index_path)
+            sum(1 for _ in iter_images(root, index))
+            index.save()
+        results[f"scan/cold/{count}_files"] = measure(cold, repeat)
+
+        def warm(_):
+            index = FolderIndex(root, index_path).load()
+            sum(1 for _ in iter_images(root, index))
+        results[f"scan/warm/{count}_files"] = measure(warm, repeat)
+    return results
+
+
+# Imports the app the way __main__.pyw does; .pyw isn't a source suffix outside Windows
+STARTUP_SNIPPET = """
+import importlib.machinery, sys
+if ".pyw" not in importlib.machinery.SOURCE_SUFFIXES:
+    importlib.machinery.SOURCE_SUFFIXES.append(".pyw")
+sys.path.insert(0, {app_dir!r})
+import resizer_app
+"""
+
+
+def bench_startup(images, repeat, work_dir):
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-c", STARTUP_SNIPPET.format(app_dir=app_dir)]
+    # Includes interpreter start-up, which is constant across changes to the app
+    return {"startup/import_app": measure(lambda _: subprocess.run(command, check=True, cwd=work_dir), repeat)}
+
+
+CASES = {
+    "decode": bench_decode,
+    "view": bench_view,
+    "preview": bench_preview,
+    "export": bench_export,
+    "bmp_save": bench_bmp_save,
+    "stats": bench_stats,
+    "startup": bench_startup,
+}
+
+
+def compare(results, baseline, threshold, min_delta_ms=0.25):
+    """Print the change against baseline per case; return the names that regressed.
+
+    Cases that got slower by less than min_delta_ms are never flagged, so
+    sub-millisecond timer noise doesn't fail the run.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            print(f"  {name:40s} {result['median_ms']:10.2f} ms   (new)")
+            continue
+        change = result["median_ms"] / old["median_ms"] - 1 if old["median_ms"] else 0.0
+        flag = ""
+        if change > threshold and result["median_ms"] - old["median_ms"] > min_delta_ms:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:40s} {result['median_ms']:10.2f} ms   {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--only", help="Comma-separated case groups (default: all), e.g. decode,scan")
+    parser.add_argument("--repeat", type=int, help="Timed runs per case (default from the profile)")
+    parser.add_argument("--data-dir", help="Keep generated inputs here and reuse them between runs")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", help="Also write the results here, for later comparisons")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Slowdown that counts as a regression (default 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    repeat = args.repeat or profile["repeat"]
+    groups = args.only.split(",") if args.only else list(CASES) + ["scan"]
+    unknown = set(groups) - set(CASES) - {"scan"}
+    if unknown:
+        parser.error(f"unknown case group(s): {', '.join(sorted(unknown))}")
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="resizer_bench_data_")
+    work_dir = tempfile.mkdtemp(prefix="resizer_bench_work_")
+    try:
+        print(f"Generating inputs in {data_dir}")
+        images = generate_images(data_dir, profile["sizes"])
+        results = {}
+        for group in groups:
+            print(f"Running {group}...")
+            if group == "scan":
+                trees = {count: generate_tree(data_dir, count) for count in profile["trees"]}
+                results.update(bench_scan(trees, repeat, work_dir))
+            else:
+                results.update(CASES[group](images, repeat, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "profile": args.profile,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "numpy": numpy.__version__ if numpy else None,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline} ({baseline.get('meta', {}).get('timestamp', 'unknown date')}):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+    else:
+        for name, result in sorted(results.items()):
+            print(f"  {name:40s} {result['median_ms']:10.2f} ms  (min {result['min_ms']:.2f})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
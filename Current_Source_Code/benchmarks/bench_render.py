@@ -0,0 +1,90 @@
+"""Compare per-size rendering with the single-pass multi-resolution renderer.
+
+Run from Current_Source_Code:
+    python benchmarks/bench_render.py [--sizes 200x200,256x256,320x320,512x512] [--repeat 200]
+
+Checks that render_centered_multi is pixel-identical to the original
+per-size crop/split/paste code, then times both.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops
+
+from render_core import render_centered_multi
+
+
+def legacy_render(image, center_x, center_y, target_w, target_h, bg_color):
+    """The per-size code process_image used before render_core (kept as the reference)."""
+    r, g, b = bg_color[:3]
+    result = Image.new("RGBA", (target_w, target_h), (r, g, b, 255))
+    offset_x = target_w // 2 - center_x
+    offset_y = target_h // 2 - center_y
+    from_x = max(0, -offset_x)
+    from_y = max(0, -offset_y)
+    to_x = min(image.width, target_w - offset_x)
+    to_y = min(image.height, target_h - offset_y)
+    if from_x < to_x and from_y < to_y:
+        cropped = image.crop((from_x, from_y, to_x, to_y))
+        result.paste(cropped, (max(0, offset_x), max(0, offset_y)), mask=cropped.split()[3])
+    return result
+
+
+def make_source(width, height, seed=1):
+    """Noisy RGBA frame with partial transparency, like a sprite with soft edges."""
+    rng = random.Random(seed)
+    return Image.frombytes("RGBA", (width, height), bytes(rng.getrandbits(8) for _ in range(width * height * 4)))
+
+
+def parse_sizes(text):
+    return [tuple(int(v) for v in part.lower().split("x")) for part in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes("200x200,256x256,320x240,512x512"))
+    parser.add_argument("--source", default="640x480", help="Synthetic source size, WxH")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    src_w, src_h = parse_sizes(args.source)[0]
+    image = make_source(src_w, src_h)
+    bg = (255, 0, 255, 255)
+    centers = [(src_w // 2, src_h // 2), (0, 0), (src_w - 1, src_h - 1), (37, src_h - 20)]
+
+    # Identity check
+    for cx, cy in centers:
+        rendered = render_centered_multi(image, cx, cy, args.sizes, bg)
+        for w, h in args.sizes:
+            expected = legacy_render(image, cx, cy, w, h, bg)
+            if ImageChops.difference(expected, rendered[(w, h)]).getbbox() is not None:
+                print(f"MISMATCH at center ({cx}, {cy}) size {w}x{h}")
+                return 1
+    print(f"Pixel-identical for {len(args.sizes)} sizes at {len(centers)} centers")
+
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        cx, cy = centers[i % len(centers)]
+        for w, h in args.sizes:
+            legacy_render(image, cx, cy, w, h, bg)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        cx, cy = centers[i % len(centers)]
+        render_centered_multi(image, cx, cy, args.sizes, bg)
+    single_pass = time.perf_counter() - start
+
+    print(f"per-size:    {legacy / args.repeat * 1000:.2f} ms/click")
+    print(f"single-pass: {single_pass / args.repeat * 1000:.2f} ms/click")
+    print(f"speedup:     {legacy / single_pass:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+def arm_pixels(image, x, y, size):
+    """Source pixels covered by a cross of arm length size at (x, y), clipped to the image.
+
+    Returned center first, then outwards, as [(px, py)].
+    """
+    pixels = [(x, y)]
+    for i in range(1, size + 1):
+        pixels.extend(((x, y - i), (x, y + i), (x - i, y), (x + i, y)))
+    return [(px, py) for px, py in pixels if 0 <= px < image.width and 0 <= py < image.height]
+
+
+def negative_colors(image, x, y, size):
+    """Hex colour of the negative of every pixel in the cross, keyed by (px, py).
+
+    The horizontal and vertical arms are each read as one cropped strip
+    instead of one getpixel per pixel.
+    """
+    colors = {}
+    left, right = max(0, x - size), min(image.width, x + size + 1)
+    top, bottom = max(0, y - size), min(image.height, y + size + 1)
+    for box, along_x in (((left, y, right, y + 1), True), ((x, top, x + 1, bottom), False)):
+        if box[0] >= box[2] or box[1] >= box[3]:
+            continue
+        data = image.crop(box).convert("RGB").tobytes()
+        start = box[0] if along_x else box[1]
+        for offset, (r, g, b) in enumerate(zip(data[0::3], data[1::3], data[2::3])):
+            key = (start + offset, y) if along_x else (x, start + offset)
+            colors[key] = f"#{255 - r:02x}{255 - g:02x}{255 - b:02x}"
+    return colors
+
+
+class CrosshairPool:
+    """A fixed set of canvas rectangles reused to draw the crosshair.
+
+    draw() repositions and recolours existing items with coords/itemconfigure
+    instead of deleting and recreating them, and returns immediately when the
+    key (snapped pixel plus everything else that affects the drawing) hasn't
+    changed. Call invalidate() after clearing the canvas with delete("all").
+    """
+
+    def __init__(self, canvas, tag="crosshair"):
+        self.canvas = canvas
+        self.tag = tag
+        self.items = []
+        self.fills = []  # Current fill of each item, to skip redundant itemconfigure calls
+        self.shown = 0
+        self.last_key = None
+
+    def invalidate(self):
+        """Forget the items after a canvas.delete("all"); the next draw creates new ones."""
+        self.items, self.fills, self.shown = [], [], 0
+        self.last_key = None
+
+    def _ensure(self, count):
+        if self.items and not self.canvas.find_withtag(self.tag):
+            self.invalidate()  # Deleted by a redraw that didn't call invalidate()
+        while len(self.items) < count:
+            self.items.append(self.canvas.create_rectangle(0, 0, 0, 0, outline="", state="hidden", tags=(self.tag,)))
+            self.fills.append(None)
+
+    def draw(self, key, rects):
+        """Show rects [(x0, y0, x1, y1, fill)], unless key matches the last draw. Returns True if redrawn."""
+        if key == self.last_key:
+            return False
+        self._ensure(len(rects))
+        for index, (x0, y0, x1, y1, fill) in enumerate(rects):
+            item = self.items[index]
+            self.canvas.coords(item, x0, y0, x1, y1)
+            if fill != self.fills[index] or index >= self.shown:
+                self.canvas.itemconfigure(item, fill=fill, state="normal")
+                self.fills[index] = fill
+        for item in self.items[len(rects):self.shown]:
+            self.canvas.itemconfigure(item, state="hidden")
+        self.canvas.tag_raise(self.tag)
+        self.shown = len(rects)
+        self.last_key = key
+        return True
+
+    def hide(self):
+        for item in self.items[:self.shown]:
+            self.canvas.itemconfigure(item, state="hidden")
+        self.shown = 0
+        self.last_key = None
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+LEDGER_FILENAME = "export_ledger.json"
+LEDGER_VERSION = 1
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Content hash of a file (BLAKE2b, 128-bit hex)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_params(center, bg_color, size):
+    """The settings an output depends on, in the form stored in the ledger.
+
+    center is (x, y) or, for unattended exports, the name of the centering
+    method; bg_color is (r, g, b) or "detect".
+    """
+    center = [int(v) for v in center] if isinstance(center, (list, tuple)) else center
+    bg = [int(c) for c in bg_color[:3]] if isinstance(bg_color, (list, tuple)) else bg_color
+    return {"center": center, "bg": bg, "size": [int(size[0]), int(size[1])]}
+
+
+class ExportLedger:
+    """Record of what every file in an output tree was rendered from.
+
+    Stored as export_ledger.json in the output folder. For each output it
+    keeps the content hash of the source, the render parameters and the
+    output's mtime when it was written; an output is up to date when all three
+    still match, so re-running a folder only renders what actually changed.
+
+    Source hashes are cached against the source's size and mtime, so an
+    untouched source costs one stat; a re-imported but identical file is
+    hashed once and then recognised as unchanged.
+    """
+
+    def __init__(self, output_folder):
+        self.output_folder = output_folder
+        self.path = os.path.join(output_folder, LEDGER_FILENAME)
+        self.outputs = {}  # output path relative to output_folder -> entry
+        self.sources = {}  # absolute source path -> {"size", "mtime_ns", "hash"}
+        self.dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == LEDGER_VERSION:
+                self.outputs = data.get("outputs", {})
+                self.sources = data.get("sources", {})
+        except (OSError, ValueError):
+            self.outputs, self.sources = {}, {}
+
+    def save(self, min_interval=0):
+        """Write the ledger if anything changed, at most once per min_interval seconds."""
+        with self._lock:
+            if not self.dirty or time.monotonic() - self._saved_at < min_interval:
+                return
+            self._saved_at = time.monotonic()
+            data = json.dumps({"version": LEDGER_VERSION, "outputs": self.outputs, "sources": self.sources},
+                              separators=(",", ":"))
+            self.dirty = False
+        try:
+            os.makedirs(self.output_folder, exist_ok=True)
+            temp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError:
+            with self._lock:
+                self.dirty = True  # Try again next time
+            raise
+
+    def _key(self, output_path):
+        return os.path.relpath(os.path.abspath(output_path), os.path.abspath(self.output_folder))
+
+    def source_hash(self, source_path):
+        """Content hash of source_path, reusing the cached one while its size and mtime are unchanged."""
+        source_path = os.path.abspath(source_path)
+        st = os.stat(source_path)
+        with self._lock:
+            cached = self.sources.get(source_path)
+            if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+                return cached["hash"]
+        content_hash = hash_file(source_path)
+        with self._lock:
+            self.sources[source_path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": content_hash}
+            self.dirty = True
+        return content_hash
+
+    def cached_source_hash(self, source_path):
+        """The cached hash of source_path if it's still valid, else None. Costs one stat, never a read."""
+        source_path = os.path.abspath(source_path)
+        st = os.stat(source_path)
+        with self._lock:
+            cached = self.sources.get(source_path)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["hash"]
+        return None
+
+    def is_current(self, output_path, source_path, params):
+        """True if output_path exists unmodified and was rendered from this source content with params."""
+        with self._lock:
+            entry = self.outputs.get(self._key(output_path))
+        if not entry or entry["params"] != params:
+            return False
+        try:
+            if os.stat(output_path).st_mtime_ns != entry["mtime_ns"]:
+                return False
+            return self.source_hash(source_path) == entry["hash"]
+        except OSError:
+            return False
+
+    def needs_export(self, source_path, output_paths):
+        """True if the source is new or changed, or any of output_paths is missing or was modified.
+
+        Ignores the render parameters, which aren't known until the image is
+        clicked; used to find the next frame that needs attention.
+        """
+        try:
+            content_hash = self.source_hash(source_path)
+        except OSError:
+            return True
+        for output_path in output_paths:
+            with self._lock:
+                entry = self.outputs.get(self._key(output_path))
+            if not entry or entry["hash"] != content_hash:
+                return True
+            try:
+                if os.stat(output_path).st_mtime_ns != entry["mtime_ns"]:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def record(self, output_path, source_path, params, content_hash=None):
+        """Note that output_path has just been written from source_path with params."""
+        content_hash = content_hash or self.source_hash(source_path)
+        mtime_ns = os.stat(output_path).st_mtime_ns
+        with self._lock:
+            self.outputs[self._key(output_path)] = {
+                "source": os.path.abspath(source_path),
+                "hash": content_hash,
+                "params": params,
+                "mtime_ns": mtime_ns,
+            }
+            self.dirty = True
+
+
+def find_next_changed(ledger, source_paths, start, outputs_for, cancel_event=None):
+    """Index of the first of source_paths from start on that needs_export, or None.
+
+    outputs_for(source_path) gives the output paths to check. Hashes every
+    source it hasn't seen, so callers run it off the UI thread; it returns
+    None as soon as cancel_event is set.
+    """
+    for index in range(start, len(source_paths)):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if ledger.needs_export(source_paths[index], outputs_for(source_paths[index])):
+            return index
+    return None
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+INDEX_DIRNAME = "folder_index"
+INDEX_VERSION = 2
+LOCK_TIMEOUT = 5.0
+STALE_LOCK_AGE = 30.0
+
+
+def get_index_path(root):
+    """Index file for one scan root; each root gets its own, so scans of different folders never share a file."""
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    key = hashlib.blake2b(os.path.normcase(os.path.abspath(root)).encode("utf-8", "surrogatepass"),
+                          digest_size=10).hexdigest()
+    return os.path.join(base_dir, INDEX_DIRNAME, key + ".json")
+
+
+@contextmanager
+def _file_lock(path):
+    """Hold path + ".lock" for the duration, so the app and batch_cli don't save over each other.
+
+    A lock file older than STALE_LOCK_AGE is assumed to be left over from a crash and is taken over.
+    """
+    lock_path = path + ".lock"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(lock_path).st_mtime > STALE_LOCK_AGE:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue  # Released in the meantime
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for {lock_path}")
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+class FolderIndex:
+    """On-disk cache of the directory listings under one scan root, keyed by directory path.
+
+    Each entry stores the directory's mtime, its image file names and its
+    subdirectory names. A directory whose mtime hasn't changed since it was
+    indexed has had nothing added, removed or renamed, so its cached listing
+    is reused and only a single stat is needed instead of a scandir of every
+    entry.
+
+    save() merges into whatever is on disk under a lock, so two scans of the
+    same root (say the app and batch_cli) keep each other's entries.
+    """
+
+    def __init__(self, root, path=None):
+        self.root = os.path.normpath(root)
+        self.path = path or get_index_path(root)
+        self.dirs = {}
+        self._updated = set()  # Directories listed since load
+        self._removed = set()  # Directories found to be gone since load
+
+    @property
+    def dirty(self):
+        return bool(self._updated or self._removed)
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.root:
+            return {}
+        return data.get("dirs", {})
+
+    def load(self):
+        self.dirs = self._read()
+        self._updated.clear()
+        self._removed.clear()
+        return self
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with _file_lock(self.path):
+            dirs = self._read()
+            for directory in self._removed:
+                dirs.pop(directory, None)
+            for directory in self._updated:
+                dirs[directory] = self.dirs[directory]
+            temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"  # Unique per scan thread
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "root": self.root, "dirs": dirs}, f, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        self.dirs = dirs
+        self._updated.clear()
+        self._removed.clear()
+
+    def forget(self, directory):
+        if self.dirs.pop(directory, None) is not None:
+            self._updated.discard(directory)
+            self._removed.add(directory)
+
+    def retain(self, directories):
+        """Drop every cached directory not in directories (the ones a complete scan reached)."""
+        for directory in [d for d in self.dirs if d not in directories]:
+            self.forget(directory)
+
+    def list_dir(self, directory):
+        """Return (image file names, subdirectory names) for directory, using the cache when valid."""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            self.forget(directory)
+            raise
+        cached = self.dirs.get(directory)
+        if cached and cached["mtime_ns"] == mtime_ns:
+            return cached["files"], cached["subdirs"]
+
+        files, subdirs = [], []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                        files.append(entry.name)
+                except OSError:
+                    continue  # Vanished or unreadable entry
+        files.sort(key=str.lower)
+        subdirs.sort(key=str.lower)
+        self.dirs[directory] = {"mtime_ns": mtime_ns, "files": files, "subdirs": subdirs}
+        self._removed.discard(directory)
+        self._updated.add(directory)
+        return files, subdirs
+
+
+def iter_images(root, index=None, cancel_event=None):
+    """Yield image paths under root, top-down like os.walk, as each directory is read.
+
+    A scan that runs to completion also prunes index entries for directories
+    it no longer reaches (deleted, or moved out from under root).
+    """
+    index = index if index is not None else FolderIndex(root)
+    stack = [os.path.normpath(root)]
+    visited = set()
+    while stack:
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        directory = stack.pop()
+        try:
+            files, subdirs = index.list_dir(directory)
+        except OSError:
+            continue
+        visited.add(directory)
+        for name in files:
+            yield os.path.join(directory, name)
+        # Reversed so the first subdirectory is scanned next
+        stack.extend(os.path.join(directory, name) for name in reversed(subdirs))
+    index.retain(visited)
+
+
+class FolderScanner:
+    """Runs iter_images on a background thread and hands results to the Tk thread.
+
+    The Tk side calls poll() from root.after; it returns the paths found
+    since the last call and whether the scan has finished. Paths are sent in
+    batches so a huge tree doesn't flood the event loop.
+
+    Every start() or cancel() begins a new generation. Batches are tagged
+    with the generation of the scan that found them, and poll() drops any
+    that aren't from the current one, so a cancelled scan can't leak paths
+    into whatever replaced it.
+    """
+
+    def __init__(self, batch_size=256, batch_interval=0.05):
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = None
+        self.root = None
+        self.error = None
+        self.generation = 0
+
+    def start(self, root):
+        """Start scanning root; returns the scan's generation."""
+        self.cancel()
+        self._cancel = threading.Event()
+        self.root = root
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(root, self._queue, self._cancel, self.generation),
+                                        name="folder-scan", daemon=True)
+        self._thread.start()
+        return self.generation
+
+    def _run(self, root, out_queue, cancel_event, generation):
+        index = FolderIndex(root).load()
+        batch = []
+        last_flush = None  # None until the first path has been sent
+        try:
+            for path in iter_images(root, index, cancel_event):
+                batch.append(path)
+                # The very first path goes out straight away so it can be shown immediately
+                if last_flush is None or len(batch) >= self.batch_size or \
+                   time.monotonic() - last_flush >= self.batch_interval:
+                    out_queue.put((generation, batch))
+                    batch = []
+                    last_flush = time.monotonic()
+            if batch:
+                out_queue.put((generation, batch))
+        except Exception as e:
+            self.error = e
+        finally:
+            try:
+                index.save()
+            except OSError as e:
+                self.error = self.error or e
+            out_queue.put((generation, None))  # Done
+
+    def poll(self):
+        """Return (new paths, finished) for the current generation."""
+        paths = []
+        finished = False
+        while True:
+            try:
+                generation, batch = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.generation:
+                continue  # Left over from a cancelled scan
+            if batch is None:
+                finished = True
+                break
+            paths.extend(batch)
+        return paths, finished
+
+    def cancel(self):
+        """Stop the current scan and discard anything it already queued."""
+        self._cancel.set()
+        self.generation += 1
+        self._queue = queue.Queue()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
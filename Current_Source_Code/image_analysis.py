@@ -0,0 +1,294 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageChops
+
+_numpy = None  # Module once imported, False if it isn't installed
+
+
+def _np():
+    """NumPy, imported on first use since it dominates the app's import time; None without it.
+
+    NumPy is listed in requirements.txt but still optional; without it the
+    PIL fallbacks below are used, which give centroid suggestions as the
+    bounding box middle instead.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+            logging.getLogger("ImageResizer").info(
+                "NumPy isn't installed; using the PIL fallbacks for background detection and center suggestions")
+    return _numpy or None
+
+ALPHA_THRESHOLD = 8  # Alpha at or below this counts as transparent
+BG_TOLERANCE = 24  # Max per-channel difference still treated as background
+CENTER_METHODS = ("auto", "alpha", "bbox", "bg_centroid")
+
+
+def _has_transparency(image):
+    if image.mode != "RGBA":
+        return False
+    low, _ = image.getchannel("A").getextrema()
+    return low <= ALPHA_THRESHOLD
+
+
+def _subject_mask(image, bg_color, use_alpha):
+    """Boolean array (NumPy) of pixels that belong to the subject."""
+    np = _np()
+    arr = np.asarray(image.convert("RGBA"))
+    if use_alpha:
+        return arr[:, :, 3] > ALPHA_THRESHOLD
+    bg = np.array(bg_color[:3], dtype=np.int16)
+    diff = np.abs(arr[:, :, :3].astype(np.int16) - bg).max(axis=2)
+    return diff > BG_TOLERANCE
+
+
+def _subject_bbox_pil(image, bg_color, use_alpha):
+    """PIL-only bounding box (x0, y0, x1, y1) of the subject, or None."""
+    if use_alpha:
+        return image.getchannel("A").point(lambda a: 255 if a > ALPHA_THRESHOLD else 0).getbbox()
+    rgb = image.convert("RGB")
+    diff = ImageChops.difference(rgb, Image.new("RGB", rgb.size, tuple(bg_color[:3])))
+    # Max over channels, then threshold
+    r, g, b = diff.split()
+    return ImageChops.lighter(ImageChops.lighter(r, g), b).point(
+        lambda v: 255 if v > BG_TOLERANCE else 0).getbbox()
+
+
+def suggest_center(image, bg_color=None, method="auto"):
+    """Suggest the pixel to center on, as (x, y, method_used).
+
+    method is one of CENTER_METHODS:
+      "alpha"       - alpha-weighted centroid (needs transparency)
+      "bbox"        - middle of the subject's bounding box
+      "bg_centroid" - centroid of pixels that differ from bg_color
+      "auto"        - alpha centroid for transparent images, otherwise the
+                      bg_color centroid, falling back to the bbox/geometric center
+    The subject is the non-transparent pixels if the image has transparency,
+    otherwise the pixels that differ from bg_color. Without NumPy the
+    centroids fall back to the bounding box middle. If no subject is found the
+    geometric center is returned with method "geometric".
+    """
+    use_alpha = _has_transparency(image)
+    if not use_alpha and bg_color is None:
+        return image.width // 2, image.height // 2, "geometric"
+    if method == "auto":
+        method = "alpha" if use_alpha else "bg_centroid"
+    if method == "alpha" and not use_alpha:
+        method = "bg_centroid" if bg_color is not None else "bbox"
+
+    np = _np()
+    if np is None or method == "bbox":
+        bbox = _subject_bbox_pil(image, bg_color, use_alpha)
+        if not bbox:
+            return image.width // 2, image.height // 2, "geometric"
+        return (bbox[0] + bbox[2] - 1) // 2, (bbox[1] + bbox[3] - 1) // 2, "bbox"
+
+    if method == "alpha":
+        weights = np.asarray(image.getchannel("A"), dtype=np.float64)
+        weights[weights <= ALPHA_THRESHOLD] = 0
+    else:
+        weights = _subject_mask(image, bg_color, use_alpha).astype(np.float64)
+
+    total = weights.sum()
+    if total == 0:
+        return image.width // 2, image.height // 2, "geometric"
+    # Centroid from row/column sums: two reductions instead of a per-pixel loop
+    cols = weights.sum(axis=0)
+    rows = weights.sum(axis=1)
+    center_x = int(round(float(cols @ np.arange(cols.size)) / total))
+    center_y = int(round(float(rows @ np.arange(rows.size)) / total))
+    return center_x, center_y, method
+
+
+def _border_strips(image, region, ring):
+    """Crop boxes covering the border ring, or just the four corner squares."""
+    w, h = image.size
+    if region == "corners":
+        k = max(ring, min(w, h) // 10)
+        return [(0, 0, k, k), (w - k, 0, w, k), (0, h - k, k, h), (w - k, h - k, w, h)]
+    return [(0, 0, w, ring), (0, h - ring, w, h), (0, ring, ring, h - ring), (w - ring, ring, w, h - ring)]
+
+
+def detect_background(image, region="border", ring=2):
+    """Return the dominant (r, g, b) of the image's border ring or corners, or None.
+
+    Colours are binned at 5 bits per channel so JPEG noise and anti-aliased
+    edges still vote for the same background; the colour returned is the
+    most common exact colour in the winning bin, so it's always a colour the
+    image actually has. Ties go to the lowest bin and colour, so the NumPy
+    and PIL paths return the same colour; the PIL one is just slower. Returns
+    None when the border is mostly transparent, since transparency is
+    replaced by the chosen colour anyway.
+    """
+    image = image.convert("RGBA")
+    if image.width <= 2 * ring or image.height <= 2 * ring:
+        region, ring = "border", 1
+    boxes = [box for box in _border_strips(image, region, ring) if box[0] < box[2] and box[1] < box[3]]
+    if not boxes:
+        return None
+
+    np = _np()
+    if np is not None:
+        arr = np.asarray(image)
+        pixels = np.concatenate([arr[y0:y1, x0:x1].reshape(-1, 4) for x0, y0, x1, y1 in boxes])
+        opaque = pixels[pixels[:, 3] > ALPHA_THRESHOLD]
+        if opaque.shape[0] * 2 < pixels.shape[0]:
+            return None
+        rgb = opaque[:, :3].astype(np.int32)
+        bins = ((rgb[:, 0] >> 3) << 10) | ((rgb[:, 1] >> 3) << 5) | (rgb[:, 2] >> 3)
+        counts = np.bincount(bins, minlength=1 << 15)
+        winner = rgb[bins == counts.argmax()]
+        colors, color_counts = np.unique(winner, axis=0, return_counts=True)
+        return tuple(int(v) for v in colors[color_counts.argmax()])
+
+    # PIL fallback: stitch the strips into one row and count the binned colours
+    strips = [image.crop(box) for box in boxes]
+    total = sum(strip.width * strip.height for strip in strips)
+    row = Image.new("RGBA", (total, 1))
+    x = 0
+    for strip in strips:
+        flat = Image.frombytes("RGBA", (strip.width * strip.height, 1), strip.tobytes())
+        row.paste(flat, (x, 0))
+        x += flat.width
+    alpha_counts = row.getchannel("A").point(lambda a: 255 if a > ALPHA_THRESHOLD else 0).histogram()
+    if alpha_counts[255] * 2 < total:
+        return None
+    # Pick the fullest bin, then its most common exact colour
+    bin_counts = {}
+    exact = row.convert("RGB").getcolors(maxcolors=total)
+    for count, color in exact:
+        key = tuple(c >> 3 for c in color)
+        bin_counts[key] = bin_counts.get(key, 0) + count
+    winner = min(bin_counts, key=lambda key: (-bin_counts[key], key))
+    _, color = min((-count, color) for count, color in exact if tuple(c >> 3 for c in color) == winner)
+    return color
+
+
+def analyse_file(path, bg_color=None, method="auto", detect_bg=False):
+    """Decode path and return its analysis result dict."""
+    with Image.open(path) as src:
+        image = src.convert("RGBA")
+    return analyse_image(image, bg_color, method, detect_bg)
+
+
+def analyse_image(image, bg_color=None, method="auto", detect_bg=False):
+    """Suggested center (and detected background if detect_bg) for a decoded image.
+
+    With detect_bg the detected colour, when there is one, is also what the
+    center is measured against.
+    """
+    result = {}
+    if detect_bg:
+        detected = detect_background(image)
+        result["bg_color"] = detected
+        if detected is not None:
+            bg_color = detected
+    center_x, center_y, used = suggest_center(image, bg_color, method)
+    result["center"] = (center_x, center_y)
+    result["method"] = used
+    return result
+
+
+class ImageAnalyzer:
+    """Computes center suggestions and background colours on background threads.
+
+    start() walks a whole file list on its own worker; the prefetcher also
+    calls analyse_now() on images it has just decoded, so the current
+    neighbours are covered by the loading pass without a second decode.
+    Results are cached per (path, mtime) plus the settings they depend on, so
+    revisiting a folder never recomputes them.
+    """
+
+    def __init__(self, method="auto", max_workers=1):
+        self.method = method
+        self.bg_color = None
+        self.detect_bg = False
+        self.active = False  # True while suggestions or detection are switched on
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self._results = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def configure(self, bg_color=None, detect_bg=False, active=True):
+        """Set the colour centers are measured against and whether to detect it per image."""
+        with self._lock:
+            self.bg_color = tuple(bg_color[:3]) if bg_color is not None else None
+            self.detect_bg = detect_bg
+            self.active = active
+
+    def _settings(self):
+        """(bg_color, detect_bg), read together so a result is cached under the settings it used."""
+        with self._lock:
+            return self.bg_color, self.detect_bg
+
+    def _key(self, path, settings):
+        bg_color, detect_bg = settings
+        # A detected background doesn't depend on the current colour
+        return (os.path.abspath(path), os.stat(path).st_mtime_ns, "detect" if detect_bg else bg_color)
+
+    def start(self, image_paths, first_index=0):
+        """Analyse image_paths in the background, starting at first_index.
+
+        Any pass still running for a previous folder or setting is abandoned.
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        ordered = list(image_paths[first_index:]) + list(image_paths[:first_index])
+        self._executor.submit(self._run, ordered, generation)
+
+    def _run(self, paths, generation):
+        for path in paths:
+            if generation != self._generation:
+                return
+            try:
+                settings = self._settings()
+                key = self._key(path, settings)
+                with self._lock:
+                    if key in self._results:
+                        continue
+                result = analyse_file(path, settings[0], self.method, settings[1])
+                with self._lock:
+                    self._results[key] = result
+            except Exception:
+                continue  # Unreadable files are reported when they are shown
+
+    def get(self, path):
+        """Return the cached result for path, or None if it hasn't been analysed yet."""
+        try:
+            key = self._key(path, self._settings())
+        except OSError:
+            return None
+        with self._lock:
+            return self._results.get(key)
+
+    def analyse_now(self, path, image):
+        """Analyse an already-decoded image on the calling thread and cache the result."""
+        settings = self._settings()
+        try:
+            key = self._key(path, settings)
+        except OSError:
+            key = None
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+        result = analyse_image(image, settings[0], self.method, settings[1])
+        if key is not None:
+            with self._lock:
+                self._results[key] = result
+        return result
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
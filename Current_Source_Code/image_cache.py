@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+from profiler import profiler
+
+try:
+    THUMBNAIL_FILTER = Image.Resampling.LANCZOS
+except AttributeError:
+    THUMBNAIL_FILTER = Image.ANTIALIAS
+
+DEFAULT_BUDGET_BYTES = 512 * 1024 * 1024  # 512 MB of decoded pixels
+
+
+class CachedImage:
+    """A decoded RGBA source image plus its base display thumbnail."""
+
+    def __init__(self, path, mtime, image):
+        self.path = path
+        self.mtime = mtime
+        self.image = image
+        self.thumbnail = None
+        self.thumbnail_max_size = None
+        self.decode_seconds = None  # How long the decode took, for throughput stats
+
+    def get_thumbnail(self, max_size):
+        """Return the display thumbnail for max_size, building it if needed."""
+        if self.thumbnail is None or self.thumbnail_max_size != max_size:
+            thumb = self.image.copy()
+            thumb.thumbnail(max_size, THUMBNAIL_FILTER)
+            self.thumbnail = thumb
+            self.thumbnail_max_size = max_size
+        return self.thumbnail
+
+    @property
+    def nbytes(self):
+        size = self.image.width * self.image.height * 4
+        if self.thumbnail is not None:
+            size += self.thumbnail.width * self.thumbnail.height * 4
+        return size
+
+
+class ImageCache:
+    """Memory-capped LRU of decoded images, keyed by (path, mtime).
+
+    View-only changes (pan, zoom, scroll) reuse the pixels already held here
+    instead of decoding the file again. Entries are evicted least-recently-used
+    first once the total decoded size goes over budget_bytes.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(path):
+        return (os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+    def get(self, path, max_display_size=None):
+        """Return the CachedImage for path, decoding it on a miss.
+
+        If max_display_size is given the entry's thumbnail is built (or reused)
+        for that size before returning.
+        """
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if max_display_size is not None:
+                    old_bytes = entry.nbytes
+                    entry.get_thumbnail(max_display_size)
+                    self._total_bytes += entry.nbytes - old_bytes
+                return entry
+            self.misses += 1
+
+        # Decode outside the lock so other threads can keep reading the cache
+        started = time.perf_counter()
+        profiler.count("decodes")
+        with profiler.span("decode"), Image.open(path) as src:
+            image = src.convert("RGBA")
+        entry = CachedImage(key[0], key[1], image)
+        entry.decode_seconds = time.perf_counter() - started
+        if max_display_size is not None:
+            entry.get_thumbnail(max_display_size)
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                # Another thread decoded the same file meanwhile; keep theirs
+                self._entries.move_to_end(key)
+                return existing
+            self._entries[key] = entry
+            self._total_bytes += entry.nbytes
+            self._evict()
+        return entry
+
+    def contains(self, path):
+        try:
+            key = self._key(path)
+        except OSError:
+            return False
+        with self._lock:
+            return key in self._entries
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone is over budget
+        while self._total_bytes > self.budget_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,95 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ImagePrefetcher:
+    """Decodes and thumbnails the neighbours of the current image in the background.
+
+    Results land in the shared ImageCache, so next/previous navigation and the
+    advance after a crop click are served from memory instead of waiting on
+    the PNG decode.
+    """
+
+    def __init__(self, image_cache, ahead=3, behind=1, max_workers=2, analyzer=None, logger=None):
+        self.image_cache = image_cache
+        self.logger = logger or logging.getLogger("ImageResizer")
+        self.analyzer = analyzer  # Optional ImageAnalyzer fed with each decoded image
+        self.ahead = ahead
+        self.behind = behind
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._futures = {}  # path -> Future
+        self._generation = 0
+        self._lock = threading.RLock()  # done-callbacks may fire while held
+
+    def schedule(self, image_paths, index, max_display_size):
+        """Queue the next `ahead` and previous `behind` entries around index.
+
+        max_display_size must be computed on the Tk thread and passed in;
+        the workers never touch Tk.
+        """
+        wanted = []
+        for offset in range(1, self.ahead + 1):
+            if index + offset < len(image_paths):
+                wanted.append(image_paths[index + offset])
+        for offset in range(1, self.behind + 1):
+            if index - offset >= 0:
+                wanted.append(image_paths[index - offset])
+
+        with self._lock:
+            generation = self._generation
+            # Drop queued work that has fallen out of the window
+            for path, future in list(self._futures.items()):
+                if path not in wanted and future.cancel():
+                    del self._futures[path]
+            for path in wanted:
+                if path in self._futures or self.image_cache.contains(path):
+                    continue
+                future = self._executor.submit(self._load, path, max_display_size, generation)
+                self._futures[path] = future
+                future.add_done_callback(lambda f, p=path: self._forget(p, f))
+
+    def _load(self, path, max_display_size, generation):
+        if generation != self._generation:
+            return None  # Cancelled (e.g. folder changed) before we got to run
+        entry = self.image_cache.get(path, max_display_size)
+        if self.analyzer is not None and self.analyzer.active:
+            # Analyse while the pixels are hot instead of decoding the file again later
+            try:
+                self.analyzer.analyse_now(path, entry.image)
+            except Exception:
+                self.logger.exception("Prefetch analysis of %s failed", path)
+        return entry
+
+    def _forget(self, path, future):
+        with self._lock:
+            if self._futures.get(path) is future:
+                del self._futures[path]
+
+    def wait(self, path, timeout=None):
+        """Block until an in-flight prefetch of path finishes, if there is one.
+
+        Prevents the Tk thread from decoding the same file a second time while
+        a worker is halfway through it. Errors are left for the caller to hit
+        when it loads the image itself.
+        """
+        with self._lock:
+            future = self._futures.get(path)
+        if future is None:
+            return
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            self.logger.debug("Prefetch of %s failed, loading it directly: %s", path, e)
+
+    def cancel_all(self):
+        """Cancel all pending work, e.g. when a new folder is opened."""
+        with self._lock:
+            self._generation += 1
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+
+    def shutdown(self):
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
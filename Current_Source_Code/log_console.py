@@ -0,0 +1,101 @@
+import logging
+from collections import deque
+
+import tkinter as tk
+
+
+class RingBufferHandler(logging.Handler):
+    """Logging handler that keeps only the last `capacity` formatted records.
+
+    Memory stays bounded however long the session runs. Records are counted
+    as they arrive so a reader can ask for just the ones it hasn't seen yet.
+    """
+
+    def __init__(self, capacity=5000):
+        super().__init__()
+        self.lines = deque(maxlen=capacity)
+        self.count = 0  # Records emitted so far
+
+    def emit(self, record):
+        # handle() already holds self.lock here
+        try:
+            self.lines.append(self.format(record))
+            self.count += 1
+        except Exception:
+            self.handleError(record)
+
+    def since(self, seen):
+        """Return (lines emitted after the first `seen`, new count, complete).
+
+        complete is False if some of those lines have already dropped out of
+        the buffer, in which case every buffered line is returned.
+        """
+        self.acquire()
+        try:
+            new = self.count - seen
+            if new > len(self.lines):
+                return list(self.lines), self.count, False
+            # Index from the right: O(new) on a deque rather than O(capacity)
+            return [self.lines[-i] for i in range(new, 0, -1)], self.count, True
+        finally:
+            self.release()
+
+
+class LogConsole:
+    """Feeds a RingBufferHandler into a Text widget while its window is shown.
+
+    Only new records are appended, every `interval` ms, and the widget is
+    trimmed to max_lines. Nothing runs while the window is hidden; showing it
+    refills the widget from the buffer.
+    """
+
+    def __init__(self, window, text, handler, max_lines=5000, interval=100):
+        self.window = window
+        self.text = text
+        self.handler = handler
+        self.max_lines = max_lines
+        self.interval = interval
+        self._seen = 0
+        self._job = None
+
+    @property
+    def visible(self):
+        return self.window.winfo_exists() and self.window.state() != 'withdrawn'
+
+    def show(self):
+        self.window.deiconify()
+        self.text.delete(1.0, tk.END)
+        self._seen = 0
+        self._pump()
+
+    def hide(self):
+        if self._job is not None:
+            self.window.after_cancel(self._job)
+            self._job = None
+        self.window.withdraw()
+
+    def toggle(self):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def _pump(self):
+        self._job = None
+        try:
+            if not self.visible:
+                return
+            lines, self._seen, complete = self.handler.since(self._seen)
+            if lines:
+                at_bottom = self.text.yview()[1] >= 0.999
+                if not complete:
+                    self.text.delete(1.0, tk.END)
+                self.text.insert(tk.END, "\n".join(lines) + "\n")
+                excess = int(self.text.index("end-1c").split(".")[0]) - 1 - self.max_lines
+                if excess > 0:
+                    self.text.delete(1.0, f"{excess + 1}.0")
+                if at_bottom:
+                    self.text.see(tk.END)  # Don't yank the view away from someone scrolled up
+            self._job = self.window.after(self.interval, self._pump)
+        except tk.TclError:
+            pass  # Window is gone
@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+MANIFEST_FILENAME = "export_manifest.jsonl"
+
+
+class ExportManifest:
+    """Per-source record of the center, background colour and sizes used for an export.
+
+    Stored as JSON lines in the output folder, one line per crop click, so
+    recording is a cheap append however many frames have been processed. When
+    a source is processed more than once the last line wins. batch_cli.py
+    replays the manifest to re-render everything without clicking again.
+    """
+
+    def __init__(self, output_folder):
+        self.output_folder = output_folder
+        self.path = os.path.join(output_folder, MANIFEST_FILENAME)
+        self._lock = threading.Lock()
+
+    def record(self, source_path, center, bg_color, target_sizes):
+        entry = {
+            "source": os.path.abspath(source_path),
+            "center": [int(center[0]), int(center[1])],
+            "bg_color": [int(c) for c in bg_color[:3]],
+            "sizes": [[int(w), int(h)] for w, h in target_sizes],
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            os.makedirs(self.output_folder, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    @staticmethod
+    def load(path):
+        """Return the latest entry per source from a manifest file, in first-seen order.
+
+        Lines that can't be parsed (e.g. a write cut short by a crash) are skipped.
+        """
+        entries = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    source = entry["source"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                entries[source] = entry
+        return list(entries.values())
@@ -0,0 +1,132 @@
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from profiler import profiler
+
+
+class OutputWriter:
+    """Write-behind queue that encodes and saves rendered outputs on worker threads.
+
+    submit() returns as soon as the image is queued, so a crop click no longer
+    waits on BMP encoding and disk (or network share) latency. At most
+    max_pending writes are in flight; past that submit() blocks until one
+    finishes, which keeps memory bounded if the disk falls behind.
+
+    The most recent results are kept in memory so previews can show them
+    before the file lands. Failures are collected for the Tk thread to pick up
+    with drain_errors().
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, recent_limit=32):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="output")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._made_dirs = set()
+        self._latest = {}  # output path -> sequence number of the newest submit
+        self._sequence = 0
+        self._futures = set()
+        self._errors = queue.Queue()
+        self._recent = OrderedDict()  # output path -> PIL image
+        self._recent_limit = recent_limit
+
+    def submit(self, image, output_path):
+        """Queue image to be saved at output_path. The image must not be modified afterwards.
+
+        The returned future's result is the seconds spent encoding and saving
+        once this image is on disk, or None if the write failed or was
+        superseded by a newer submit.
+        """
+        self._slots.acquire()
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+            self._latest[output_path] = sequence
+            self._recent[output_path] = image
+            self._recent.move_to_end(output_path)
+            while len(self._recent) > self._recent_limit:
+                self._recent.popitem(last=False)
+            future = self._executor.submit(self._write, image, output_path, sequence)
+            self._futures.add(future)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self._lock:
+            self._futures.discard(future)
+        self._slots.release()
+
+    def _ensure_dir(self, folder):
+        if folder in self._made_dirs:
+            return
+        os.makedirs(folder, exist_ok=True)
+        with self._lock:
+            self._made_dirs.add(folder)
+
+    def _write(self, image, output_path, sequence):
+        temp_path = None
+        try:
+            with self._lock:
+                if self._latest.get(output_path) != sequence:
+                    return  # A newer render of the same file is queued; skip this one
+            started = time.perf_counter()
+            self._ensure_dir(os.path.dirname(output_path))
+            # Save to a temp file and swap it in so nobody ever reads a half-written BMP
+            root, ext = os.path.splitext(output_path)
+            temp_path = f"{root}.{threading.get_ident()}.tmp{ext}"
+            with profiler.span("save (writer)"):
+                image.save(temp_path)
+            with self._lock:
+                is_latest = self._latest.get(output_path) == sequence
+                if is_latest:
+                    os.replace(temp_path, output_path)
+                    del self._latest[output_path]
+            if not is_latest:
+                os.remove(temp_path)
+                return None
+            return time.perf_counter() - started
+        except Exception as e:
+            with self._lock:
+                if self._latest.get(output_path) == sequence:
+                    # Nothing newer is queued for this path: forget the failed image
+                    del self._latest[output_path]
+                    self._recent.pop(output_path, None)
+            self._errors.put((output_path, str(e), traceback.format_exc()))
+            if temp_path and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def get_recent(self, output_path):
+        """Return the in-memory image last submitted for output_path, or None."""
+        with self._lock:
+            return self._recent.get(output_path)
+
+    def drain_errors(self):
+        """Return and clear the (output_path, message, traceback) tuples of failed writes."""
+        errors = []
+        while True:
+            try:
+                errors.append(self._errors.get_nowait())
+            except queue.Empty:
+                return errors
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._futures)
+
+    def flush(self, timeout=None):
+        """Block until every queued write has finished."""
+        with self._lock:
+            futures = list(self._futures)
+        if futures:
+            wait(futures, timeout=timeout)
+
+    def shutdown(self):
+        """Finish outstanding writes and stop the workers."""
+        self._executor.shutdown(wait=True)
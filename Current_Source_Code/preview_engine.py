@@ -0,0 +1,78 @@
+import weakref
+
+from render_core import flatten_window
+
+
+class PreviewEngine:
+    """Serves live crop previews from one pre-flattened copy of the current image.
+
+    The source is composited onto the background colour once per image/colour
+    change, padded by half the largest preview size on every side. Each preview
+    is then a plain crop of that buffer, pixel-identical to render_centered,
+    instead of a fresh canvas plus alpha split and paste per window per mouse
+    event.
+
+    The buffer is tied to a source_key, normally (path, mtime_ns) from the
+    ImageCache, rather than to the image object, so the engine never keeps a
+    source alive after the cache has evicted it.
+    """
+
+    def __init__(self):
+        self.generation = 0  # Bumped whenever the flattened buffer is rebuilt
+        self._source_key = None
+        self._source_ref = None  # Weak reference to the image, used when no source_key is given
+        self._bg = None
+        self._flat = None
+        self._pad_left = 0
+        self._pad_top = 0
+        self._pad_right = 0
+        self._pad_bottom = 0
+
+    def invalidate(self):
+        self._source_key = None
+        self._source_ref = None
+        self._flat = None
+
+    def _same_source(self, image, source_key, bg):
+        if self._flat is None or bg != self._bg:
+            return False
+        if source_key is not None:
+            return source_key == self._source_key
+        return self._source_ref is not None and self._source_ref() is image
+
+    def _ensure_flat(self, image, source_key, bg_color, target_w, target_h):
+        bg = tuple(bg_color[:3])
+        pad_left, pad_top = target_w // 2, target_h // 2
+        pad_right, pad_bottom = target_w - target_w // 2, target_h - target_h // 2
+        same_source = self._same_source(image, source_key, bg)
+        if (same_source and pad_left <= self._pad_left and pad_top <= self._pad_top and
+                pad_right <= self._pad_right and pad_bottom <= self._pad_bottom):
+            return
+        if same_source:
+            # Same image, bigger preview than before: grow the padding
+            pad_left = max(pad_left, self._pad_left)
+            pad_top = max(pad_top, self._pad_top)
+            pad_right = max(pad_right, self._pad_right)
+            pad_bottom = max(pad_bottom, self._pad_bottom)
+        self._flat = flatten_window(image, -pad_left, -pad_top,
+                                    image.width + pad_left + pad_right,
+                                    image.height + pad_top + pad_bottom, bg)
+        self._source_key = source_key
+        self._source_ref = None if source_key is not None else weakref.ref(image)
+        self._bg = bg
+        self._pad_left, self._pad_top = pad_left, pad_top
+        self._pad_right, self._pad_bottom = pad_right, pad_bottom
+        self.generation += 1
+
+    def render(self, image, bg_color, center_x, center_y, target_w, target_h, source_key=None):
+        """Return the target_w x target_h preview centered on (center_x, center_y).
+
+        The center is clamped to the image, as simulate_process_image always did.
+        Without a source_key the image object itself identifies the source.
+        """
+        center_x = max(0, min(center_x, image.width - 1))
+        center_y = max(0, min(center_y, image.height - 1))
+        self._ensure_flat(image, source_key, bg_color, target_w, target_h)
+        x0 = center_x - target_w // 2 + self._pad_left
+        y0 = center_y - target_h // 2 + self._pad_top
+        return self._flat.crop((x0, y0, x0 + target_w, y0 + target_h))
@@ -0,0 +1,150 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+
+class _NullSpan:
+    """Shared do-nothing context manager returned while profiling is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class SpanStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class _Span:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_sample(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """Named timing spans and counters for the UI hot paths.
+
+    Wrap code in `with profiler.span("name"):` or decorate a function with
+    @profiler.timed("name"); bump counters with profiler.count("name").
+    While disabled each of these is a single attribute check, so the
+    instrumentation can stay in place permanently.
+
+    Every span sample is also kept in a bounded trace buffer that
+    export_trace() writes in Chrome trace-event format (open it in
+    chrome://tracing or https://ui.perfetto.dev).
+    """
+
+    def __init__(self, trace_capacity=100000):
+        self.enabled = False
+        self.spans = {}
+        self.counters = Counter()
+        self.trace = deque(maxlen=trace_capacity)  # (name, start, duration, thread id)
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self, reset=True):
+        if reset:
+            self.reset()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.spans = {}
+            self.counters = Counter()
+            self.trace.clear()
+            self.started_at = time.perf_counter()
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def timed(self, name):
+        """Decorator form of span()."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add_sample(name, start, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += n
+
+    def add_sample(self, name, start, duration):
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = SpanStats()
+            stats.count += 1
+            stats.total += duration
+            stats.last = duration
+            stats.max = max(stats.max, duration)
+            self.trace.append((name, start, duration, threading.get_ident()))
+
+    def summary_lines(self):
+        """One line per span (last/mean/max ms and count), then the counters."""
+        with self._lock:
+            spans = sorted(self.spans.items(), key=lambda item: -item[1].total)
+            lines = [f"{name:<22} {s.last * 1000:7.2f} {s.mean * 1000:7.2f} {s.max * 1000:7.2f} {s.count:6d}"
+                     for name, s in spans]
+            counters = sorted(self.counters.items())
+        header = f"{'span':<22} {'last':>7} {'avg':>7} {'max':>7} {'n':>6}"
+        lines = [header] + lines
+        if counters:
+            lines.append("")
+            lines.extend(f"{name:<22} {value:>8}" for name, value in counters)
+        return lines
+
+    def export_trace(self, path):
+        """Write recorded samples and counters as Chrome trace-event JSON."""
+        with self._lock:
+            samples = list(self.trace)
+            counters = dict(self.counters)
+            origin = self.started_at
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "ts": (start - origin) * 1e6, "dur": duration * 1e6,
+                   "pid": pid, "tid": tid} for name, start, duration, tid in samples]
+        events.append({"name": "counters", "ph": "C", "ts": (time.perf_counter() - origin) * 1e6,
+                       "pid": pid, "args": counters})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(samples)
+
+
+profiler = Profiler()
@@ -0,0 +1,44 @@
+import tkinter as tk
+
+from profiler import profiler
+
+
+class CountingCanvas(tk.Canvas):
+    """Canvas that counts items created, for the profiler's "canvas items" counter."""
+
+    def _create(self, item_type, args, kw):
+        if profiler.enabled:
+            profiler.count("canvas items created")
+        return super()._create(item_type, args, kw)
+
+
+class ProfilerHUD:
+    """Overlay in the corner of a canvas showing profiler.summary_lines(), refreshed every interval ms."""
+
+    def __init__(self, canvas, interval=500):
+        self.canvas = canvas
+        self.interval = interval
+        self.label = None
+        self._job = None
+
+    def show(self):
+        if self.label is None:
+            self.label = tk.Label(self.canvas, justify=tk.LEFT, anchor="nw", font=("Courier", 9),
+                                  bg="black", fg="#7CFC00", padx=6, pady=4)
+        self.label.place(x=8, y=8)
+        self._refresh()
+
+    def hide(self):
+        if self._job is not None:
+            self.canvas.after_cancel(self._job)
+            self._job = None
+        if self.label is not None:
+            self.label.place_forget()
+
+    def _refresh(self):
+        self._job = None
+        try:
+            self.label.config(text="\n".join(profiler.summary_lines()))
+            self._job = self.canvas.after(self.interval, self._refresh)
+        except tk.TclError:
+            pass  # Canvas is gone
@@ -2,36 +2,42 @@ import xml.etree.ElementTree as ET
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
+import re
+import time
 
-ROWS_PER_PAGE = 100
+from xml_table import ColumnStore, XMLLoader, ROW_TAG
+from xml_grid import VirtualTable
+from xml_search import SearchIndex
+from xml_writer import RowOffsets, write_edited, write_patch
+from xml_bulk import bulk_edit, copy_column, set_value, find_replace, scale_offset
+
+LOAD_POLL_MS = 50
+INDEX_POLL_MS = 200
+BULK_OPERATIONS = ("Set value", "Find / replace", "Scale / offset (numbers)", "Copy from column")
+SEARCH_MODE_LABELS = {"Contains": "contains", "Exact": "exact", "Starts With": "prefix", "Number Range (a..b)": "range"}
 
 class TricksterXMLEditor:
     def __init__(self):
-        self.tree = None
-        self.root = None
-        self.data = []  # List of (ET.Element, data_dict)
+        self.store = ColumnStore()  # Every <ROW>, column-wise; rows are addressed by index
+        self.loader = XMLLoader()
+        self.load_poll_job = None
+        self.search_index = SearchIndex(self.store)
+        self.index_poll_job = None
+        self.edited_rows = set()  # Rows changed since the file was loaded
+        self.unsaved_rows = set()  # Rows changed since the last save
+        self.row_offsets = None  # RowOffsets of file_path, found on the first save
+        self.last_bulk_edit = None  # BulkEdit that Undo Bulk Edit reverts
+        self.bulk_first_edits = set()  # Rows last_bulk_edit was the only edit to; clean again once undone
+        self.bulk_first_unsaved = set()  # Rows last_bulk_edit made unsaved; until a save, clean again once undone
         self.headers = []
         self.file_path = None
-        self.page = 0
-        self.filtered_data = [] # List of references to items in self.data
+        self.filtered_data = range(0) # Row indices shown, in order (a range while unfiltered)
+        self.search_active = False
         self.column_vars = {}
         self.visible_headers = []
-        
-        # For persistent widget grid
-        self.header_label_widgets = []
-        self.page_entry_widgets = [] # 2D list of tk.Entry
-        self.page_entry_vars = []    # 2D list of tk.StringVar
-        self.page_row_data_map = []  # Maps displayed row index to (ET.Element, data_dict)
-
-        self._is_programmatic_update = False # Flag to prevent cell edit triggers during programmatic updates
 
         # UI Elements - initialized here for clarity, configured in setup_ui
-        self.header_canvas = None
-        self.header_scrollable_frame = None
-        self.data_canvas = None # Renamed from self.canvas
-        self.data_v_scrollbar = None # Renamed from self.scrollbar
-        self.scrollable_frame = None # Frame inside data_canvas for data rows
-        self.unified_h_scrollbar = None # For both header and data
+        self.table = None # VirtualTable showing filtered_data
 
         self.window = tk.Tk()
         self.window.title("Trickster XML Editor")
@@ -43,8 +49,14 @@ class TricksterXMLEditor:
         self.window.config(menu=self.menu)
         file_menu = tk.Menu(self.menu, tearoff=0)
         file_menu.add_command(label="Open XML File", command=self.load_xml_file)
+        file_menu.add_command(label="Save Changed Rows Only...", command=self.save_patch)
         self.menu.add_cascade(label="File", menu=file_menu)
 
+        self.edit_menu = tk.Menu(self.menu, tearoff=0)
+        self.edit_menu.add_command(label="Bulk Edit Column...", command=self.bulk_edit_dialog)
+        self.edit_menu.add_command(label="Undo Bulk Edit", command=self.undo_bulk_edit, state="disabled")
+        self.menu.add_cascade(label="Edit", menu=self.edit_menu)
+
         self.columns_menu = tk.Menu(self.menu, tearoff=0)
         self.menu.add_cascade(label="Columns", menu=self.columns_menu, state="disabled")
 
@@ -54,35 +66,25 @@ class TricksterXMLEditor:
         tk.Label(self.search_frame, text="Search:").pack(side="left", padx=5)
         self.search_entry = tk.Entry(self.search_frame, width=40)
         self.search_entry.pack(side="left")
+        self.search_entry.bind("<Return>", lambda e: self.apply_search())
 
         tk.Label(self.search_frame, text="in").pack(side="left", padx=5)
         self.search_field = ttk.Combobox(self.search_frame, state="readonly", width=20)
         self.search_field.pack(side="left")
 
+        self.search_mode = ttk.Combobox(self.search_frame, state="readonly", width=18, values=list(SEARCH_MODE_LABELS))
+        self.search_mode.current(0)
+        self.search_mode.pack(side="left", padx=(5, 0))
+
         tk.Button(self.search_frame, text="Search", command=self.apply_search).pack(side="left", padx=5)
         tk.Button(self.search_frame, text="Clear", command=self.clear_search).pack(side="left", padx=5)
 
-        self.table_display_frame = tk.Frame(self.window)
-        self.table_display_frame.pack(fill="both", expand=True)
-
-        self.data_canvas = tk.Canvas(self.table_display_frame)
-        self.data_v_scrollbar = tk.Scrollbar(self.table_display_frame, orient="vertical", command=self.data_canvas.yview)
-        self.data_canvas.configure(yscrollcommand=self.data_v_scrollbar.set)
+        # Only the rows and columns on screen are drawn, from a pool of recycled cells
+        self.table = VirtualTable(self.window, get_cell=self.store_cell, on_edit=self._handle_cell_edit,
+                                  on_view_change=self._update_page_label)
+        self.table.pack(fill="both", expand=True)
         
-        self.scrollable_frame = tk.Frame(self.data_canvas)
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.data_canvas.configure(scrollregion=self.data_canvas.bbox("all"))
-        )
-        self.data_canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-
-        self.data_canvas.grid(row=0, column=0, sticky="nsew")
-        self.data_v_scrollbar.grid(row=0, column=1, sticky="ns")
-
-        self.table_display_frame.grid_rowconfigure(0, weight=1)
-        self.table_display_frame.grid_columnconfigure(0, weight=1)
-        
-        # Nav frame and Save button need to be packed *after* table_display_frame is packed.
+        # Nav frame and Save button need to be packed *after* the table is packed.
         # To ensure they are at the bottom. Let's use a bottom_frame for these.
         bottom_controls_frame = tk.Frame(self.window)
         bottom_controls_frame.pack(side="bottom", fill="x")
@@ -90,8 +92,10 @@ class TricksterXMLEditor:
         self.nav_frame = tk.Frame(bottom_controls_frame)
         self.nav_frame.pack(fill="x") # Will be packed before save button in this frame
         
-        self.page_label = tk.Label(self.nav_frame, text="Page 0 of 0")
+        self.page_label = tk.Label(self.nav_frame, text="No rows")
         self.page_label.pack(side="left", padx=10)
+        self.status_label = tk.Label(self.nav_frame, text="") # Load progress
+        self.status_label.pack(side="left", padx=10)
         # Pack Next first to make it appear on the left of Previous (when using side="right")
         tk.Button(self.nav_frame, text="Next", command=self.next_page).pack(side="right", padx=(0,5))
         tk.Button(self.nav_frame, text="Previous", command=self.prev_page).pack(side="right")
@@ -103,259 +107,361 @@ class TricksterXMLEditor:
         path = filedialog.askopenfilename(filetypes=[("XML files", "*.xml")])
         if not path:
             return
-        try:
-            tree = ET.parse(path)
-            root = tree.getroot()
-            rows = root.findall("ROW")
-            if not rows:
-                messagebox.showerror("Invalid File", "No <ROW> tags found.")
-                return
+        if self.unsaved_rows and not messagebox.askyesno(
+                "Unsaved Changes", f"{len(self.unsaved_rows)} edited row(s) haven't been saved. Open another file anyway?"):
+            return
+        # Rows stream in on a background thread; the first page shows as soon as it's parsed
+        if self.load_poll_job is not None:
+            self.window.after_cancel(self.load_poll_job)
+        if self.index_poll_job is not None:
+            self.window.after_cancel(self.index_poll_job)
+            self.index_poll_job = None
+        self.search_index.cancel()
+        self.store = ColumnStore()
+        self.search_index = SearchIndex(self.store)
+        self.edited_rows = set()
+        self.unsaved_rows = set()
+        self.row_offsets = None
+        self.last_bulk_edit = None
+        self.bulk_first_edits = set()
+        self.bulk_first_unsaved = set()
+        self.edit_menu.entryconfig("Undo Bulk Edit", state="disabled")
+        self.headers = []
+        self.visible_headers = []
+        self.filtered_data = range(0)
+        self.search_active = False
+        self.file_path = path
+        self.column_vars.clear()
+        self.columns_menu.delete(0, tk.END)
+        self.menu.entryconfig("Columns", state="disabled")
+        self._build_display_grid() # Clears the previous file's cells
+        self._update_displayed_data()
+        self.status_label.config(text="Loading... 0%")
+        self.loader.start(path, self.store)
+        self._poll_xml_load()
+
+    def _poll_xml_load(self):
+        """Move parsed rows from the loader into the store and refresh the view."""
+        self.load_poll_job = None
+        chunks, finished = self.loader.poll()
+        had_rows = self.store.row_count > 0
+        known_headers = len(self.store.headers)
+        for count, chunk in chunks:
+            self.store.append_chunk(count, chunk)
+
+        headers_changed = len(self.store.headers) != known_headers
+        if headers_changed:
+            self._update_headers()
+            self._build_display_grid()
+        if chunks and not self.search_active:
+            # The first rows show while the rest loads
+            self.filtered_data = range(self.store.row_count)
+            self.table.set_rows(self.filtered_data, keep_position=had_rows)
+
+        if not finished:
+            self.status_label.config(text=f"Loading... {self.loader.progress:.0%} ({self.store.row_count:,} rows)")
+            self.load_poll_job = self.window.after(LOAD_POLL_MS, self._poll_xml_load)
+            return
 
-            raw_data = []
-            headers_set = set()
-            for row_el in rows:
-                row_data_dict = {}
-                for child in row_el:
-                    headers_set.add(child.tag)
-                    row_data_dict[child.tag] = child.text or ""
-                raw_data.append((row_el, row_data_dict))
-
-            self.tree = tree
-            self.root = root
-            self.data = raw_data
-            self.filtered_data = list(self.data) # Start with all data
-            self.headers = sorted(list(headers_set))
-            self.visible_headers = list(self.headers)
-            self.file_path = path
-            self.page = 0
-
-            self.search_field['values'] = ['(All Fields)'] + self.headers
+        if self.loader.error is not None:
+            self.search_index.cancel()  # No index for a partial file; search scans instead
+            self.status_label.config(text=f"Load failed after {self.store.row_count:,} rows")
+            messagebox.showerror("Error", f"Failed to load XML: {self.loader.error}")
+        elif self.store.row_count == 0:
+            self.status_label.config(text="")
+            messagebox.showerror("Invalid File", f"No <{ROW_TAG}> tags found.")
+        else:
+            self.status_label.config(text=f"{self.store.row_count:,} rows, {len(self.store.headers)} columns - indexing for search...")
+            self.search_index.start_build()
+            self._poll_search_index()
+
+    def _poll_search_index(self):
+        self.index_poll_job = None
+        if self.search_index.poll():
+            self.status_label.config(text=f"{self.store.row_count:,} rows, {len(self.store.headers)} columns")
+        elif self.search_index.building:
+            self.index_poll_job = self.window.after(INDEX_POLL_MS, self._poll_search_index)
+
+    def _update_headers(self):
+        """Pick up columns that appeared in newly loaded rows (visible by default)."""
+        new_headers = [h for h in self.store.headers if h not in self.column_vars]
+        self.headers = sorted(self.store.headers)
+        self.search_field['values'] = ['(All Fields)'] + self.headers
+        if not self.search_field.get():
             self.search_field.current(0)
-            
-            self.column_vars.clear()
-            self.columns_menu.delete(0, tk.END)
-            if self.headers:
-                self.menu.entryconfig("Columns", state="normal")
-                for header in self.headers:
-                    var = tk.BooleanVar(value=True)
-                    self.column_vars[header] = var
-                    self.columns_menu.add_checkbutton(
-                        label=header, variable=var, command=self.on_column_visibility_change
-                    )
-            else:
-                self.menu.entryconfig("Columns", state="disabled")
-
-            self._build_display_grid() # This will also call _update_displayed_data
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load XML: {e}")
+        self.menu.entryconfig("Columns", state="normal")
+        for header in sorted(new_headers):
+            var = tk.BooleanVar(value=True)
+            self.column_vars[header] = var
+            self.columns_menu.add_checkbutton(
+                label=header, variable=var, command=self.on_column_visibility_change
+            )
+        self.visible_headers = [h for h in self.headers if self.column_vars[h].get()]
 
     def _build_display_grid(self):
-        # Clear previous header widgets
-        for widget in self.header_scrollable_frame.winfo_children():
-            widget.destroy()
-        self.header_label_widgets.clear()
-
-        # Clear previous data row widgets (from self.scrollable_frame inside data_canvas)
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        # self.page_entry_widgets, self.page_entry_vars are rebuilt, so clearing them might be redundant if always fully repopulated
-        self.page_entry_widgets.clear()
-        self.page_entry_vars.clear()
-
-        if not self.visible_headers:
-            self.header_canvas.config(scrollregion=self.header_canvas.bbox("all"))
-            self._update_displayed_data() 
-            return
-
-        # Build new headers in header_scrollable_frame
-        for col_idx, header in enumerate(self.visible_headers):
-            label = tk.Label(self.header_scrollable_frame, text=header, font=("Arial", 10, "bold"), borderwidth=1, relief="solid", width=20, anchor="w")
-            label.grid(row=0, column=col_idx, sticky="ew")
-            self.header_label_widgets.append(label)
-        
-        self.header_scrollable_frame.update_idletasks()
-        self.header_canvas.config(scrollregion=self.header_canvas.bbox("all"))
-        self.header_canvas.xview_moveto(0) # Reset horizontal scroll of headers
-
-        # Build new data entry grid structure in self.scrollable_frame
-        self.page_row_data_map = [None] * ROWS_PER_PAGE
-        for r_idx in range(ROWS_PER_PAGE):
-            row_widgets = []
-            row_vars = []
-            # Use len(self.visible_headers) for the number of columns
-            for c_idx in range(len(self.visible_headers)):
-                var = tk.StringVar()
-                var.trace_add("write", lambda name, index, mode, ri=r_idx, ci=c_idx: self._handle_cell_edit(ri, ci))
-                entry = tk.Entry(self.scrollable_frame, textvariable=var, width=20)
-                entry.grid(row=r_idx, column=c_idx, sticky="ew") # Data rows start at r_idx 0 in their own frame
-                row_widgets.append(entry)
-                row_vars.append(var)
-            self.page_entry_widgets.append(row_widgets)
-            self.page_entry_vars.append(row_vars)
-        
-        self._update_displayed_data() # This will populate the grid and set data_canvas scrollregion
+        self.table.set_columns(self.visible_headers)
 
     def _update_displayed_data(self):
-        if not self.filtered_data and not self.visible_headers: # No data and no headers
-             self.page_label.config(text="Page 0 of 0")
-             # Ensure canvas is cleared if it had old content before headers disappeared
-             if not self.visible_headers:
-                 for widget in self.scrollable_frame.winfo_children():
-                    widget.destroy()
-             return
-        if not self.visible_headers: # Data exists but no columns selected
-            self.page_label.config(text=f"Page {self.page + 1} of {max(1, (len(self.filtered_data) - 1) // ROWS_PER_PAGE + 1)} (No columns visible)")
-            # Hide all entry widgets if headers are not visible
-            for r_idx in range(ROWS_PER_PAGE):
-                 for c_idx_entry in range(len(self.page_entry_widgets[r_idx]) if self.page_entry_widgets and r_idx < len(self.page_entry_widgets) else 0):
-                    self.page_entry_widgets[r_idx][c_idx_entry].grid_remove()
-            return
+        self.table.set_rows(self.filtered_data)
 
-        start = self.page * ROWS_PER_PAGE
-        end = min(start + ROWS_PER_PAGE, len(self.filtered_data))
-        current_page_tuples = self.filtered_data[start:end]
-        
-        self.page_row_data_map = [None] * ROWS_PER_PAGE
-
-        for r_idx_on_page in range(ROWS_PER_PAGE):
-            if r_idx_on_page < len(current_page_tuples):
-                el, data_dict = current_page_tuples[r_idx_on_page]
-                self.page_row_data_map[r_idx_on_page] = (el, data_dict)
-                for c_idx, header in enumerate(self.visible_headers):
-                    var = self.page_entry_vars[r_idx_on_page][c_idx]
-                    
-                    self._is_programmatic_update = True
-                    var.set(data_dict.get(header, ""))
-                    self._is_programmatic_update = False
-
-                    self.page_entry_widgets[r_idx_on_page][c_idx].grid() # Ensure visible
-            else: # This row on page is empty
-                self.page_row_data_map[r_idx_on_page] = None
-                for c_idx in range(len(self.visible_headers)):
-                    var = self.page_entry_vars[r_idx_on_page][c_idx]
-                    
-                    self._is_programmatic_update = True
-                    var.set("")
-                    self._is_programmatic_update = False
-                    
-                    self.page_entry_widgets[r_idx_on_page][c_idx].grid_remove() # Hide
-
-        total_pages = max(1, (len(self.filtered_data) - 1) // ROWS_PER_PAGE + 1)
-        self.page_label.config(text=f"Page {self.page + 1} of {total_pages}")
-        self.scrollable_frame.update_idletasks() # Important for scrollregion update
-        self.data_canvas.config(scrollregion=self.data_canvas.bbox("all"))
-        self.data_canvas.xview_moveto(0) # Reset horizontal scroll of data rows
-
-        # Also update header canvas scrollregion in case window was resized, though content unlikely to change here
-        self.header_scrollable_frame.update_idletasks()
-        self.header_canvas.config(scrollregion=self.header_canvas.bbox("all"))
-        # self.header_canvas.xview_moveto(0) # Already done in _build_display_grid if headers changed
-
-    def _handle_cell_edit(self, page_r_idx, page_c_idx):
-        if self._is_programmatic_update: # Don't process edits made by the program itself
-            return
-
-        if self.page_row_data_map[page_r_idx] is None:
-            return # Editing a blank part of the grid
+    def store_cell(self, row, header):
+        return self.store.get(row, header)
 
-        el, data_dict = self.page_row_data_map[page_r_idx]
-        
-        # Check if page_c_idx is valid for current visible_headers
-        if page_c_idx >= len(self.visible_headers):
-            # This can happen if columns were hidden after trace was set up
-            # Or if var.set("") itself triggered a trace somehow before it was removed.
-            # print(f"Warning: cell edit for invalid column index {page_c_idx}")
+    def _update_page_label(self, first, last, total):
+        if not total:
+            self.page_label.config(text="No rows")
+        elif not self.visible_headers:
+            self.page_label.config(text=f"{total:,} rows (No columns visible)")
+        else:
+            self.page_label.config(text=f"Rows {first + 1:,}-{last:,} of {total:,}")
+
+    def _handle_cell_edit(self, row, header, new_value):
+        # Check if value actually changed to avoid unnecessary updates
+        if self.store.get(row, header) != new_value:
+            old_value_id = self.store.set(row, header, new_value)
+            column_id = self.store.header_ids[header]
+            self.search_index.cell_changed(row, column_id, old_value_id, self.store.columns[column_id][row])
+            self.edited_rows.add(row)
+            self.unsaved_rows.add(row)
+            # The row now has an edit of its own, which undoing a bulk edit mustn't hide
+            self.bulk_first_edits.discard(row)
+            self.bulk_first_unsaved.discard(row)
+
+    def _can_save(self):
+        if not self.file_path or not self.store.row_count:
+            messagebox.showwarning("No Data", "No XML file loaded or data is empty.")
+            return False
+        if self.loader.running:
+            messagebox.showwarning("Still Loading", "Wait for the file to finish loading before saving.")
+            return False
+        return True
+
+    def _get_row_offsets(self):
+        """Byte spans of the source's rows, or None if they don't line up with the loaded rows."""
+        if self.row_offsets is None or not self.row_offsets.is_current():
+            self.row_offsets = RowOffsets(self.file_path)
+        if len(self.row_offsets) != self.store.row_count:
+            return None
+        return self.row_offsets
+
+    def bulk_edit_dialog(self):
+        """Change one column in every row currently shown (the search results, or all rows)."""
+        if not self.store.row_count or not self.headers:
+            messagebox.showwarning("No Data", "No XML file loaded or data is empty.")
             return
-
-        header = self.visible_headers[page_c_idx]
-        
-        # Check if the var actually exists for this cell, defensive
-        if page_r_idx >= len(self.page_entry_vars) or page_c_idx >= len(self.page_entry_vars[page_r_idx]):
-            # print(f"Warning: page_entry_vars out of bounds for {page_r_idx}, {page_c_idx}")
+        if self.loader.running:
+            messagebox.showwarning("Still Loading", "Wait for the file to finish loading before editing in bulk.")
             return
 
-        new_value = self.page_entry_vars[page_r_idx][page_c_idx].get()
-
-        # Check if value actually changed to avoid recursion or unnecessary updates
-        if data_dict.get(header, "") != new_value:
-            data_dict[header] = new_value
-            el.set("gui_edited", "true") # Mark element as modified by GUI
+        dialog = tk.Toplevel(self.window)
+        dialog.title("Bulk Edit Column")
+        dialog.transient(self.window)  # Make dialog modal
+        dialog.grab_set()  # Grab focus
+
+        main_frame = tk.Frame(dialog, padx=10, pady=10)
+        main_frame.pack(fill="both", expand=True)
+
+        tk.Label(main_frame, text=f"Applies to the {len(self.filtered_data):,} row(s) currently shown").grid(
+            row=0, column=0, columnspan=2, sticky="w", pady=(0, 8))
+
+        tk.Label(main_frame, text="Column:").grid(row=1, column=0, sticky="w")
+        column_box = ttk.Combobox(main_frame, state="readonly", width=30, values=self.headers)
+        column_box.grid(row=1, column=1, sticky="we", pady=2)
+        column_box.current(0)
+
+        tk.Label(main_frame, text="Operation:").grid(row=2, column=0, sticky="w")
+        operation_box = ttk.Combobox(main_frame, state="readonly", width=30, values=BULK_OPERATIONS)
+        operation_box.grid(row=2, column=1, sticky="we", pady=2)
+        operation_box.current(0)
+
+        # One row of inputs per parameter; only the ones the operation uses are enabled
+        fields = {}
+        for grid_row, (name, label) in enumerate(
+                [("value", "Value / find:"), ("replacement", "Replace with:"),
+                 ("factor", "Multiply by:"), ("offset", "Then add:")], start=3):
+            tk.Label(main_frame, text=label).grid(row=grid_row, column=0, sticky="w")
+            fields[name] = tk.Entry(main_frame, width=32)
+            fields[name].grid(row=grid_row, column=1, sticky="we", pady=2)
+        fields["factor"].insert(0, "1")
+        fields["offset"].insert(0, "0")
+        regex_var = tk.BooleanVar(value=False)
+        regex_check = tk.Checkbutton(main_frame, text="Regular expression", variable=regex_var)
+        regex_check.grid(row=7, column=1, sticky="w")
+        tk.Label(main_frame, text="Copy from:").grid(row=8, column=0, sticky="w")
+        source_box = ttk.Combobox(main_frame, state="readonly", width=30, values=self.headers)
+        source_box.grid(row=8, column=1, sticky="we", pady=2)
+        source_box.current(0)
+
+        used = {
+            "Set value": ("value",),
+            "Find / replace": ("value", "replacement", "regex"),
+            "Scale / offset (numbers)": ("factor", "offset"),
+            "Copy from column": ("source",),
+        }
+
+        def update_fields(event=None):
+            enabled = used[operation_box.get()]
+            for name, widget in list(fields.items()) + [("regex", regex_check)]:
+                widget.config(state="normal" if name in enabled else "disabled")
+            source_box.config(state="readonly" if "source" in enabled else "disabled")
+
+        operation_box.bind("<<ComboboxSelected>>", update_fields)
+        update_fields()
+
+        def apply():
+            tag = column_box.get()
+            operation = operation_box.get()
+            try:
+                if operation == "Copy from column":
+                    edit = copy_column(self.store, self.filtered_data, tag, source_box.get())
+                else:
+                    if operation == "Set value":
+                        transform = set_value(fields["value"].get())
+                    elif operation == "Find / replace":
+                        if not fields["value"].get():
+                            raise ValueError("Enter the text to find.")
+                        transform = find_replace(fields["value"].get(), fields["replacement"].get(), regex_var.get())
+                    else:
+                        transform = scale_offset(float(fields["factor"].get()), float(fields["offset"].get()))
+                    edit = bulk_edit(self.store, self.filtered_data, tag, transform)
+            except (ValueError, re.error) as e:
+                messagebox.showerror("Error", str(e), parent=dialog)
+                return
+            dialog.destroy()
+            self._record_bulk_edit(edit, f"{operation} on {tag}")
+
+        button_frame = tk.Frame(dialog, padx=10, pady=5)
+        button_frame.pack(fill="x")
+        tk.Button(button_frame, text="Apply", command=apply).pack(side="left", padx=5)
+        tk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side="left")
+
+    def _record_bulk_edit(self, edit, description):
+        """Mark a BulkEdit's rows dirty, update the search index and keep it as the undo entry."""
+        if edit.rows:
+            rows = set(edit.rows)
+            self.bulk_first_edits = rows - self.edited_rows
+            self.bulk_first_unsaved = rows - self.unsaved_rows
+            self.edited_rows.update(rows)
+            self.unsaved_rows.update(rows)
+            self.search_index.cells_changed(edit.column_id, edit.rows, edit.old_ids, edit.new_ids)
+            self.last_bulk_edit = edit
+            self.edit_menu.entryconfig("Undo Bulk Edit", state="normal")
+            self.table.refresh()
+        self.status_label.config(text=f"{description}: {len(edit):,} cell(s) changed")
+
+    def undo_bulk_edit(self):
+        if self.last_bulk_edit is None:
+            return
+        undone = self.last_bulk_edit.undo(self.store)
+        self.last_bulk_edit = None
+        self.edit_menu.entryconfig("Undo Bulk Edit", state="disabled")
+        # Rows the bulk edit alone had touched are back to their source text, so they're no longer
+        # edited; unsaved only if the bulk edit has been saved since
+        restored = set(undone.rows)
+        self.edited_rows -= restored & self.bulk_first_edits
+        clean = restored & self.bulk_first_unsaved
+        self.unsaved_rows -= clean
+        self.unsaved_rows |= restored - clean
+        self.bulk_first_edits = set()
+        self.bulk_first_unsaved = set()
+        self.search_index.cells_changed(undone.column_id, undone.rows, undone.old_ids, undone.new_ids)
+        self.table.refresh()
+        self.status_label.config(text=f"Undid bulk edit: {len(undone):,} cell(s) restored")
 
     def save_xml(self):
-        if not self.tree:
-            messagebox.showwarning("No Data", "No XML file loaded or data is empty.")
+        if not self._can_save():
             return
         
-        modified_count = 0
-        for el, data_dict in self.data: # Iterate over the original self.data
-            if el.get("gui_edited") == "true":
-                modified_count +=1
-                for tag, value_str in data_dict.items():
-                    child = el.find(tag)
-                    if child is None and value_str: # Create if doesn't exist and has content
-                        child = ET.SubElement(el, tag)
-                    if child is not None: # Update if exists (or was just created)
-                        child.text = value_str
-                el.set("processed", "true") # Original logic
-                del el.attrib["gui_edited"] # Clean up temp flag
-        
-        if modified_count == 0:
+        if not self.unsaved_rows:
             messagebox.showinfo("No Changes", "No changes detected to save.")
             return
 
         try:
+            # The source file is never modified, so every edit since loading is written each time.
+            # Unchanged rows are copied from it byte for byte; only edited rows are re-serialised.
             out_path = self.file_path.replace(".xml", "_edited.xml")
-            self.tree.write(out_path, encoding="utf-8", xml_declaration=True)
+            offsets = self._get_row_offsets()
+            if offsets is not None:
+                write_edited(offsets, out_path, self.store, self.edited_rows)
+            else:
+                self._write_full_tree(out_path)
+            modified_count = len(self.edited_rows)
+            self.unsaved_rows.clear()
+            self.bulk_first_unsaved = set()
             messagebox.showinfo("Saved", f"✅ Saved {modified_count} modified row(s) to:\n{out_path}")
         except Exception as e:
             messagebox.showerror("Save Error", f"Failed to save XML: {e}")
 
+    def _write_full_tree(self, out_path):
+        """Slow path for files whose rows RowOffsets can't match up: parse, patch and rewrite the whole tree."""
+        tree = ET.parse(self.file_path)
+        rows = tree.getroot().findall(ROW_TAG)
+        for row in sorted(self.edited_rows):
+            el = rows[row]
+            for tag, value_str in self.store.row_items(row):
+                child = el.find(tag)
+                if child is None and value_str: # Create if doesn't exist and has content
+                    child = ET.SubElement(el, tag)
+                if child is not None: # Update if exists (or was just created)
+                    child.text = value_str
+            el.set("processed", "true") # Original logic
+        tree.write(out_path, encoding="utf-8", xml_declaration=True)
+
+    def save_patch(self):
+        """Write just the edited rows, with their row numbers, to a small changes file."""
+        if not self._can_save():
+            return
+        if not self.edited_rows:
+            messagebox.showinfo("No Changes", "No changes detected to save.")
+            return
+        out_path = filedialog.asksaveasfilename(
+            defaultextension=".xml", filetypes=[("XML files", "*.xml")],
+            initialfile=os.path.basename(self.file_path).replace(".xml", "_changes.xml"),
+            initialdir=os.path.dirname(self.file_path))
+        if not out_path:
+            return
+        try:
+            offsets = self._get_row_offsets()
+            if offsets is None:
+                messagebox.showerror("Save Error", "Couldn't match the rows in the source file, so no changes file was written.")
+                return
+            write_patch(offsets, out_path, self.store, self.edited_rows)
+            messagebox.showinfo("Saved", f"✅ Saved {len(self.edited_rows)} changed row(s) to:\n{out_path}")
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save changes: {e}")
+
     def apply_search(self):
-        query = self.search_entry.get().lower().strip()
+        query = self.search_entry.get().strip()
         field = self.search_field.get()
+        mode = SEARCH_MODE_LABELS[self.search_mode.get()]
 
         if not query:
-            self.filtered_data = list(self.data)
-        elif field == "(All Fields)":
-            self.filtered_data = [
-                (el, d) for el, d in self.data
-                if any(query in str(v or "").lower() for v in d.values())
-            ]
+            self.filtered_data = range(self.store.row_count)
         else:
-            self.filtered_data = [
-                (el, d) for el, d in self.data
-                if query in str(d.get(field, "") or "").lower()
-            ]
-        self.page = 0
+            started = time.perf_counter()
+            column = None if field in ("", "(All Fields)") else field
+            self.filtered_data = self.search_index.search(query, column, mode)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            note = "" if self.search_index.ready else " (index still building)"
+            self.status_label.config(text=f"{len(self.filtered_data):,} matching rows in {elapsed_ms:.0f} ms{note}")
+        self.search_active = bool(query)
         self._update_displayed_data()
 
     def clear_search(self):
         self.search_entry.delete(0, tk.END)
-        self.filtered_data = list(self.data)
-        self.page = 0
+        self.filtered_data = range(self.store.row_count)
+        self.search_active = False
         self._update_displayed_data()
 
     def on_column_visibility_change(self):
         self.visible_headers = [h for h in self.headers if self.column_vars.get(h) and self.column_vars[h].get()]
-        self.page = 0
-        self._build_display_grid() # Rebuild grid if column structure changes
+        self._build_display_grid() # Only the header list changes; nothing is rebuilt
 
     def next_page(self):
-        max_page = (len(self.filtered_data) - 1) // ROWS_PER_PAGE
-        if self.page < max_page:
-            self.page += 1
-            self._update_displayed_data()
+        self.table.yview("scroll", 1, "pages")
 
     def prev_page(self):
-        if self.page > 0:
-            self.page -= 1
-            self._update_displayed_data()
-
-    def _on_unified_horizontal_scroll(self, *args):
-        "Called when the unified horizontal scrollbar is moved."
-        self.header_canvas.xview(*args)
-        self.data_canvas.xview(*args)
+        self.table.yview("scroll", -1, "pages")
 
 if __name__ == "__main__":
     TricksterXMLEditor()
\ No newline at end of file
@@ -0,0 +1,95 @@
+import os
+
+from PIL import Image
+
+
+def output_filename_for(source_path):
+    """Name of the BMP written for source_path (same base name, .bmp extension)."""
+    base, _ = os.path.splitext(os.path.basename(source_path))
+    return base + ".bmp"
+
+
+def render_centered(image, center_x, center_y, target_w, target_h, bg_color):
+    """Place image on an opaque target_w x target_h canvas with (center_x, center_y) in the middle.
+
+    This is the crop/paste math used for every saved output, shared by the app
+    and the headless batch CLI so both produce identical files. bg_color is an
+    (r, g, b[, a]) tuple; its alpha is ignored and the canvas is always opaque.
+    Returns the RGBA result.
+    """
+    return flatten_window(image, center_x - target_w // 2, center_y - target_h // 2,
+                          target_w, target_h, bg_color)
+
+
+def flatten_window(image, left, top, width, height, bg_color):
+    """Composite the source window at (left, top) of the given size onto bg_color."""
+    r, g, b = bg_color[:3]
+    result = Image.new("RGBA", (width, height), (r, g, b, 255))
+
+    from_x = max(0, left)
+    from_y = max(0, top)
+    to_x = min(image.width, left + width)
+    to_y = min(image.height, top + height)
+
+    if from_x < to_x and from_y < to_y:
+        cropped = image.crop((from_x, from_y, to_x, to_y))
+        paste_x = max(0, -left)
+        paste_y = max(0, -top)
+        if cropped.mode == 'RGBA':
+            # Use the alpha band as the mask so transparency becomes bg_color
+            result.paste(cropped, (paste_x, paste_y), mask=cropped.split()[3])
+        else:
+            result.paste(cropped, (paste_x, paste_y))
+    return result
+
+
+def render_centered_multi(image, center_x, center_y, target_sizes, bg_color):
+    """Render every size in target_sizes around the same center in one pass.
+
+    The source is composited onto bg_color once, over the union of all the
+    target windows; each size is then cut straight out of that flattened
+    buffer. Compositing is per pixel, so every result is pixel-identical to
+    render_centered for the same size. Returns {(w, h): image}.
+    """
+    sizes = list(dict.fromkeys((int(w), int(h)) for w, h in target_sizes))
+    if len(sizes) == 1:
+        w, h = sizes[0]
+        return {sizes[0]: render_centered(image, center_x, center_y, w, h, bg_color)}
+
+    # Window of each size in source coordinates: output (0, 0) is source (left, top)
+    windows = {(w, h): (center_x - w // 2, center_y - h // 2) for w, h in sizes}
+    union_left = min(left for left, _ in windows.values())
+    union_top = min(top for _, top in windows.values())
+    union_right = max(left + w for (w, _), (left, _) in windows.items())
+    union_bottom = max(top + h for (_, h), (_, top) in windows.items())
+
+    if (union_right - union_left) * (union_bottom - union_top) > sum(w * h for w, h in sizes):
+        # Very different aspect ratios: one shared buffer would cost more than separate renders
+        return {(w, h): render_centered(image, center_x, center_y, w, h, bg_color) for w, h in sizes}
+
+    flat = flatten_window(image, union_left, union_top,
+                          union_right - union_left, union_bottom - union_top, bg_color)
+
+    results = {}
+    for (w, h), (left, top) in windows.items():
+        x0 = left - union_left
+        y0 = top - union_top
+        results[(w, h)] = flat.crop((x0, y0, x0 + w, y0 + h))
+    return results
+
+
+def export_image(image, center_x, center_y, target_sizes, bg_color, output_folder, output_filename):
+    """Render and save image once per target size into output_folder/WxH/output_filename.
+
+    Returns the list of written paths. Errors propagate to the caller.
+    """
+    rendered = render_centered_multi(image, center_x, center_y, target_sizes, bg_color)
+    written = []
+    for target_w, target_h in target_sizes:
+        result = rendered[(int(target_w), int(target_h))]
+        resolution_folder = os.path.join(output_folder, f"{target_w}x{target_h}")
+        os.makedirs(resolution_folder, exist_ok=True)
+        output_path = os.path.join(resolution_folder, output_filename)
+        result.save(output_path)
+        written.append(output_path)
+    return written
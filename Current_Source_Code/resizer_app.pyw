@@ -11,11 +11,28 @@ import re # <<< ENSURE re IS IMPORTED >>>
 from tkinter import ttk
 import traceback
 import logging
-from io import StringIO
+import logging.handlers
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from utils import rgb_to_hex, resource_path
 from resolution_picker import ResolutionPicker
 from config import TARGET_SIZE, OUTPUT_FOLDER, SHOW_BG_COLOR_BOX, BG_COLOR_BOX_POSITION
 from stats_manager import StatsManager
+from image_cache import ImageCache
+from image_prefetcher import ImagePrefetcher
+from viewport_renderer import compute_viewport, render_viewport, draw_pixel_grid
+from render_core import render_centered_multi, output_filename_for
+from manifest import ExportManifest
+from export_ledger import ExportLedger, find_next_changed, render_params
+from output_writer import OutputWriter
+from preview_engine import PreviewEngine
+from image_analysis import ImageAnalyzer
+from folder_scan import FolderScanner
+from log_console import RingBufferHandler, LogConsole
+from profiler import profiler
+from profiler_hud import CountingCanvas, ProfilerHUD
+from crosshair import CrosshairPool, arm_pixels, negative_colors
 
 def get_base_path():
     if getattr(sys, 'frozen', False):
@@ -24,10 +41,17 @@ def get_base_path():
         return os.path.dirname(__file__)
 
 class ImageResizerApp:
-    def __init__(self, root, manual_contents=None): # <<< MODIFIED to accept manual_contents >>>
-        """Initialize the application."""
+    def __init__(self, root, manual_contents=None, started_at=None):
+        """Initialize the application.
+
+        Only the menus and the main canvas are built here; the debug console,
+        manual, statistics, pickers and preview windows are created when first
+        opened. started_at is the launcher's time.perf_counter() at launch,
+        used for the startup time measurement.
+        """
         try:
             # Basic window and state variables
+            self.started_at = started_at if started_at is not None else time.perf_counter()
             self.root = root
             self.root.title("Image Resizer")
             self.root.geometry("800x600")
@@ -35,11 +59,27 @@ class ImageResizerApp:
             self.manual_content_data = manual_contents # <<< ADDED: Store manual content >>>
             
             # Image-related variables
+            self.image_cache = ImageCache()
+            self.image_analyzer = ImageAnalyzer()  # Center suggestions and background detection
+            self.prefetcher = ImagePrefetcher(self.image_cache, analyzer=self.image_analyzer)
             self.image_paths = []
             self.current_index = 0
+            self.folder_scanner = FolderScanner()
+            self.scan_in_progress = False
+            self.scan_poll_job = None
             self.current_image = None
+            self.current_image_key = None  # (path, mtime_ns) of current_image in the image cache
+            self.base_image = None
             self.display_image = None
             self.tk_image = None
+            self.display_width = 0
+            self.display_height = 0
+            self.viewport = None
+            self.rendered_rect = None
+            self.pan_render_margin = 256  # Extra pixels rendered around the canvas for panning
+            self.pending_pan_dx = 0
+            self.pending_pan_dy = 0
+            self.pan_frame_job = None
             self.zoom_level = 1.0
             self.scroll_x = 0
             self.scroll_y = 0
@@ -59,10 +99,11 @@ class ImageResizerApp:
             # Track cursor position for crosshair
             self.cursor_x = 0
             self.cursor_y = 0
+            self.preview_engine = PreviewEngine()
+            self.preview_frame_job = None  # Pending coalesced crop preview update
             
             # Grid and crosshair variables
-            self.grid_lines = []
-            self.last_crosshair_ids = []
+            self.crosshair_pool = None  # CrosshairPool, created with the canvas
             self.grid_size = 1  # Changed from 10 to 1 for 1x1 pixel grid
             
             # New crosshair variables
@@ -130,9 +171,9 @@ class ImageResizerApp:
             # UI elements
             self.log_window = None
             self.log_text = None
-            self.log_buffer = None
+            self.log_handler = None
+            self.log_console = None
             self.logger = None
-            self.debug_menu = None
             self.file_menu = None
             self.options_menu = None
             self.preview_menu = None
@@ -153,7 +194,16 @@ class ImageResizerApp:
             # --- Removed self.mouse_mode_var initialization --- 
             self.preview_mode_var = tk.StringVar(value="Off")
             self.show_grid_var = tk.BooleanVar(value=False)
+            self.auto_center_var = tk.BooleanVar(value=False)
+            self.auto_center = False
+            self.auto_bg_var = tk.BooleanVar(value=False)
+            self.auto_bg = False
+            self.center_suggestion = None  # (x, y) suggested for the current image
+            self.center_suggestion_bg = None  # bg colour the suggestion was computed with
             self.show_crosshair_var = tk.BooleanVar(value=False)
+            self.debug_logging_var = tk.BooleanVar(value=False)  # DEBUG-level records off by default
+            self.profiler_var = tk.BooleanVar(value=False)
+            self.profiler_hud = None
             self.grid_color_mode = tk.StringVar(value="custom")
             self.bg_color_toggle_var = tk.BooleanVar(value=SHOW_BG_COLOR_BOX)
             self.grid_color_var = tk.StringVar(value="black")
@@ -176,6 +226,12 @@ class ImageResizerApp:
             # Initialize stats manager
             print("DEBUG INIT: Before StatsManager initialization") # ADDED
             self.stats_manager = StatsManager()
+            self.export_manifest = None  # ExportManifest for the current output folder
+            self.export_ledger = None  # ExportLedger for the current output folder
+            # Source hashing for the ledger runs here, never on the Tk thread
+            self.ledger_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ledger")
+            self.changed_search = None  # (future, cancel event, start index) while next_changed_image runs
+            self.output_writer = OutputWriter()
             print("DEBUG INIT: After StatsManager initialization") # ADDED
         
             # Set up logging
@@ -190,8 +246,9 @@ class ImageResizerApp:
             print("DEBUG INIT: After create_menu") # ADDED
             
             # Create the canvas
-            self.canvas = tk.Canvas(self.root, bg="gray")
+            self.canvas = CountingCanvas(self.root, bg="gray")
             self.canvas.pack(fill=tk.BOTH, expand=True)
+            self.crosshair_pool = CrosshairPool(self.canvas)
             
             # Initialize color frame and label references (but don't create them yet)
             self.color_frame = None
@@ -226,6 +283,7 @@ class ImageResizerApp:
             # Bind keyboard shortcuts
             self.root.bind("<Left>", lambda e: self.prev_image())
             self.root.bind("<Right>", lambda e: self.next_image())
+            self.root.bind("<Control-Right>", lambda e: self.next_changed_image())
             self.root.bind("<Control-o>", lambda e: self.prompt_open_file_or_folder())
             self.root.bind("<Control-O>", lambda e: self.prompt_open_file_or_folder())
             self.root.bind("<Control-s>", lambda e: self.save_image())
@@ -239,12 +297,18 @@ class ImageResizerApp:
             self.root.bind("<Control-plus>", self.zoom_in)
             self.root.bind("<Control-equal>", self.zoom_in)
             self.root.bind("<Control-minus>", self.zoom_out)
+            self.root.bind("<Return>", self.accept_center_suggestion)
+
+            # Closing the window goes through quit_app so queued outputs are saved
+            self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
+            self.root.after(250, self.poll_output_errors)
             
             # Adjust frames
             self.adjust_frames()
             
             # Force update of the display
             self.root.update_idletasks()
+            self.record_startup_time()
             
             # First prompt user for target size
             # self.ask_target_size() # Old call
@@ -299,7 +363,7 @@ class ImageResizerApp:
         """Activate eyedropper mode for color picking."""
         try:
             self.eyedropper_active = True
-            self.root.title("Image Resizer [Eyedropper Active]")
+            self.update_title()
             if hasattr(self, 'bg_color_label') and self.bg_color_label:
                 self.bg_color_label.config(text="🎯 Pick Color", bg="yellow")
             self.logger.info("Eyedropper mode activated")
@@ -307,12 +371,23 @@ class ImageResizerApp:
         except Exception as e:
             self.logger.warning(f"Error activating eyedropper: {str(e)}")
 
+    def update_title(self):
+        """Show the image counter (and scan/eyedropper state) in the window title."""
+        title = "Image Resizer"
+        if self.image_paths:
+            title += f" - {self.current_index + 1}/{len(self.image_paths)}"
+        if self.scan_in_progress:
+            title += " (scanning...)"
+        if self.eyedropper_active:
+            title += " [Eyedropper Active]"
+        self.root.title(title)
+
     def cancel_eyedropper(self, event=None):
         """Cancel eyedropper mode."""
         try:
             if self.eyedropper_active:
                 self.eyedropper_active = False
-                self.root.title("Image Resizer")
+                self.update_title()
                 # Use the centralized method to update the display
                 self.update_bg_color_display()
                 self.logger.info("Eyedropper mode cancelled")
@@ -370,31 +445,124 @@ class ImageResizerApp:
             self.logger.warning(f"Error resetting background color: {str(e)}")
 
     def toggle_auto_center(self, event=None):
-        """Toggle automatic center selection."""
+        """Toggle automatic center suggestions (marked on the image, Enter to accept)."""
         try:
-            self.auto_center = not self.auto_center
-            
-            if self.auto_center and self.current_image:
-                # Get the center coordinates
-                center_x = self.current_image.width // 2
-                center_y = self.current_image.height // 2
-                
-                # Handle the crop click at the center
-                self.handle_crop_click(center_x, center_y)
-                
+            if event is not None:  # From a key binding rather than the menu checkbutton
+                self.auto_center_var.set(not self.auto_center_var.get())
+            self.auto_center = self.auto_center_var.get()
+            self.restart_image_analysis()
+            self.update_image_analysis()
+            self.render_view()
+
             self.logger.info(f"Auto center toggled to {self.auto_center}")
             
         except Exception as e:
             self.logger.warning(f"Error toggling auto center: {str(e)}")
 
+    def toggle_auto_bg(self, event=None):
+        """Toggle pre-filling the background colour from each image's border."""
+        try:
+            if event is not None:
+                self.auto_bg_var.set(not self.auto_bg_var.get())
+            self.auto_bg = self.auto_bg_var.get()
+            self.restart_image_analysis()
+            self.update_image_analysis(apply_bg=True)
+            self.update_bg_color_display()
+            self.render_view()
+
+            self.logger.info(f"Auto background detection toggled to {self.auto_bg}")
+
+        except Exception as e:
+            self.logger.warning(f"Error toggling auto background: {str(e)}")
+
+    def restart_image_analysis(self):
+        """Point the analyzer at the current options and colour and restart its folder pass."""
+        active = self.auto_center or self.auto_bg
+        self.image_analyzer.configure(self.bg_color, detect_bg=self.auto_bg, active=active)
+        if active and self.image_paths:
+            # Work out the rest of the folder in the background, starting here
+            self.image_analyzer.start(self.image_paths, self.current_index)
+        else:
+            self.image_analyzer.cancel()
+
+    def update_image_analysis(self, apply_bg=False):
+        """Look up (or compute) the analysis of the current image.
+
+        Sets the suggested center, and with apply_bg the detected background
+        colour, when those options are on.
+        """
+        self.center_suggestion = None
+        if (self.auto_center or self.auto_bg) and self.current_image and self.image_paths:
+            img_path = self.image_paths[self.current_index]
+            result = self.image_analyzer.get(img_path)
+            if result is None:
+                # Background pass hasn't got here yet; the image is already decoded, so do it now
+                result = self.image_analyzer.analyse_now(img_path, self.current_image)
+            if apply_bg and self.auto_bg and result.get("bg_color"):
+                self.bg_color = tuple(result["bg_color"]) + (255,)
+            if self.auto_center:
+                self.center_suggestion = result["center"]
+                self.logger.debug("Suggested center for %s: %s (%s)", os.path.basename(img_path), result['center'], result['method'])
+        self.center_suggestion_bg = tuple(self.bg_color[:3])
+
+    def draw_center_suggestion(self):
+        """Mark the suggested center on the canvas so a single click or Enter confirms it."""
+        self.canvas.delete("suggestion")
+        if not self.center_suggestion or not self.current_image or not self.display_width:
+            return
+        sx, sy = self.center_suggestion
+        scale_x = self.display_width / self.current_image.width
+        scale_y = self.display_height / self.current_image.height
+        img_left = self.image_x - (self.display_width // 2)
+        img_top = self.image_y - (self.display_height // 2)
+        cx = img_left + (sx + 0.5) * scale_x
+        cy = img_top + (sy + 0.5) * scale_y
+        r = max(6, scale_x)
+        self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, outline="white", width=3, tags=("suggestion",))
+        self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, outline="black", width=1, tags=("suggestion",))
+
+    def accept_center_suggestion(self, event=None):
+        """Process the current image at the suggested center."""
+        if self.center_suggestion and self.current_image:
+            self.handle_crop_click(*self.center_suggestion)
+
     def setup_logging(self):
-        """Setup logging system with both file and console output."""
+        """Setup logging system with both file and console output.
+
+        The Debug Console window itself is only built when first opened
+        (get_log_console); until then records just collect in the ring buffer.
+        """
+        # Keep the last records in memory for the console; it only reads them while shown
+        self.log_handler = RingBufferHandler(capacity=5000)
+
+        # Setup logging. DEBUG records are dropped before formatting unless debug logging is on.
+        self.logger = logging.getLogger('ImageResizer')
+        self.logger.setLevel(logging.DEBUG if self.debug_logging_var.get() else logging.INFO)
+
+        # Create handlers
+        file_handler = logging.handlers.RotatingFileHandler('resizer_debug.log', maxBytes=5 * 1024 * 1024,
+                                                            backupCount=3, encoding='utf-8')
+
+        # Create formatters
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        self.log_handler.setFormatter(formatter)
+        file_handler.setFormatter(formatter)
+
+        # Add handlers
+        self.logger.addHandler(self.log_handler)
+        self.logger.addHandler(file_handler)
+
+    def get_log_console(self):
+        """Return the Debug Console, creating its (hidden) window on first use."""
+        if self.log_console is not None and self.log_window.winfo_exists():
+            return self.log_console
+
         # Create a logging window
         self.log_window = tk.Toplevel(self.root)
         self.log_window.title("Debug Console")
         self.log_window.geometry("800x400")
         self.log_window.withdraw()  # Start hidden
-        self.log_window.protocol("WM_DELETE_WINDOW", self.log_window.withdraw) # <<< ADDED protocol handler
+        self.log_window.protocol("WM_DELETE_WINDOW", lambda: self.log_console.hide()) # <<< ADDED protocol handler
         
         # Create text widget for logging
         self.log_text = tk.Text(self.log_window, wrap=tk.WORD)
@@ -427,57 +595,15 @@ class ImageResizerApp:
         copy_button = ttk.Button(button_frame_log, text="Copy to Clipboard", command=copy_log_to_clipboard)
         copy_button.pack(side=tk.RIGHT, padx=10)
         # --- END ADDED ---
-        
-        # Create a string buffer to capture log output
-        self.log_buffer = StringIO()
-        
-        # Setup logging
-        self.logger = logging.getLogger('ImageResizer')
-        self.logger.setLevel(logging.DEBUG)
-        
-        # Create handlers
-        console_handler = logging.StreamHandler(self.log_buffer)
-        file_handler = logging.FileHandler('resizer_debug.log')
-        
-        # Create formatters
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(formatter)
-        file_handler.setFormatter(formatter)
-        
-        # Add handlers
-        self.logger.addHandler(console_handler)
-        self.logger.addHandler(file_handler)
-        
-        # Add a method to update the log window
-        def update_log():
-            try:
-                # Only update if the log window and text widget both exist
-                if hasattr(self, 'log_window') and self.log_window and self.log_window.winfo_exists() and \
-                   hasattr(self, 'log_text') and self.log_text and self.log_text.winfo_exists():
-                    self.log_text.delete(1.0, tk.END)
-                    self.log_text.insert(tk.END, self.log_buffer.getvalue())
-                    self.log_text.see(tk.END)
-                # Continue updating regardless
-                self.root.after(100, update_log)
-            except Exception as e:
-                # If there's an error, try again later but don't crash
-                print(f"Error updating log: {str(e)}")
-                self.root.after(1000, update_log)  # Longer delay to avoid spamming errors
-        
-        # Start updating the log window
-        self.root.after(100, update_log)
-        
-        # Add a method to toggle the log window
-        def toggle_log_window():
-            if self.log_window.state() == 'withdrawn':
-                self.log_window.deiconify()
-            else:
-                self.log_window.withdraw()
-        
-        # Add debug menu to the main menu bar
-        self.debug_menu = tk.Menu(self.root)
-        self.root.config(menu=self.debug_menu)
-        self.debug_menu.add_command(label="🛠️ Toggle Debug Console", command=toggle_log_window)
+
+        self.log_console = LogConsole(self.log_window, self.log_text, self.log_handler, max_lines=5000)
+        return self.log_console
+
+    def record_startup_time(self):
+        """Log the time from launch until the main window was built and keep it in the stats."""
+        seconds = time.perf_counter() - self.started_at
+        self.logger.info(f"Startup: main window ready in {seconds * 1000:.0f} ms")
+        self.stats_manager.record_startup(seconds)
 
     def handle_error(self, error, context=""):
         """Handle errors and log them with context."""
@@ -485,7 +611,7 @@ class ImageResizerApp:
         self.logger.error(error_msg)
         self.logger.error(traceback.format_exc())
         messagebox.showerror("Error", f"{error_msg}\n\nCheck the debug console for details.")
-        self.log_window.deiconify()  # Show the debug console
+        self.get_log_console().show()  # Show the debug console
 
     def create_menu(self):
         """Create the application menu."""
@@ -500,11 +626,12 @@ class ImageResizerApp:
             file_menu = tk.Menu(menubar, tearoff=0)
             menubar.add_cascade(label="📁 File", menu=file_menu)
             file_menu.add_command(label="📂 Open...", command=self.prompt_open_file_or_folder)
+            file_menu.add_command(label="⏭️ Next New/Changed Image", command=self.next_changed_image)
             file_menu.add_separator()
             file_menu.add_command(label="📏 Change Resolution...", command=self.ask_target_size)
             file_menu.add_command(label="📁 Change Output Folder...", command=self.change_output_folder)
             file_menu.add_separator()
-            file_menu.add_command(label="❌ Exit", command=self.root.quit)
+            file_menu.add_command(label="❌ Exit", command=self.quit_app)
             print("DEBUG create_menu: After File menu") # ADDED
             
             # Options menu
@@ -528,12 +655,15 @@ class ImageResizerApp:
             mouse_menu.add_separator()
             mouse_menu.add_checkbutton(label="👁️ Show Crosshair", variable=self.show_crosshair_var, command=self.toggle_crosshair)
             mouse_menu.add_command(label="🔧 Crosshair Options...", command=self.crosshair_options_dialog)
+            mouse_menu.add_separator()
+            mouse_menu.add_checkbutton(label="🎯 Suggest Center", variable=self.auto_center_var, command=self.toggle_auto_center)
             
             # Color Box menu
             color_box_menu = tk.Menu(options_menu, tearoff=0)
             options_menu.add_cascade(label="🎨 Color Box", menu=color_box_menu)
             color_box_menu.add_checkbutton(label="Show Color Box", variable=self.bg_color_toggle_var, command=lambda: self.toggle_bg_color_box())
             color_box_menu.add_separator()
+            color_box_menu.add_checkbutton(label="Auto-detect Background", variable=self.auto_bg_var, command=self.toggle_auto_bg)
             color_box_menu.add_command(label="Change Settings...", command=self.bg_color_settings_dialog)
             
             # Preview menu
@@ -571,6 +701,9 @@ class ImageResizerApp:
             help_menu.add_command(label="📒 Manual", command=self.show_manual)
             help_menu.add_separator()
             help_menu.add_command(label="🛠️ Toggle Debug Console", command=self.toggle_log_window)
+            help_menu.add_checkbutton(label="🐞 Debug Logging", variable=self.debug_logging_var, command=self.toggle_debug_logging)
+            help_menu.add_checkbutton(label="⏱️ Profiler Overlay", variable=self.profiler_var, command=self.toggle_profiler)
+            help_menu.add_command(label="💾 Export Profile...", command=self.export_profile)
             print("DEBUG create_menu: After Help menu") # ADDED
             
             # Store menu references
@@ -592,10 +725,42 @@ class ImageResizerApp:
 
     def toggle_log_window(self):
         """Toggle the visibility of the debug console."""
-        if self.log_window.state() == 'withdrawn':
-            self.log_window.deiconify()
+        self.get_log_console().toggle()
+
+    def toggle_profiler(self):
+        """Start timing the hot paths and show the overlay, or stop both."""
+        if self.profiler_hud is None:
+            self.profiler_hud = ProfilerHUD(self.canvas)
+        if self.profiler_var.get():
+            profiler.enable()
+            self.profiler_hud.show()
         else:
-            self.log_window.withdraw()
+            profiler.disable()
+            self.profiler_hud.hide()
+        self.logger.info(f"Profiler {'enabled' if self.profiler_var.get() else 'disabled'}.")
+
+    def export_profile(self):
+        """Save the recorded spans as a Chrome trace file."""
+        if not profiler.trace:
+            messagebox.showinfo("Export Profile", "Nothing recorded yet. Turn on Help > Profiler Overlay first.",
+                                parent=self.root)
+            return
+        path = filedialog.asksaveasfilename(parent=self.root, title="Export Profile", defaultextension=".json",
+                                            initialfile=f"resizer_profile_{datetime.now():%Y%m%d_%H%M%S}.json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if not path:
+            return
+        try:
+            samples = profiler.export_trace(path)
+            self.logger.info(f"Exported {samples} profiler samples to {path}")
+        except OSError as e:
+            self.logger.error(f"Could not export profile: {e}")
+            messagebox.showerror("Export Profile", f"Could not export profile: {e}", parent=self.root)
+
+    def toggle_debug_logging(self):
+        """Switch DEBUG records on or off; when off they are discarded before being formatted."""
+        self.logger.setLevel(logging.DEBUG if self.debug_logging_var.get() else logging.INFO)
+        self.logger.info(f"Debug logging {'enabled' if self.debug_logging_var.get() else 'disabled'}.")
 
     def update_crosshair_menu_state(self):
         """Update the state of crosshair menu items."""
@@ -630,10 +795,9 @@ class ImageResizerApp:
                 print(f"Error updating crosshair menu state: {str(e)}")
 
     def clear_crosshair(self):
-        """Clear all crosshair elements."""
-        for crosshair_id in self.last_crosshair_ids:
-            self.canvas.delete(crosshair_id)
-        self.last_crosshair_ids = []
+        """Hide the crosshair; its canvas items are kept for reuse."""
+        if self.crosshair_pool:
+            self.crosshair_pool.hide()
 
     def toggle_crosshair(self):
         """Toggle the crosshair visibility."""
@@ -649,6 +813,7 @@ class ImageResizerApp:
         # Update the display
         self.root.update_idletasks()
 
+    @profiler.timed("update_crosshair")
     def update_crosshair(self):
         """Update the crosshair based on current mode."""
         if self.show_crosshair_var.get():
@@ -698,6 +863,14 @@ class ImageResizerApp:
                     bg=magenta_color,
                     fg="white" if self.is_dark_color(magenta_color) else "black"
                 ) # <--- and this line (and the one in between)
+
+            # Centroid suggestions for opaque images depend on the background colour
+            # (with auto-detect on they are measured against the detected colour instead)
+            if self.auto_center and not self.auto_bg and self.current_image and \
+               self.center_suggestion_bg != tuple(self.bg_color[:3]):
+                self.restart_image_analysis()
+                self.update_image_analysis()
+                self.draw_center_suggestion()
             
             # Force update of the layout
             self.root.update_idletasks()
@@ -823,45 +996,67 @@ class ImageResizerApp:
                     messagebox.showwarning("Resolution Not Changed", "Resolution selection was cancelled. Using previous settings.", parent=self.root)
              return True # Indicate continue even if warning was shown
 
+    @profiler.timed("show_image")
     def show_image(self):
         if not self.image_paths:
             return
         img_path = self.image_paths[self.current_index]
-        self.current_image = Image.open(img_path).convert("RGBA")
-
-        self.display_image = self.current_image.copy()
 
         screen_width = self.root.winfo_screenwidth() - 100
         screen_height = self.root.winfo_screenheight() - 100
         max_display_size = (screen_width, screen_height)
 
-        try:
-            resample_filter = Image.Resampling.LANCZOS
-        except AttributeError:
-            resample_filter = Image.ANTIALIAS
-
-        # First create the base thumbnail
-        self.display_image.thumbnail(max_display_size, resample_filter)
+        # Decoded pixels and the base thumbnail come from the cache, so pan/zoom
+        # redraws never go back to disk. Cached images are shared: never mutate them.
+        self.prefetcher.wait(img_path)
+        cached = self.image_cache.get(img_path, max_display_size)
+        self.current_image = cached.image
+        self.current_image_key = (cached.path, cached.mtime)
+        self.base_image = cached.thumbnail
+        self.current_decode_seconds = cached.decode_seconds
+
+        # Start decoding the neighbours while the user is aiming
+        self.prefetcher.schedule(self.image_paths, self.current_index, max_display_size)
+        if self.changed_search is not None and self.changed_search[2] != self.current_index:
+            self.cancel_changed_search()  # Moved on while searching
+        self.warm_source_hash(img_path)
 
         # Store the base size for zoom calculations
-        self.base_width = self.display_image.width
-        self.base_height = self.display_image.height
-
-        # Apply zoom
-        if self.zoom_level != 1.0:
-            new_width = int(self.base_width * self.zoom_level)
-            new_height = int(self.base_height * self.zoom_level)
-            # Ensure minimum size of 1x1 for resized image
-            new_width = max(1, new_width)
-            new_height = max(1, new_height)
-            self.display_image = self.display_image.resize((new_width, new_height), resample_filter)
+        self.base_width = self.base_image.width
+        self.base_height = self.base_image.height
 
-        try:
-            self.tk_image = ImageTk.PhotoImage(self.display_image)
-            self.canvas.delete("all")
+        # Update the bg color label, then draw the visible part of the image
+        self.update_image_analysis(apply_bg=True)
+        self.update_bg_color_display()
+        self.update_title()
+        if self.render_view():
+            # Force update of the display
+            self.root.update_idletasks()
+            self.root.update()
+        self.image_shown_at = time.perf_counter()  # Start of the show-to-click time in the stats
 
-            # Update the display including both canvas and bg color label
-            self.update_bg_color_display()
+    @profiler.timed("render_view")
+    def render_view(self):
+        """Redraw the visible part of the current image for the current zoom and scroll.
+
+        Only the rectangle that is actually on the canvas is cropped from the
+        cached source and scaled, so the PhotoImage is never bigger than the
+        canvas regardless of zoom level. Returns False if drawing failed.
+        """
+        # A full redraw already reflects scroll_x/scroll_y; drop any queued pan move
+        if self.pan_frame_job is not None:
+            self.root.after_cancel(self.pan_frame_job)
+            self.pan_frame_job = None
+        self.pending_pan_dx = 0
+        self.pending_pan_dy = 0
+
+        if not self.current_image or self.base_image is None:
+            return False
+
+        try:
+            # Size of the whole image at the current zoom; it is never materialised
+            self.display_width = max(1, int(self.base_width * self.zoom_level))
+            self.display_height = max(1, int(self.base_height * self.zoom_level))
 
             # Get the current canvas size
             canvas_w = self.canvas.winfo_width()
@@ -870,20 +1065,40 @@ class ImageResizerApp:
             # Calculate center position with scroll offset
             self.image_x = canvas_w // 2 + self.scroll_x
             self.image_y = canvas_h // 2 + self.scroll_y
+            img_left = self.image_x - (self.display_width // 2)
+            img_top = self.image_y - (self.display_height // 2)
+
+            self.viewport = compute_viewport(self.display_width, self.display_height,
+                                             img_left, img_top, canvas_w, canvas_h,
+                                             margin=self.pan_render_margin)
+            if self.viewport:
+                self.display_image = render_viewport(self.current_image, self.base_image,
+                                                     (self.display_width, self.display_height), self.viewport)
+                if self.show_grid_var.get():
+                    self.display_image = self.composite_grid(self.display_image)
+                self.tk_image = ImageTk.PhotoImage(self.display_image)
+                profiler.count("PhotoImages created")
+            else:
+                # Panned completely off the canvas
+                self.display_image = None
+                self.tk_image = None
+
+            self.canvas.delete("all")
+            self.crosshair_pool.invalidate()  # Its items went with everything else
+            if self.tk_image:
+                self.canvas.create_image(img_left + self.viewport[0], img_top + self.viewport[1],
+                                         anchor=tk.NW, image=self.tk_image, tags=("viewport",))
+                # Canvas rectangle covered by rendered pixels, used by the pan fast path
+                self.rendered_rect = (img_left + self.viewport[0], img_top + self.viewport[1],
+                                      img_left + self.viewport[2], img_top + self.viewport[3])
+            else:
+                self.rendered_rect = None
 
-            # Create image at center position
-            self.canvas.create_image(self.image_x, self.image_y, anchor=tk.CENTER, image=self.tk_image)
+            self.draw_center_suggestion()
+            return True
 
-            # Update the grid if it's enabled
-            if self.show_grid_var.get():
-                self.update_grid()
-            
-            # Force update of the display
-            self.root.update_idletasks()
-            self.root.update()
-            
         except Exception as e:
-            self.logger.error(f"Error in show_image during PhotoImage creation or display: {str(e)}")
+            self.logger.error(f"Error in render_view during PhotoImage creation or display: {str(e)}")
             self.logger.error(traceback.format_exc())
             self.tk_image = None # Ensure tk_image is None if it failed
             self.canvas.delete("all") # Clear canvas
@@ -898,7 +1113,7 @@ class ImageResizerApp:
                      fill="red", 
                      justify=tk.CENTER
                  )
-            return # Early exit if image display fails critically
+            return False # Early exit if image display fails critically
 
     def handle_mouse_click(self, event):
         """Handle mouse clicks based on current mode."""
@@ -1069,6 +1284,7 @@ class ImageResizerApp:
         else:
             self.logger.warning(f"Background click coordinates ({x},{y}) out of bounds.")
 
+    @profiler.timed("on_mouse_move")
     def on_mouse_move(self, event):
         """Handle mouse movement for crosshair and preview."""
         if not self.current_image:
@@ -1086,121 +1302,11 @@ class ImageResizerApp:
 
         # Handle crosshair
         if self.show_crosshair_var.get():
-            self.clear_crosshair()
-            
-            if self.tk_image and 0 <= img_x < self.current_image.width and 0 <= img_y < self.current_image.height:
+            if self.display_width and 0 <= img_x < self.current_image.width and 0 <= img_y < self.current_image.height:
                 # Snap to the nearest pixel
-                snapped_x = int(img_x)
-                snapped_y = int(img_y)
-                
-                # --- Draw based on crosshair type and size ---
-                cross_type = self.crosshair_type.get()
-                cross_size = 1
-                if cross_type == 'cross':
-                    try:
-                        cross_size = self.crosshair_size.get()
-                        if cross_size < 1: cross_size = 1 # Ensure minimum size of 1
-                    except tk.TclError:
-                        cross_size = 1 # Default to 1 if value is invalid
-                
-                # Calculate the size of a pixel in canvas coordinates
-                pixel_size = max(1, int(self.zoom_level))
-                
-                # Convert snapped image coordinates back to canvas coordinates
-                img_left = self.image_x - (self.tk_image.width() // 2)
-                img_top = self.image_y - (self.tk_image.height() // 2)
-                
-                # --- Helper function to draw a single pixel ---
-                def draw_crosshair_pixel(pixel_x, pixel_y):
-                    # Check if the pixel is within the image bounds
-                    if 0 <= pixel_x < self.current_image.width and 0 <= pixel_y < self.current_image.height:
-                        # Get the color at this position
-                        try:
-                            color = self.current_image.getpixel((pixel_x, pixel_y))
-                        except IndexError:
-                            return # Skip if out of bounds
-                        # Handle potential alpha channel
-                        if isinstance(color, tuple) and len(color) == 4:
-                            color = color[:3] # Use only RGB
-                        elif not isinstance(color, tuple) or len(color) != 3:
-                            # print(f"DEBUG: Unexpected color format at ({pixel_x},{pixel_y}): {color}")
-                            return # Skip this pixel if color format is wrong
- 
-                        # Determine crosshair color
-                        if self.crosshair_use_negative.get():
-                            # Create negative color
-                            neg_color = (255 - color[0], 255 - color[1], 255 - color[2])
-                            crosshair_color = rgb_to_hex(neg_color)
-                            # print(f"DEBUG: Negative Mode: Pixel=({pixel_x},{pixel_y}), OrigColor={color}, NegColor={neg_color}, Hex={crosshair_color}") # DEBUG PRINT
-                        else:
-                            crosshair_color = self.crosshair_color
-                            # print(f"DEBUG: Custom Color Mode: Pixel=({pixel_x},{pixel_y}), Color={crosshair_color}") # DEBUG PRINT
- 
-                        # --- MODIFIED LOGIC FOR CENTERING ---
-                        # Original image dimensions
-                        orig_img_width = self.current_image.width
-                        orig_img_height = self.current_image.height
-
-                        # Displayed tk_image dimensions
-                        tk_img_width = self.tk_image.width()
-                        tk_img_height = self.tk_image.height()
-
-                        # Ensure no division by zero if images are not loaded or have zero dimensions
-                        if orig_img_width == 0 or orig_img_height == 0 or tk_img_width == 0 or tk_img_height == 0:
-                            return 
-
-                        # Actual size of one original image pixel on the canvas
-                        actual_scaled_pixel_w = tk_img_width / orig_img_width
-                        actual_scaled_pixel_h = tk_img_height / orig_img_height
-
-                        # Top-left coordinate of the image on the canvas
-                        img_left_on_canvas = self.image_x - (tk_img_width // 2)
-                        img_top_on_canvas = self.image_y - (tk_img_height // 2)
-                        
-                        # Offset of the target image pixel (pixel_x, pixel_y) from the top-left of the original image, 
-                        # scaled to the display image, giving the top-left of the scaled pixel on the tk_image.
-                        canvas_offset_x_in_tk_image = (pixel_x / orig_img_width) * tk_img_width
-                        canvas_offset_y_in_tk_image = (pixel_y / orig_img_height) * tk_img_height
-
-                        # Top-left coordinate of the specific (pixel_x, pixel_y) on the canvas
-                        top_left_canvas_x = img_left_on_canvas + canvas_offset_x_in_tk_image
-                        top_left_canvas_y = img_top_on_canvas + canvas_offset_y_in_tk_image
-                        
-                        # Center coordinate of the specific (pixel_x, pixel_y)'s scaled representation on the canvas
-                        center_scaled_pixel_cx = top_left_canvas_x + actual_scaled_pixel_w / 2
-                        center_scaled_pixel_cy = top_left_canvas_y + actual_scaled_pixel_h / 2
-
-                        # Size of the visual mark to draw (current crosshair pixel drawing logic)
-                        draw_mark_size = max(1, int(self.zoom_level))
-
-                        # Calculate corners for the mark, centered on the center of the scaled image pixel
-                        x0 = center_scaled_pixel_cx - draw_mark_size / 2
-                        y0 = center_scaled_pixel_cy - draw_mark_size / 2
-                        x1 = center_scaled_pixel_cx + draw_mark_size / 2
-                        y1 = center_scaled_pixel_cy + draw_mark_size / 2
-                        # --- END MODIFIED LOGIC ---
- 
-                        crosshair_id = self.canvas.create_rectangle(
-                            x0, y0, x1, y1,
-                            fill=crosshair_color,
-                            outline="" # No outline for single pixels
-                        )
-                        self.last_crosshair_ids.append(crosshair_id)
-                # --- End Helper function ---
- 
-                # --- Draw based on type ---
-                if cross_type == 'pixel':
-                    draw_crosshair_pixel(snapped_x, snapped_y)
-                elif cross_type == 'cross':
-                    # Draw center pixel
-                    draw_crosshair_pixel(snapped_x, snapped_y)
-                    # Draw arms based on size
-                    for i in range(1, cross_size + 1):
-                        draw_crosshair_pixel(snapped_x, snapped_y - i) # Up
-                        draw_crosshair_pixel(snapped_x, snapped_y + i) # Down
-                        draw_crosshair_pixel(snapped_x - i, snapped_y) # Left
-                        draw_crosshair_pixel(snapped_x + i, snapped_y) # Right
-                # --- End Draw based on type ---
+                self.draw_crosshair(int(img_x), int(img_y))
+            else:
+                self.clear_crosshair()
 
         # Handle preview updates
         if self.eyedropper_active:
@@ -1208,8 +1314,57 @@ class ImageResizerApp:
 
         # Update preview windows
         # self.update_preview_windows(img_x, img_y) # OLD CALL
+        self.cursor_x = img_x
+        self.cursor_y = img_y
+        if self.preview_mode_var.get() == "Show Crop Preview" and self.preview_frame_job is None:
+            # Coalesce motion events: previews follow the latest cursor position once per frame
+            self.preview_frame_job = self.root.after(16, self._flush_crop_preview_update)
+
+    @profiler.timed("crosshair")
+    def draw_crosshair(self, snapped_x, snapped_y):
+        """Draw the crosshair over source pixel (snapped_x, snapped_y).
+
+        The pool only moves and recolours its existing rectangles, and nothing
+        at all happens while the snapped pixel (and the view) stay the same.
+        """
+        image = self.current_image
+        cross_size = 0
+        if self.crosshair_type.get() == 'cross':
+            try:
+                cross_size = max(1, self.crosshair_size.get())
+            except tk.TclError:
+                cross_size = 1 # Default to 1 if value is invalid
+        use_negative = self.crosshair_use_negative.get()
+        key = (snapped_x, snapped_y, cross_size, use_negative, self.crosshair_color, id(image),
+               self.image_x, self.image_y, self.display_width, self.display_height, self.zoom_level)
+        if key == self.crosshair_pool.last_key:
+            return
+
+        if image.width == 0 or image.height == 0 or not self.display_width or not self.display_height:
+            return
+        # Size of one source pixel on the canvas, and of the mark drawn on it
+        scaled_w = self.display_width / image.width
+        scaled_h = self.display_height / image.height
+        half_mark = max(1, int(self.zoom_level)) / 2
+        img_left = self.image_x - (self.display_width // 2)
+        img_top = self.image_y - (self.display_height // 2)
+
+        colors = negative_colors(image, snapped_x, snapped_y, cross_size) if use_negative else None
+        rects = []
+        for px, py in arm_pixels(image, snapped_x, snapped_y, cross_size):
+            # Center the mark on the scaled pixel
+            cx = img_left + px * scaled_w + scaled_w / 2
+            cy = img_top + py * scaled_h + scaled_h / 2
+            fill = colors[(px, py)] if colors else self.crosshair_color
+            rects.append((cx - half_mark, cy - half_mark, cx + half_mark, cy + half_mark, fill))
+        self.crosshair_pool.draw(key, rects)
+
+    @profiler.timed("crop_preview")
+    def _flush_crop_preview_update(self):
+        """Run the crop preview update queued by on_mouse_move for the latest cursor position."""
+        self.preview_frame_job = None
         if self.preview_mode_var.get() == "Show Crop Preview":
-            self._update_all_crop_previews_based_on_dialog(img_x, img_y) # NEW CALL
+            self._update_all_crop_previews_based_on_dialog(self.cursor_x, self.cursor_y)
 
     def update_preview_windows(self, center_x=None, center_y=None):
         """This method is now primarily a wrapper or can be deprecated if 
@@ -1229,7 +1384,7 @@ class ImageResizerApp:
             return 
         
         if self.preview_mode_var.get() == "Show Crop Preview":
-            self.logger.debug(f"update_preview_windows: delegating to _update_all_crop_previews_based_on_dialog for {center_x},{center_y}")
+            self.logger.debug("update_preview_windows: delegating to _update_all_crop_previews_based_on_dialog for %s,%s", center_x, center_y)
             self._update_all_crop_previews_based_on_dialog(center_x, center_y)
         else:
             self.logger.debug("update_preview_windows: Called when not in Show Crop Preview mode, doing nothing.")
@@ -1262,6 +1417,8 @@ class ImageResizerApp:
         if self.current_index < len(self.image_paths) - 1:
             self.current_index += 1
             self.show_image()
+        elif self.scan_in_progress:
+            self.logger.info("next_image: at the last image found so far; folder scan still running.")
         else:
             messagebox.showinfo("Done", "All images processed! Click 'Open Folder' to process more images or 'Exit' to quit.")
             # Reset to first image
@@ -1403,6 +1560,7 @@ class ImageResizerApp:
             self.bg_color_reset = None
             return None # Return None on error
 
+    @profiler.timed("last_output_preview")
     def update_last_output_preview(self, width, height):
         """Update the preview window with the last output image."""
         print(f"DEBUG update_last_output_preview: Updating for {width}x{height}")
@@ -1473,7 +1631,15 @@ class ImageResizerApp:
                  canvas = resolution_frame.canvas
 
             # --- Load and Display Image --- 
-            if not os.path.exists(output_path):
+            # Prefer the in-memory result; the file may still be queued in the output writer
+            recent_img = self.output_writer.get_recent(output_path)
+            if recent_img is not None:
+                 photo = ImageTk.PhotoImage(recent_img)
+                 profiler.count("PhotoImages created")
+                 canvas.delete("all")
+                 canvas.create_image(0, 0, anchor=tk.NW, image=photo)
+                 resolution_frame.img = photo # Keep reference
+            elif not os.path.exists(output_path):
                 print(f"DEBUG update_last_output_preview: Path does not exist: {output_path}")
                 self.logger.warning(f"Last Output Preview: Image file not found at {output_path} for resolution {width}x{height}.") # ADDED LOG
                 canvas.delete("all") # Clear the canvas
@@ -1484,6 +1650,7 @@ class ImageResizerApp:
                  img = Image.open(output_path)
                  print(f"DEBUG update_last_output_preview: Creating PhotoImage for {width}x{height}")
                  photo = ImageTk.PhotoImage(img)
+                 profiler.count("PhotoImages created")
                  canvas.delete("all")
                  canvas.create_image(0, 0, anchor=tk.NW, image=photo)
                  resolution_frame.img = photo # Keep reference
@@ -1646,12 +1813,12 @@ class ImageResizerApp:
         self.apply_geometry_safely(self.last_output_window, final_width, final_height)
         self.last_output_window.update_idletasks()
 
+    @profiler.timed("preview_window")
     def update_preview_image(self, idx, center_x, center_y):
         """Update the preview image for a specific window."""
-        self.logger.debug(f"update_preview_image: Called for idx {idx} with coords ({center_x}, {center_y})")
 
         if idx not in self.preview_windows or not self.preview_windows[idx].winfo_exists():
-            self.logger.debug(f"update_preview_image: Window {idx} not found or destroyed (early check).")
+            self.logger.debug("update_preview_image: Window %s not found or destroyed (early check).", idx)
             return
 
         preview_window = self.preview_windows[idx]
@@ -1661,7 +1828,7 @@ class ImageResizerApp:
                 self.logger.warning(f"update_preview_image: Window {idx} missing original dimensions.")
                 try:
                     preview_window.original_width, preview_window.original_height = TARGET_SIZE[idx]
-                    self.logger.debug(f"update_preview_image: Recovered dimensions: {preview_window.original_width}x{preview_window.original_height}")
+                    self.logger.debug("update_preview_image: Recovered dimensions: %sx%s", preview_window.original_width, preview_window.original_height)
                 except (IndexError, TypeError):
                     self.logger.error(f"update_preview_image: Cannot recover dimensions for index {idx}.")
                     return
@@ -1676,6 +1843,11 @@ class ImageResizerApp:
                     self.crop_preview_dialog_vars[idx].set(False)
                 return
 
+            # Nothing to do if the snapped pixel and the flattened image are unchanged
+            preview_key = (center_x, center_y, self.bg_color[:3], self.current_image_key)
+            if getattr(preview_window, 'shown_key', None) == preview_key:
+                return
+
             preview = self.simulate_process_image(center_x, center_y, preview_window.original_width, preview_window.original_height)
 
             if preview is None:
@@ -1685,17 +1857,23 @@ class ImageResizerApp:
                     preview_window.preview_label.image = None
                 return
 
-            # Explicitly master the PhotoImage to the preview_window.
-            # This can help in scenarios where the window is being destroyed,
-            # potentially raising a TclError more reliably if preview_window is invalid.
-            photo = ImageTk.PhotoImage(preview, master=preview_window) 
-
-            if preview_window.winfo_exists() and preview_window.preview_label.winfo_exists():
-                preview_window.preview_label.configure(image=photo, text="")
-                preview_window.preview_label.image = photo
-                self.logger.debug(f"update_preview_image: Label updated for window {idx}")
+            photo = getattr(preview_window.preview_label, 'image', None)
+            if photo is not None and photo.width() == preview.width and photo.height() == preview.height:
+                # Reuse the window's PhotoImage; the label picks up the new pixels
+                photo.paste(preview)
             else:
-                self.logger.warning(f"update_preview_image: Window {idx} or label destroyed before final configure.")
+                # Explicitly master the PhotoImage to the preview_window.
+                # This can help in scenarios where the window is being destroyed,
+                # potentially raising a TclError more reliably if preview_window is invalid.
+                photo = ImageTk.PhotoImage(preview, master=preview_window)
+                profiler.count("PhotoImages created")
+                if preview_window.winfo_exists() and preview_window.preview_label.winfo_exists():
+                    preview_window.preview_label.configure(image=photo, text="")
+                    preview_window.preview_label.image = photo
+                else:
+                    self.logger.warning(f"update_preview_image: Window {idx} or label destroyed before final configure.")
+                    return
+            preview_window.shown_key = preview_key
 
         except tk.TclError as e_tcl:
             self.logger.warning(f"update_preview_image: TclError for window {idx} (likely being destroyed by WM): {str(e_tcl)}")
@@ -1718,67 +1896,14 @@ class ImageResizerApp:
 
     def simulate_process_image(self, cx, cy, target_w, target_h):
         # cx, cy ARE ALREADY the original image coordinates calculated by correct_coordinates
-        print(f"DEBUG simulate_process: Input coords=({cx}, {cy}), Target=({target_w}x{target_h})")
-        # --- ADDED: Safety checks ---
         if not self.current_image:
-            print("ERROR simulate_process: No current image loaded.")
+            self.logger.error("simulate_process_image: No current image loaded.")
             return None
-        # REMOVED tk_image checks as they are not needed here anymore
-
-        # --- Remove Redundant Coordinate conversion section ---
-        # scale_x = self.current_image.width / tk_width # REMOVED
-        # scale_y = self.current_image.height / tk_height # REMOVED
-        # img_left = self.image_x - (tk_width // 2) # REMOVED
-        # img_top = self.image_y - (tk_height // 2) # REMOVED
-        # orig_x = int((cx - img_left) * scale_x) # REMOVED
-        # orig_y = int((cy - img_top) * scale_y) # REMOVED
-        # --- END REMOVE ---
-
-        # --- Clamp the *input* coordinates (cx, cy) directly to image bounds ---
-        print(f"DEBUG simulate_process: Before clamp: Input=({cx}, {cy}), ImageDims=({self.current_image.width}x{self.current_image.height})") # ADJUSTED PRINT
-        orig_x = max(0, min(cx, self.current_image.width - 1))  # Clamp cx
-        orig_y = max(0, min(cy, self.current_image.height - 1))  # Clamp cy
-        print(f"DEBUG simulate_process: Clamped Orig=({orig_x}, {orig_y})")
-        # --- End Clamping ---
-
-        # Create new image at target size
+
         try: # --- ADDED: Try block for image creation ---
-            # Ensure the canvas background is opaque for simulation
-            r, g, b, _ = self.bg_color
-            opaque_canvas_color = (r, g, b, 255)
-            result = Image.new("RGBA", (target_w, target_h), opaque_canvas_color)
-
-            # Calculate offsets using the *clamped original* coordinates (orig_x, orig_y)
-            offset_x = target_w // 2 - orig_x # Use clamped original coords
-            offset_y = target_h // 2 - orig_y # Use clamped original coords
-            print(f"DEBUG simulate_process: Orig=({orig_x}, {orig_y}), Offset=({offset_x}, {offset_y})")
-
-            # Calculate crop coordinates
-            from_x = max(0, -offset_x)
-            from_y = max(0, -offset_y)
-            to_x = min(self.current_image.width, target_w - offset_x)
-            to_y = min(self.current_image.height, target_h - offset_y)
-            print(f"DEBUG simulate_process: Crop box=({from_x}, {from_y}) to ({to_x}, {to_y})")
-
-            if from_x < to_x and from_y < to_y:
-                cropped = self.current_image.crop((from_x, from_y, to_x, to_y))
-                paste_x = max(0, offset_x)
-                paste_y = max(0, offset_y)
-                
-                # Paste the 'cropped' image (which is RGBA) onto the 'result' image (opaque background).
-                if cropped.mode == 'RGBA':
-                    # If the cropped image has an alpha channel, use its alpha band as the mask.
-                    result.paste(cropped, (paste_x, paste_y), mask=cropped.split()[3])
-                elif cropped.mode == 'RGB':
-                    # If cropped is RGB (no alpha), paste it directly.
-                    result.paste(cropped, (paste_x, paste_y))
-                else:
-                    # Handle other modes or raise an error if necessary
-                    self.logger.warning(f"simulate_process_image: Cropped image has unexpected mode {cropped.mode}. Pasting without mask.")
-                    result.paste(cropped, (paste_x, paste_y))
-            else:
-                print(f"DEBUG simulate_process: Invalid crop coordinates: ({from_x}, {from_y}) to ({to_x}, {to_y})")
-            return result # <<< ADDED THIS LINE TO RETURN THE PROCESSED IMAGE ON SUCCESS >>>
+            # Cut from the pre-flattened image; same pixels as process_image for the clamped center
+            return self.preview_engine.render(self.current_image, self.bg_color, cx, cy, target_w, target_h,
+                                              self.current_image_key)
         except Exception as e: # --- ADDED: Catch errors during simulation ---
             error_message = f"ERROR simulate_process: Failed during image processing: {str(e)}"
             detailed_traceback = traceback.format_exc()
@@ -1928,7 +2053,6 @@ class ImageResizerApp:
             general_stats_items = [
                 ("Total Files Processed", str(stats["total_files"])),
                 ("Total Time Spent", stats["total_time"]),
-                ("Estimated Time Saved", stats["time_saved"]),
                 ("Total Sessions", str(stats["session_count"])),
                 ("Files This Session", str(stats["current_session_files"])),
                 ("Largest Batch", str(stats.get("largest_batch", 0))),
@@ -1940,6 +2064,30 @@ class ImageResizerApp:
                 # <<< END ADDED >>>
                 current_row = add_stat_item(label, value, current_row)
 
+            # Measured Throughput (from the per-image timings, not an estimate)
+            throughput = stats["throughput"]
+            current_row = add_section_title("Measured Throughput", current_row)
+            throughput_items = [
+                ("Frames Timed", str(throughput["frames"])),
+                ("Median Time per Frame", throughput["p50"]),
+                ("95th Percentile per Frame", throughput["p95"]),
+                ("Average Decode", throughput["decode"]),
+                ("Average Render", throughput["render"]),
+                ("Average Save", throughput["save"]),
+                ("Startup (Last Launch)", throughput["startup_last"]),
+                ("Startup (Median, Last 20)", throughput["startup_median"]),
+            ]
+            for label, value in throughput_items:
+                current_row = add_stat_item(label, value, current_row)
+            if throughput["sessions"]:
+                current_row = add_section_title("Frames per Hour (Recent Sessions)", current_row)
+                for label, value in throughput["sessions"]:
+                    current_row = add_stat_item(label, value, current_row)
+            if throughput["slowest_folders"]:
+                current_row = add_section_title("Slowest Folders", current_row)
+                for folder, value in throughput["slowest_folders"]:
+                    current_row = add_stat_item(folder, value, current_row)
+
             # Recent Activity
             current_row = add_section_title("Recent Activity", current_row)
             recent_activity_items = [
@@ -2094,9 +2242,119 @@ class ImageResizerApp:
             self._bind_mousewheel_for_manual_scroll(child, canvas_to_scroll)
 
     def quit_app(self):
+        self.folder_scanner.cancel()
+        self.cancel_changed_search()
+        self.ledger_worker.shutdown(wait=False)
+        self.prefetcher.shutdown()
+        self.image_analyzer.shutdown()
+        self.output_writer.shutdown()  # Let queued outputs finish saving
+        for output_path, message, _ in self.output_writer.drain_errors():
+            self.logger.error(f"Failed to save {output_path}: {message}")
+        self.save_export_ledger()
         self.stats_manager.end_session()
         self.root.quit()
 
+    def poll_output_errors(self):
+        """Report outputs the background writer failed to save."""
+        errors = self.output_writer.drain_errors()
+        if errors:
+            for output_path, message, detailed_traceback in errors:
+                self.logger.error(f"Failed to save {output_path}: {message}")
+                self.logger.error(detailed_traceback)
+            shown = "\n".join(os.path.basename(path) for path, _, _ in errors[:5])
+            if len(errors) > 5:
+                shown += f"\n...and {len(errors) - 5} more"
+            messagebox.showerror("Save Failed",
+                                 f"{len(errors)} output file(s) could not be saved:\n{shown}\n\n{errors[0][1]}",
+                                 parent=self.root)
+        self.save_export_ledger(min_interval=5)
+        self.stats_manager.maybe_flush()
+        try:
+            self.root.after(250, self.poll_output_errors)
+        except tk.TclError:
+            pass  # Window is gone
+
+    def get_export_ledger(self):
+        """Return the ExportLedger for the current output folder."""
+        if self.export_ledger is None or self.export_ledger.output_folder != self.output_folder:
+            self.save_export_ledger()
+            self.export_ledger = ExportLedger(self.output_folder)
+        return self.export_ledger
+
+    def save_export_ledger(self, min_interval=0):
+        if self.export_ledger is None:
+            return
+        try:
+            self.export_ledger.save(min_interval)
+        except OSError as e:
+            self.logger.warning(f"Could not save export ledger {self.export_ledger.path}: {e}")
+
+    def _output_saved(self, event, ledger, output_path, source_path, params, content_hash, future):
+        """Writer callback (runs on a writer thread): log the save time and note the output in the ledger."""
+        seconds = future.result()
+        self.stats_manager.add_save_time(event, seconds)
+        if seconds is None:
+            return
+        try:
+            ledger.record(output_path, source_path, params, content_hash)
+        except Exception as e:
+            self.logger.warning(f"Could not record {output_path} in export ledger: {e}")
+
+    def warm_source_hash(self, img_path):
+        """Hash the shown image on the ledger worker, so process_image finds the hash cached."""
+        if not TARGET_SIZE or not getattr(self, 'output_folder', None):
+            return
+        self.ledger_worker.submit(self.get_export_ledger().source_hash, img_path)
+
+    def next_changed_image(self, event=None):
+        """Jump to the next image that is new or changed since it was last exported.
+
+        The search hashes every source the ledger hasn't seen, so it runs on the
+        ledger worker. Invoking it again, or moving to another image, cancels it.
+        """
+        if self.changed_search is not None:
+            self.cancel_changed_search()
+            self.logger.info("next_changed_image: search cancelled.")
+            return
+        if not self.image_paths or not TARGET_SIZE:
+            return
+        output_dirs = [os.path.join(self.output_folder, f"{w}x{h}") for w, h in TARGET_SIZE]
+        outputs_for = lambda path: [os.path.join(d, output_filename_for(path)) for d in output_dirs]
+        cancel_event = threading.Event()
+        future = self.ledger_worker.submit(find_next_changed, self.get_export_ledger(), list(self.image_paths),
+                                           self.current_index + 1, outputs_for, cancel_event)
+        self.changed_search = (future, cancel_event, self.current_index)
+        self.root.config(cursor="watch")
+        self.root.after(50, self._poll_changed_search, future)
+
+    def cancel_changed_search(self):
+        if self.changed_search is None:
+            return
+        self.changed_search[1].set()
+        self.changed_search = None
+        self.root.config(cursor="")
+
+    def _poll_changed_search(self, future):
+        if self.changed_search is None or self.changed_search[0] is not future:
+            return  # Cancelled
+        if not future.done():
+            self.root.after(50, self._poll_changed_search, future)
+            return
+        start_index = self.changed_search[2]
+        self.changed_search = None
+        self.root.config(cursor="")
+        try:
+            found = future.result()
+        except Exception as e:
+            self.logger.error(f"next_changed_image failed: {e}")
+            return
+        if found is None:
+            messagebox.showinfo("Up to Date", "No new or changed images after this one.", parent=self.root)
+            return
+        self.logger.info(f"next_changed_image: skipping {found - start_index - 1} up-to-date image(s).")
+        self.current_index = found
+        self.show_image()
+
     def show_manual(self):
         manual_window = tk.Toplevel(self.root)
         manual_window.title("Manual")
@@ -2185,6 +2443,7 @@ class ImageResizerApp:
                         # Not packaged, and not found next to script
                         error_message_manual = f"Manual file (manual.md) not found at: {path_to_try}"
                         self.logger.warning(error_message_manual)
+                self.manual_content_data = md_content_full  # Read from disk once, on first open
             
             if md_content_full:
                 sections = []
@@ -2494,8 +2753,8 @@ class ImageResizerApp:
         self.scroll_x = offset_x - (offset_x * new_zoom / old_zoom)
         self.scroll_y = offset_y - (offset_y * new_zoom / old_zoom)
         
-        # Redraw the image
-        self.show_image()
+        # Redraw the visible part of the image
+        self.render_view()
 
     def start_pan(self, event):
         """Start panning when middle mouse button is pressed."""
@@ -2508,6 +2767,8 @@ class ImageResizerApp:
     def stop_pan(self, event):
         """Stop panning when middle mouse button is released."""
         self.is_panning = False
+        # One full redraw at the final position (also drops any queued move)
+        self.render_view()
 
     def on_mouse_wheel_hold(self, event):
         """Handle panning when middle mouse button is held."""
@@ -2518,23 +2779,66 @@ class ImageResizerApp:
         dx = event.x - self.last_mouse_x
         dy = event.y - self.last_mouse_y
         
-        # Update scroll position
-        self.scroll_x += dx
-        self.scroll_y += dy
-        
         # Update last mouse position
         self.last_mouse_x = event.x
         self.last_mouse_y = event.y
         
-        # Redraw the image
-        self.show_image()
+        self.queue_pan(dx, dy)
+
+    def queue_pan(self, dx, dy):
+        """Translate the view by (dx, dy), coalescing motion to one redraw per frame."""
+        self.scroll_x += dx
+        self.scroll_y += dy
+        self.pending_pan_dx += dx
+        self.pending_pan_dy += dy
+        if self.pan_frame_job is None:
+            self.pan_frame_job = self.root.after(16, self.apply_pending_pan)  # ~60 FPS
+
+    @profiler.timed("pan")
+    def apply_pending_pan(self):
+        """Move the already-rendered canvas items, re-rendering only if pixels are missing."""
+        self.pan_frame_job = None
+        dx, dy = self.pending_pan_dx, self.pending_pan_dy
+        self.pending_pan_dx = 0
+        self.pending_pan_dy = 0
+        if not dx and not dy:
+            return
+        if not self.current_image or not self.rendered_rect:
+            self.render_view()
+            return
+
+        # Canvas area that needs image pixels after the move
+        canvas_w = self.canvas.winfo_width()
+        canvas_h = self.canvas.winfo_height()
+        new_image_x = canvas_w // 2 + self.scroll_x
+        new_image_y = canvas_h // 2 + self.scroll_y
+        img_left = new_image_x - (self.display_width // 2)
+        img_top = new_image_y - (self.display_height // 2)
+        need_x0 = max(0, img_left)
+        need_y0 = max(0, img_top)
+        need_x1 = min(canvas_w, img_left + self.display_width)
+        need_y1 = min(canvas_h, img_top + self.display_height)
+
+        x0, y0, x1, y1 = self.rendered_rect
+        x0, y0, x1, y1 = x0 + dx, y0 + dy, x1 + dx, y1 + dy
+        if need_x0 < need_x1 and need_y0 < need_y1 and \
+           (need_x0 < x0 or need_y0 < y0 or need_x1 > x1 or need_y1 > y1):
+            # Newly exposed region has no pixels yet
+            self.render_view()
+            return
+
+        # Pure translation: shift the image, grid and crosshair items in place
+        self.canvas.move("all", dx, dy)
+        self.image_x = new_image_x
+        self.image_y = new_image_y
+        self.rendered_rect = (x0, y0, x1, y1)
 
     def reset_zoom(self, event=None):
         """Reset zoom to 100%."""
         self.zoom_level = 1.0
         self.scroll_x = 0
         self.scroll_y = 0
-        self.show_image()
+        self.render_view()
 
     def zoom_in(self, event=None):
         """Zoom in by 10%."""
@@ -2559,8 +2863,8 @@ class ImageResizerApp:
         self.scroll_x = offset_x - (offset_x * new_zoom / self.zoom_level)
         self.scroll_y = offset_y - (offset_y * new_zoom / self.zoom_level)
         
-        # Redraw the image
-        self.show_image()
+        # Redraw the visible part of the image
+        self.render_view()
 
     def zoom_out(self, event=None):
         """Zoom out by 10%."""
@@ -2585,8 +2889,8 @@ class ImageResizerApp:
         self.scroll_x = offset_x - (offset_x * new_zoom / self.zoom_level)
         self.scroll_y = offset_y - (offset_y * new_zoom / self.zoom_level)
         
-        # Redraw the image
-        self.show_image()
+        # Redraw the visible part of the image
+        self.render_view()
 
     def reset_bg_color(self, event=None):
         """Reset background color to magenta (#ff00ff)."""
@@ -2607,11 +2911,8 @@ class ImageResizerApp:
         # Calculate scroll amount (adjust this value to change scroll speed)
         scroll_amount = delta / 120 * 20  # 20 pixels per scroll step
         
-        # Update horizontal scroll position
-        self.scroll_x += scroll_amount
-        
-        # Redraw the image
-        self.show_image()
+        # Shift the view; panning moves the rendered items instead of redrawing
+        self.queue_pan(scroll_amount, 0)
 
     def on_vertical_scroll(self, event, delta=None):
         """Handle vertical scrolling with Ctrl+Shift+scrollwheel."""
@@ -2625,11 +2926,8 @@ class ImageResizerApp:
         # Calculate scroll amount (adjust this value to change scroll speed)
         scroll_amount = delta / 120 * 20  # 20 pixels per scroll step
         
-        # Update vertical scroll position
-        self.scroll_y += scroll_amount
-        
-        # Redraw the image
-        self.show_image()
+        # Shift the view; panning moves the rendered items instead of redrawing
+        self.queue_pan(0, scroll_amount)
 
     def custom_crosshair_dialog(self):
         """Show dialog for custom crosshair size."""
@@ -2928,110 +3226,34 @@ class ImageResizerApp:
     # <<< REMOVE old pick_grid_color method, replaced by pick_grid_color_via_chooser >>>
 
     def update_grid(self):
-        """Update the grid based on current settings."""
-        self.clear_grid() # Clear existing grid first
-
-        if not self.show_grid_var.get() or not self.current_image or not self.tk_image:
-            return
-
-        # Original image dimensions
-        orig_img_width = self.current_image.width
-        orig_img_height = self.current_image.height
-
-        # Displayed tk_image dimensions
-        tk_img_width = self.tk_image.width()
-        tk_img_height = self.tk_image.height()
+        """Redraw the view so the grid reflects the current settings."""
+        self.render_view()
 
-        if orig_img_width == 0 or orig_img_height == 0 or tk_img_width == 0 or tk_img_height == 0:
-            return # Avoid division by zero
+    @profiler.timed("composite_grid")
+    def composite_grid(self, display_image):
+        """Draw the pixel grid into the rendered viewport bitmap.
 
-        # Top-left coordinate of the tk_image on the canvas
-        img_left_on_canvas = self.image_x - (tk_img_width // 2)
-        img_top_on_canvas = self.image_y - (tk_img_height // 2)
-
-        # Actual canvas size of one original image pixel cell (since grid_size is 1)
-        # This accounts for both the initial thumbnailing and the current zoom level
-        actual_scaled_cell_w = (tk_img_width / orig_img_width) * self.grid_size
-        actual_scaled_cell_h = (tk_img_height / orig_img_height) * self.grid_size
-
-        # If scaled cell size is too small, don't draw (prevents visual clutter and performance issues)
-        if actual_scaled_cell_w < 2 or actual_scaled_cell_h < 2:
-            return
-
-        # Canvas dimensions
-        canvas_w = self.canvas.winfo_width()
-        canvas_h = self.canvas.winfo_height()
-
-        # Determine the range of original image pixels visible on the canvas
-        # Start column index of original image pixels
-        start_col = max(0, int(-img_left_on_canvas / actual_scaled_cell_w))
-        # End column index (exclusive)
-        end_col = min(orig_img_width, int((canvas_w - img_left_on_canvas) / actual_scaled_cell_w) + 1)
-
-        # Start row index of original image pixels
-        start_row = max(0, int(-img_top_on_canvas / actual_scaled_cell_h))
-        # End row index (exclusive)
-        end_row = min(orig_img_height, int((canvas_h - img_top_on_canvas) / actual_scaled_cell_h) + 1)
-
-        # Draw vertical lines
-        for i in range(start_col, end_col + 1): # Iterate through original pixel columns
-            # Canvas x-coordinate for the current grid line
-            line_x = img_left_on_canvas + (i * actual_scaled_cell_w)
-
-            # Clip line to canvas bounds and image bounds on canvas
-            draw_y1 = max(0, img_top_on_canvas)
-            draw_y2 = min(canvas_h, img_top_on_canvas + tk_img_height)
-            
-            # Ensure the line is within the canvas horizontal view
-            if line_x >= 0 and line_x <= canvas_w:
-                # Sample color from the middle of the potential line segment within the image
-                # For vertical lines, sample x at i (or i-1 if at edge), y at center of visible image
-                sample_orig_x = max(0, min(i, orig_img_width - 1)) # Use current col, or previous if at right edge for sampling
-                if i == end_col and i > 0 : sample_orig_x = i -1
-
-
-                # Find a representative y in original image coordinates for color sampling
-                # Consider the vertical center of the visible part of the image on canvas
-                visible_img_center_y_on_canvas = (max(img_top_on_canvas, 0) + min(img_top_on_canvas + tk_img_height, canvas_h)) / 2
-                sample_orig_y = max(0, min(int((visible_img_center_y_on_canvas - img_top_on_canvas) / actual_scaled_cell_h), orig_img_height -1))
-
-
-                line_id = self.canvas.create_line(
-                    line_x, draw_y1,
-                    line_x, draw_y2,
-                    fill=self.get_grid_color(sample_orig_x, sample_orig_y),
-                    width=1
-                )
-                self.grid_lines.append(line_id)
-
-        # Draw horizontal lines
-        for j in range(start_row, end_row + 1): # Iterate through original pixel rows
-            # Canvas y-coordinate for the current grid line
-            line_y = img_top_on_canvas + (j * actual_scaled_cell_h)
-
-            # Clip line to canvas bounds and image bounds on canvas
-            draw_x1 = max(0, img_left_on_canvas)
-            draw_x2 = min(canvas_w, img_left_on_canvas + tk_img_width)
-
-            # Ensure the line is within the canvas vertical view
-            if line_y >= 0 and line_y <= canvas_h:
-                # Sample color
-                sample_orig_y = max(0, min(j, orig_img_height - 1)) # Use current row, or previous if at bottom edge
-                if j == end_row and j > 0: sample_orig_y = j-1
-
-                visible_img_center_x_on_canvas = (max(img_left_on_canvas, 0) + min(img_left_on_canvas + tk_img_width, canvas_w)) / 2
-                sample_orig_x = max(0, min(int((visible_img_center_x_on_canvas - img_left_on_canvas) / actual_scaled_cell_w), orig_img_width-1))
-
-
-                line_id = self.canvas.create_line(
-                    draw_x1, line_y,
-                    draw_x2, line_y,
-                    fill=self.get_grid_color(sample_orig_x, sample_orig_y),
-                    width=1
-                )
-                self.grid_lines.append(line_id)
-
-        self.root.update_idletasks()
+        Lines are filled into the bitmap that is already being shown, so no
+        canvas items are created however many cells are visible, and the grid
+        pans with the image for free.
+        """
+        if not self.current_image or not self.viewport:
+            return display_image
+        # Canvas size of one original image pixel cell, accounting for thumbnailing and zoom
+        cell_w = (self.display_width / self.current_image.width) * self.grid_size
+        cell_h = (self.display_height / self.current_image.height) * self.grid_size
+        # If scaled cell size is too small, don't draw (prevents visual clutter)
+        if cell_w < 2 or cell_h < 2:
+            return display_image
+        # get_grid_color takes image pixel coordinates; sample the pixel at the
+        # centre of the viewport, as the per-line grid sampled the visible centre
+        x0, y0, x1, y1 = self.viewport
+        scale_x = self.display_width / self.current_image.width
+        scale_y = self.display_height / self.current_image.height
+        sample_x = max(0, min(int((x0 + x1) / 2 / scale_x), self.current_image.width - 1))
+        sample_y = max(0, min(int((y0 + y1) / 2 / scale_y), self.current_image.height - 1))
+        color = self.get_grid_color(sample_x, sample_y)
+        return draw_pixel_grid(display_image, self.viewport, cell_w, cell_h, color)
 
     def get_grid_color(self, x, y):
         """Get the appropriate grid color based on mode and position."""
@@ -3052,18 +3274,9 @@ class ImageResizerApp:
             # print("WARN get_grid_color: Re-initialized self.grid_custom_color to black.")
         return self.grid_custom_color
 
-    def clear_grid(self):
-        """Clear all grid lines."""
-        for line_id in self.grid_lines:
-            self.canvas.delete(line_id)
-        self.grid_lines = []
-
     def toggle_grid(self):
         """Toggle the grid visibility."""
-        if self.show_grid_var.get():
-            self.update_grid()
-        else:
-            self.clear_grid()
+        self.update_grid()
         # Force update of the display
         self.root.update_idletasks()
 
@@ -3338,18 +3551,13 @@ class ImageResizerApp:
 
         # Determine which resolutions are selected in the dialog
         selected_indices_from_dialog = []
-        self.logger.debug(f"_update_all_crop_previews: Building selected_indices. Vars count: {len(self.crop_preview_dialog_vars) if hasattr(self, 'crop_preview_dialog_vars') else 'N/A'}")
         if hasattr(self, 'crop_preview_dialog_vars') and isinstance(self.crop_preview_dialog_vars, list):
             for i, var in enumerate(self.crop_preview_dialog_vars):
                 if isinstance(var, tk.BooleanVar): # Ensure it's a BooleanVar before calling get()
-                    var_state = var.get()
-                    self.logger.debug(f"  Var index {i} ({TARGET_SIZE[i][0]}x{TARGET_SIZE[i][1]}): state is {var_state}")
-                    if var_state:
+                    if var.get():
                         selected_indices_from_dialog.append(i)
                 else:
                     self.logger.warning(f"  Var index {i} is not a BooleanVar: {type(var)}. Skipping.")
-        self.logger.debug(f"_update_all_crop_previews: selected_indices_from_dialog: {selected_indices_from_dialog}")
-        self.logger.debug(f"_update_all_crop_previews: current self.preview_windows keys: {list(self.preview_windows.keys())}")
         
         # Close Toplevels for resolutions that are no longer selected in the dialog
         for idx_open in list(self.preview_windows.keys()): # Iterate over a copy of keys
@@ -3409,7 +3617,7 @@ class ImageResizerApp:
 
         # Remove the window from active tracking.
         if idx in self.preview_windows:
-            self.logger.debug(f"Removing preview window for index {idx} from self.preview_windows list.")
+            self.logger.debug("Removing preview window for index %s from self.preview_windows list.", idx)
             del self.preview_windows[idx]
         else:
             self.logger.warning(f"WM_DELETE_WINDOW for index {idx}, but it was not found in self.preview_windows. It might have been closed by other means.")
@@ -3425,7 +3633,7 @@ class ImageResizerApp:
                     self.logger.info(f"Setting crop_preview_dialog_vars[{idx}] to False as its window is being closed.")
                     self.crop_preview_dialog_vars[idx].set(False)
                 else:
-                    self.logger.debug(f"crop_preview_dialog_vars[{idx}] was already False.")
+                    self.logger.debug("crop_preview_dialog_vars[%s] was already False.", idx)
             else:
                 self.logger.warning(f"crop_preview_dialog_vars[{idx}] is not a BooleanVar. Cannot update state.")
         else:
@@ -3618,6 +3826,12 @@ class ImageResizerApp:
                 ]
             )
             if file_path:
+                self.folder_scanner.cancel()  # Also drops any batches it already found
+                if self.scan_poll_job is not None:
+                    self.root.after_cancel(self.scan_poll_job)
+                    self.scan_poll_job = None
+                self.scan_in_progress = False
+                self.prefetcher.cancel_all()
                 self.image_paths = [file_path]
                 self.current_index = 0
                 self.show_image()
@@ -3648,31 +3862,59 @@ class ImageResizerApp:
                 self._setup_output_folder()
                 # --- END ---
 
-                self.image_paths = []  # Clear existing images
-                # Use self.base_folder for os.walk
-                for root_dir, _, files in os.walk(self.base_folder):
-                    for file in files:
-                        if file.lower().endswith((".png", ".jpg", ".jpeg", ".bmp")):
-                            self.image_paths.append(os.path.join(root_dir, file))
-                
-                if self.image_paths:
-                    self.current_index = 0
-                    self.show_image()
-                    self.logger.info(f"Opened folder: {folder_path} with {len(self.image_paths)} images")
-
-                    # Ensure window is wide enough after loading images
-                    self.root.update_idletasks()
-                    current_width = self.root.winfo_width()
-                    if current_width < 400:
-                        self.root.geometry(f"400x{self.root.winfo_height()}")
-                else:
-                    messagebox.showwarning("No Images", "No image files found in the selected folder.", parent=self.root)
+                self.prefetcher.cancel_all()  # Drop prefetches for the previous folder
+                self.image_paths = []  # Clear existing images; the scan refills it as it goes
+                self.current_index = 0
+                self.current_image = None
+                self.current_image_key = None
+                self.canvas.delete("all")
+
+                # Scan on a background thread; the first image shows as soon as it's found
+                if self.scan_poll_job is not None:
+                    self.root.after_cancel(self.scan_poll_job)
+                scan_generation = self.folder_scanner.start(self.base_folder)
+                self.scan_in_progress = True
+                self.update_title()
+                self.scan_poll_job = self.root.after(30, self._poll_folder_scan, scan_generation)
             # If folder_path is None (user cancelled dialog), do nothing further for this action.
 
         except Exception as e:
             self.logger.warning(f"Error opening image folder: {str(e)}")
             messagebox.showerror("Error", f"Failed to open image folder: {str(e)}", parent=self.root)
 
+    def _poll_folder_scan(self, scan_generation):
+        """Pick up paths found by the background folder scan."""
+        self.scan_poll_job = None
+        if scan_generation != self.folder_scanner.generation:
+            return  # That scan was cancelled or replaced
+        new_paths, finished = self.folder_scanner.poll()
+        if new_paths:
+            first_batch = not self.image_paths
+            self.image_paths.extend(new_paths)
+            if first_batch:
+                self.current_index = 0
+                self.show_image()
+                # Ensure window is wide enough after loading images
+                self.root.update_idletasks()
+                current_width = self.root.winfo_width()
+                if current_width < 400:
+                    self.root.geometry(f"400x{self.root.winfo_height()}")
+            self.update_title()
+
+        if finished:
+            self.scan_in_progress = False
+            self.update_title()
+            if self.folder_scanner.error:
+                self.logger.warning(f"Folder scan of {self.folder_scanner.root} stopped early: {self.folder_scanner.error}")
+            if self.image_paths:
+                self.logger.info(f"Opened folder: {self.folder_scanner.root} with {len(self.image_paths)} images")
+                self.restart_image_analysis()
+            else:
+                messagebox.showwarning("No Images", "No image files found in the selected folder.", parent=self.root)
+            return
+
+        self.scan_poll_job = self.root.after(50, self._poll_folder_scan, scan_generation)
+
     def change_output_folder(self):
         """Open dialog to change the output folder."""
         try:
@@ -4118,10 +4360,10 @@ class ImageResizerApp:
         if not self.current_image:
             self.logger.debug("correct_coordinates: No current_image.")
             return None, None
-        if not self.tk_image:
-            # This state (current_image exists but tk_image doesn't) should ideally not happen
+        if not self.display_width:
+            # This state (current_image exists but it was never rendered) should ideally not happen
             # if an image is properly shown. If it does, we cannot determine image coordinates.
-            self.logger.debug("correct_coordinates: No tk_image available.")
+            self.logger.debug("correct_coordinates: Image has not been rendered yet.")
             return None, None
 
         try:
@@ -4132,16 +4374,9 @@ class ImageResizerApp:
             self.logger.warning(f"correct_coordinates: Error getting canvas coordinates from event: {e}")
             return None, None
 
-        try:
-            tk_w = self.tk_image.width()
-            tk_h = self.tk_image.height()
-            if tk_w == 0 or tk_h == 0:
-                self.logger.warning(f"correct_coordinates: tk_image has zero dimension: {tk_w}x{tk_h}.")
-                return None, None # Cannot reliably scale if displayed image has no size
-        except tk.TclError:
-            # This can happen if the tk_image is destroyed or becomes invalid between operations
-            self.logger.warning("correct_coordinates: TclError getting tk_image dimensions.")
-            return None, None # tk_image is invalid
+        # Size of the whole zoomed image (only its visible part is actually rendered)
+        tk_w = self.display_width
+        tk_h = self.display_height
 
         # Top-left corner of the displayed tk_image on the canvas
         img_left_on_canvas = self.image_x - (tk_w // 2)
@@ -4161,7 +4396,7 @@ class ImageResizerApp:
         orig_y = int(rel_y_on_tk_image * (self.current_image.height / tk_h))
         
         # Optional: Add detailed logging for debugging coordinate transformations
-        # self.logger.debug(f"correct_coordinates: event=({event.x},{event.y}) -> canvas=({x_canvas},{y_canvas}) -> tk_img_rel=({rel_x_on_tk_image},{rel_y_on_tk_image}) @ zoom={self.zoom_level} -> orig=({orig_x},{orig_y})")
+        # self.logger.debug("correct_coordinates: event=(%s,%s) -> canvas=(%s,%s) -> tk_img_rel=(%s,%s) @ zoom=%s -> orig=(%s,%s)", event.x, event.y, x_canvas, y_canvas, rel_x_on_tk_image, rel_y_on_tk_image, self.zoom_level, orig_x, orig_y)
         return orig_x, orig_y
 
     def rgb_to_hex(self, rgb_tuple):
@@ -4227,6 +4462,7 @@ class ImageResizerApp:
                     messagebox.showwarning("Resolution Not Changed", "Resolution selection was cancelled. Using previous settings.", parent=self.root)
              return True # Indicate continue even if warning was shown
 
+    @profiler.timed("process_image")
     def process_image(self, center_x=None, center_y=None):
         """Process the current image with the current settings."""
         if not self.current_image or not TARGET_SIZE:
@@ -4235,10 +4471,7 @@ class ImageResizerApp:
 
         img_path = self.image_paths[self.current_index]
         original_filename = os.path.basename(img_path)
-        base_original_filename, _ = os.path.splitext(original_filename)
-        # --- MODIFIED: Output filename to .bmp ---
-        output_filename_bmp = base_original_filename + ".bmp"
-        # --- END MODIFICATION ---
+        output_filename_bmp = output_filename_for(img_path)
         all_resolutions_succeeded = True
 
         if not hasattr(self, 'output_folder') or not self.output_folder:
@@ -4246,52 +4479,52 @@ class ImageResizerApp:
             self.output_folder = os.path.join(get_base_path(), "output_resized", "default_fallback")
             os.makedirs(self.output_folder, exist_ok=True)
 
+        current_center_x = center_x if center_x is not None else self.current_image.width // 2
+        current_center_y = center_y if center_y is not None else self.current_image.height // 2
+
+        # Outputs already rendered from identical source content and settings are left alone. The hash
+        # was normally warmed in show_image; if it isn't ready yet the outputs are written anyway and
+        # the writer thread hashes the source when recording them, so the click never waits on a read.
+        ledger = self.get_export_ledger()
+        try:
+            content_hash = ledger.cached_source_hash(img_path)
+        except OSError as e_hash:
+            self.logger.warning(f"Could not stat {original_filename}; exporting without the ledger skip: {e_hash}")
+            content_hash = None
+
+        shown_at = getattr(self, 'image_shown_at', None)
+        dwell = time.perf_counter() - shown_at if shown_at is not None else None
+        event = self.stats_manager.begin_event(img_path, dwell, getattr(self, 'current_decode_seconds', None))
+
+        rendered = None
         for target_w, target_h in TARGET_SIZE:
             try:
-                # Ensure the canvas background is opaque, using the RGB from self.bg_color
-                r, g, b, _ = self.bg_color  # Unpack, ignore original alpha for canvas
-                opaque_canvas_color = (r, g, b, 255)
-                result = Image.new("RGBA", (target_w, target_h), opaque_canvas_color)
-                
-                current_center_x = center_x if center_x is not None else self.current_image.width // 2
-                current_center_y = center_y if center_y is not None else self.current_image.height // 2
-
-                offset_x = target_w // 2 - current_center_x
-                offset_y = target_h // 2 - current_center_y
-
-                from_x = max(0, -offset_x)
-                from_y = max(0, -offset_y)
-                to_x = min(self.current_image.width, target_w - offset_x)
-                to_y = min(self.current_image.height, target_h - offset_y)
-
-                if from_x < to_x and from_y < to_y:
-                    cropped = self.current_image.crop((from_x, from_y, to_x, to_y))
-                    paste_x = max(0, offset_x)
-                    paste_y = max(0, offset_y)
-                    # --- MODIFIED PASTE LOGIC ---
-                    if cropped.mode == 'RGBA':
-                        # If the cropped image has an alpha channel, use its alpha band as the mask.
-                        result.paste(cropped, (paste_x, paste_y), mask=cropped.split()[3])
-                    elif cropped.mode == 'RGB':
-                        # If cropped is RGB (no alpha), paste it directly.
-                        result.paste(cropped, (paste_x, paste_y))
-                    else:
-                        # Handle other modes or log a warning
-                        self.logger.warning(f"process_image: Cropped image has unexpected mode {cropped.mode}. Pasting without mask.")
-                        result.paste(cropped, (paste_x, paste_y))
-                    # --- END MODIFIED PASTE LOGIC ---
-                else:
-                    self.logger.info(f"Skipping paste for {target_w}x{target_h} on {original_filename} due to invalid crop box.")
-
                 resolution_specific_folder = os.path.join(self.output_folder, f"{target_w}x{target_h}")
-                os.makedirs(resolution_specific_folder, exist_ok=True)
-                # --- MODIFIED: Use BMP filename for output path ---
                 output_path = os.path.join(resolution_specific_folder, output_filename_bmp)
-                # --- END MODIFICATION ---
-                result.save(output_path)
+                params = render_params((current_center_x, current_center_y), self.bg_color, (target_w, target_h))
+                if content_hash and ledger.is_current(output_path, img_path, params):
+                    self.logger.info(f"{output_filename_bmp} at {target_w}x{target_h} is up to date, skipped.")
+                    self.last_output_path = output_path
+                    continue
+
+                # All sizes are cut from one flattened buffer; shared with batch_cli so replayed exports are identical
+                if rendered is None:
+                    render_started = time.perf_counter()
+                    rendered = render_centered_multi(self.current_image, current_center_x, current_center_y,
+                                                     TARGET_SIZE, self.bg_color)
+                    event["render"] = time.perf_counter() - render_started
+                result = rendered[(int(target_w), int(target_h))]
+
+                # Encoding and saving happen on the writer's threads; failures come back via poll_output_errors
+                self.stats_manager.expect_save(event)
+                future = self.output_writer.submit(result, output_path)
+                future.add_done_callback(
+                    lambda f, path=output_path, p=params: self._output_saved(event, ledger, path, img_path, p,
+                                                                             content_hash, f))
+                event["resolutions"] += 1
                 self.last_output_path = output_path
 
-                self.stats_manager.add_processed_file(output_filename_bmp, [(target_w, target_h)], self.bg_color)
+                self.stats_manager.add_processed_file(img_path, [(target_w, target_h)], self.bg_color)
 
             except Exception as e_proc:
                 error_message = f"Error processing {output_filename_bmp} for {target_w}x{target_h}: {e_proc}"
@@ -4308,12 +4541,17 @@ class ImageResizerApp:
                     self.logger.error("Traceback from process_image (explicit log):")
                     self.logger.error(detailed_traceback)
 
-                if hasattr(self, 'log_buffer') and self.log_buffer:
-                    self.log_buffer.write("--- PROCESS_IMAGE ERROR (BUFFER) ---\n")
-                    self.log_buffer.write(error_message + "\n")
-                    self.log_buffer.write(detailed_traceback + "\n")
-                    self.log_buffer.write("--- END PROCESS_IMAGE ERROR (BUFFER) ---\n")
                 all_resolutions_succeeded = False
+        self.stats_manager.end_event(event)
+        self.image_shown_at = time.perf_counter()  # A second click on the same image is timed from the first
+
+        # Remember how this source was exported so batch_cli can replay it
+        try:
+            if self.export_manifest is None or self.export_manifest.output_folder != self.output_folder:
+                self.export_manifest = ExportManifest(self.output_folder)
+            self.export_manifest.record(img_path, (current_center_x, current_center_y), self.bg_color, TARGET_SIZE)
+        except Exception as e_manifest:
+            self.logger.warning(f"Could not record {original_filename} in export manifest: {e_manifest}")
         
         return all_resolutions_succeeded
 
@@ -4,13 +4,50 @@ from datetime import datetime, timedelta
 from collections import Counter
 import time
 import sys
+import threading
+
+from throughput_store import ThroughputStore, get_store_path
+
+STATS_VERSION = 2
+
 
 class StatsManager:
-    def __init__(self):
+    """Usage statistics, kept in memory and persisted in batches.
+
+    add_processed_file only updates in-memory counters. Pending changes are
+    appended as one delta line to a journal file next to the stats file by
+    flush(), which runs when flush_batch files are pending, when maybe_flush()
+    is called after flush_interval seconds, and at end_session. On startup and
+    at end_session the journal is folded into the JSON snapshot (compaction).
+
+    Colours and resolutions are stored as counts and folders as a set, so the
+    file stays the same size however many outputs are recorded. Files in the
+    old format (one list entry per output) are migrated on load.
+
+    Per-image timings (show-to-click, decode, render, save) go to a SQLite
+    ThroughputStore next to the stats file, batched the same way, and are
+    what the statistics window reports as throughput.
+    """
+
+    def __init__(self, flush_interval=30, flush_batch=200):
         self.stats_file = self.get_stats_path()
+        self.journal_file = os.path.splitext(self.stats_file)[0] + ".journal"
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
         self.current_session_start = time.time()
         self.current_session_files = 0
+        self._reset_pending()
+        self.pending_events = []
+        self.events_lock = threading.Lock()  # Save times arrive on writer threads
+        self.last_flush = time.monotonic()
         self.load_stats()
+        try:
+            self.throughput = ThroughputStore(get_store_path(self.stats_file))
+            self.session_id = self.throughput.start_session(self.current_session_start)
+        except Exception as e:
+            print(f"Error opening throughput store: {e}")
+            self.throughput = None
+            self.session_id = None
 
     def get_stats_path(self):
         if getattr(sys, 'frozen', False):
@@ -23,20 +60,21 @@ class StatsManager:
 
     def load_stats(self):
         default_stats = {
+            "stats_version": STATS_VERSION,
+            "journal_seq": 0,  # Last journal entry folded into this snapshot
             "total_files_processed": 0,
             "total_time_spent": 0,  # in seconds
             "last_access": None,
             "session_count": 0,
-            "background_colors": [],  # list of hex codes
-            "resolutions_used": [],  # list of "WxH" strings
-            "estimated_time_saved": 0,  # in seconds
+            "background_colors": {},  # hex code -> count
+            "resolutions_used": {},  # "WxH" -> count
             "last_file_processed": None,
             # New persistent stats
             "largest_batch": 0,
             "file_types": {},  # Dictionary to store file type counts
             "pixels_processed": 0,
             "pixels_by_resolution": {},  # Dictionary to store pixels by resolution
-            "folders_extracted": [],
+            "folders_extracted": [],  # Unique, in first-seen order
             "longest_session": 0  # in seconds
         }
 
@@ -54,76 +92,225 @@ class StatsManager:
             print(f"Error loading stats: {e}")
             self.stats = default_stats
 
+        self.migrate_stats()
+        self.folder_set = set(self.stats["folders_extracted"])
+        self.replay_journal()
+
         # Update session count and last access
         self.stats["session_count"] += 1
         self.stats["last_access"] = datetime.now().isoformat()
-        self.save_stats()
+        self.compact()
+
+    def migrate_stats(self):
+        """Convert a version 1 file (one list entry per output) to counters."""
+        # Checked by type: loading fills the missing "stats_version" key with the current version
+        if not isinstance(self.stats["background_colors"], list):
+            return
+        for key in ("background_colors", "resolutions_used"):
+            if isinstance(self.stats[key], list):
+                self.stats[key] = dict(Counter(self.stats[key]))
+        self.stats["folders_extracted"] = list(dict.fromkeys(self.stats["folders_extracted"]))
+        self.stats["stats_version"] = STATS_VERSION
+        self.stats["journal_seq"] = 0
+
+    def replay_journal(self):
+        """Apply journal entries newer than the snapshot (left behind by a crash)."""
+        if not os.path.exists(self.journal_file):
+            return
+        try:
+            with open(self.journal_file, 'r') as f:
+                for line in f:
+                    try:
+                        delta = json.loads(line)
+                    except ValueError:
+                        continue  # Line cut short by a crash
+                    if delta.get("seq", 0) > self.stats["journal_seq"]:
+                        self.apply_delta(delta)
+        except Exception as e:
+            print(f"Error replaying stats journal: {e}")
+
+    def apply_delta(self, delta):
+        stats = self.stats
+        stats["total_files_processed"] += delta["files"]
+        stats["pixels_processed"] += delta["pixels"]
+        for key, counts in (("background_colors", delta["colors"]), ("resolutions_used", delta["resolutions"]),
+                            ("file_types", delta["file_types"]),
+                            ("pixels_by_resolution", delta["pixels_by_resolution"])):
+            target = stats[key]
+            for name, count in counts.items():
+                target[name] = target.get(name, 0) + count
+        for folder in delta["folders"]:
+            if folder not in self.folder_set:
+                self.folder_set.add(folder)
+                stats["folders_extracted"].append(folder)
+        if delta["last_file"]:
+            stats["last_file_processed"] = delta["last_file"]
+        stats["journal_seq"] = delta["seq"]
+
+    def _reset_pending(self):
+        self.pending = {
+            "files": 0,
+            "pixels": 0,
+            "colors": Counter(),
+            "resolutions": Counter(),
+            "file_types": Counter(),
+            "pixels_by_resolution": Counter(),
+            "folders": [],
+            "last_file": None,
+        }
 
     def save_stats(self):
+        """Write the full snapshot atomically."""
         try:
-            with open(self.stats_file, 'w') as f:
+            temp_file = self.stats_file + ".tmp"
+            with open(temp_file, 'w') as f:
                 json.dump(self.stats, f, indent=2)
+            os.replace(temp_file, self.stats_file)
+            return True
         except Exception as e:
             print(f"Error saving stats: {e}")
+            return False
+
+    def begin_event(self, source_path, dwell, decode):
+        """Start the throughput record for one processed image.
+
+        The caller fills in "render" and "resolutions", calls expect_save()
+        before each output is queued and end_event() when done; the event is
+        stored once it has ended and all its saves have reported back.
+        """
+        event = {
+            "ts": time.time(),
+            "session": self.session_id,
+            "folder": os.path.dirname(os.path.abspath(source_path)),
+            "dwell": dwell,
+            "decode": decode,
+            "render": 0.0,
+            "save": 0.0,
+            "resolutions": 0,
+            "open": True,
+            "pending_saves": 0,
+        }
+        with self.events_lock:
+            self.pending_events.append(event)
+        return event
+
+    def expect_save(self, event):
+        with self.events_lock:
+            event["pending_saves"] += 1
+
+    def add_save_time(self, event, seconds):
+        """Writer callback: one output of event finished; seconds is None if it wasn't saved."""
+        with self.events_lock:
+            event["pending_saves"] -= 1
+            if seconds is not None:
+                event["save"] += seconds
+
+    def end_event(self, event):
+        with self.events_lock:
+            event["open"] = False
+
+    def flush_events(self):
+        """Insert finished events into the throughput store."""
+        with self.events_lock:
+            ready = [e for e in self.pending_events if not e["open"] and e["pending_saves"] <= 0]
+            if not ready:
+                return
+            self.pending_events = [e for e in self.pending_events if e["open"] or e["pending_saves"] > 0]
+        if self.throughput is None:
+            return
+        try:
+            self.throughput.add_events(ready)
+        except Exception as e:
+            print(f"Error writing throughput events: {e}")
+
+    def flush(self):
+        """Append pending changes to the journal as one line and fold them into self.stats."""
+        self.last_flush = time.monotonic()
+        self.flush_events()
+        if not self.pending["files"]:
+            return
+        delta = dict(self.pending, seq=self.stats["journal_seq"] + 1)
+        self._reset_pending()
+        self.apply_delta(delta)
+        try:
+            with open(self.journal_file, 'a') as f:
+                f.write(json.dumps(delta, separators=(",", ":")) + "\n")
+        except Exception as e:
+            print(f"Error writing stats journal: {e}")
+
+    def maybe_flush(self):
+        """Flush if changes have been pending for flush_interval seconds; cheap to call often."""
+        if (self.pending["files"] or self.pending_events) and \
+           time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def compact(self):
+        """Fold everything into the snapshot and empty the journal."""
+        self.flush()
+        # The snapshot records journal_seq, so a crash before truncating can't double-count
+        if self.save_stats():
+            try:
+                open(self.journal_file, 'w').close()
+            except Exception as e:
+                print(f"Error truncating stats journal: {e}")
 
     def add_processed_file(self, filename, resolutions, bg_color):
-        # Update total files
-        self.stats["total_files_processed"] += 1
+        pending = self.pending
+        pending["files"] += 1
         self.current_session_files += 1
-        
+
         # Update last file
-        self.stats["last_file_processed"] = {
+        pending["last_file"] = {
             "name": filename,
             "timestamp": datetime.now().isoformat()
         }
-        
+
         # Update background colors (store as hex)
         hex_color = "#{:02x}{:02x}{:02x}".format(*bg_color)
-        self.stats["background_colors"].append(hex_color)
-        
-        # Update resolutions
-        for w, h in resolutions:
-            self.stats["resolutions_used"].append(f"{w}x{h}")
-        
-        # Update estimated time saved (2.33 minutes per 5 images)
-        time_saved = (2.33 * 60) * (1/5)  # Convert to seconds per image
-        self.stats["estimated_time_saved"] += time_saved
-        
+        pending["colors"][hex_color] += 1
+
         # File type tracking
         ext = os.path.splitext(filename)[1].lower().lstrip('.')
         if ext:
-            self.stats["file_types"].setdefault(ext, 0)
-            self.stats["file_types"][ext] += 1
-        
-        # Pixels processed and by resolution
+            pending["file_types"][ext] += 1
+
+        # Resolutions, pixels processed and pixels by resolution
         for w, h in resolutions:
             pixels = w * h
-            self.stats["pixels_processed"] += pixels
             res_str = f"{w}x{h}"
-            self.stats["pixels_by_resolution"].setdefault(res_str, 0)
-            self.stats["pixels_by_resolution"][res_str] += pixels
-        
+            pending["resolutions"][res_str] += 1
+            pending["pixels"] += pixels
+            pending["pixels_by_resolution"][res_str] += pixels
+
         # Folders extracted
         folder = os.path.dirname(filename)
-        if folder and folder not in self.stats["folders_extracted"]:
-            self.stats["folders_extracted"].append(folder)
-        
-        self.save_stats()
+        if folder and folder not in self.folder_set and folder not in pending["folders"]:
+            pending["folders"].append(folder)
+
+        if pending["files"] >= self.flush_batch:
+            self.flush()
 
     def end_session(self):
+        self.flush()
+
         # Update total time spent
         session_duration = time.time() - self.current_session_start
         self.stats["total_time_spent"] += session_duration
-        
+
         # Update largest batch if needed
         if self.current_session_files > self.stats.get("largest_batch", 0):
             self.stats["largest_batch"] = self.current_session_files
-            
+
         # Update longest session if needed
         if session_duration > self.stats.get("longest_session", 0):
             self.stats["longest_session"] = session_duration
-        
-        self.save_stats()
+
+        self.compact()
+        if self.throughput is not None:
+            try:
+                self.throughput.end_session(self.session_id)
+            except Exception as e:
+                print(f"Error closing throughput session: {e}")
 
     def get_top_colors(self, n=5):
         counter = Counter(self.stats["background_colors"])
@@ -160,15 +347,62 @@ class StatsManager:
             
         return " ".join(parts)
 
+    def format_seconds(self, seconds):
+        if seconds is None:
+            return "N/A"
+        if seconds < 1:
+            return f"{seconds * 1000:.0f} ms"
+        if seconds < 60:
+            return f"{seconds:.1f} s"
+        return self.format_time_hms(seconds)
+
+    def record_startup(self, seconds):
+        """Store this session's launch-to-main-window time."""
+        if self.throughput is None:
+            return
+        try:
+            self.throughput.set_startup(self.session_id, seconds)
+        except Exception as e:
+            print(f"Error recording startup time: {e}")
+
+    def get_throughput_stats(self):
+        """Measured per-frame timings from the throughput store, formatted for display."""
+        result = {"frames": 0, "p50": "N/A", "p95": "N/A", "decode": "N/A", "render": "N/A", "save": "N/A",
+                  "startup_last": "N/A", "startup_median": "N/A", "sessions": [], "slowest_folders": []}
+        if self.throughput is None:
+            return result
+        try:
+            store = self.throughput
+            result["frames"] = store.frame_count()
+            result["p50"] = self.format_seconds(store.dwell_percentile(0.5))
+            result["p95"] = self.format_seconds(store.dwell_percentile(0.95))
+            for key, value in store.mean_durations().items():
+                result[key] = self.format_seconds(value)
+            startups = store.startup_times()
+            if startups:
+                result["startup_last"] = self.format_seconds(startups[0])
+                result["startup_median"] = self.format_seconds(sorted(startups)[len(startups) // 2])
+            for session_id, started, frames, per_hour in store.frames_per_hour_by_session():
+                label = datetime.fromtimestamp(started).strftime("%Y-%m-%d %H:%M")
+                rate = f"{per_hour:.0f} frames/hour" if per_hour else "N/A"
+                result["sessions"].append((label, f"{rate} ({frames} frames)"))
+            for folder, frames, mean_dwell in store.slowest_folders():
+                if len(folder) > 50:
+                    folder = f"{folder[:20]}...{folder[-20:]}"
+                result["slowest_folders"].append((folder, f"{self.format_seconds(mean_dwell)}/frame ({frames} frames)"))
+        except Exception as e:
+            print(f"Error reading throughput store: {e}")
+        return result
+
     def get_formatted_stats(self):
+        self.flush()  # Include changes not yet written
         stats = {}
         
         # Format time spent
         stats["total_time"] = self.format_time_hms(self.stats["total_time_spent"])
         
-        # Format estimated time saved
-        stats["time_saved"] = self.format_time_hms(self.stats["estimated_time_saved"])
-        
+        stats["throughput"] = self.get_throughput_stats()
+
         # Format longest session
         stats["longest_session"] = self.format_time_hms(self.stats.get("longest_session", 0))
         
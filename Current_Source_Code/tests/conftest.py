@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app's modules sit flat in Current_Source_Code rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+from PIL import Image
+
+from crosshair import CrosshairPool, arm_pixels, negative_colors
+
+
+@pytest.fixture
+def image():
+    rng = random.Random(7)
+    image = Image.new("RGBA", (9, 7))
+    image.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256), rng.randrange(256))
+                   for _ in range(9 * 7)])
+    return image
+
+
+def negative_of(image, px, py):
+    r, g, b = image.convert("RGB").getpixel((px, py))
+    return f"#{255 - r:02x}{255 - g:02x}{255 - b:02x}"
+
+
+def test_arm_pixels_center_first_then_outwards(image):
+    assert arm_pixels(image, 4, 3, 2) == [(4, 3), (4, 2), (4, 4), (3, 3), (5, 3), (4, 1), (4, 5), (2, 3), (6, 3)]
+
+
+def test_arm_pixels_are_clipped_at_the_edges(image):
+    assert arm_pixels(image, 0, 0, 2) == [(0, 0), (0, 1), (1, 0), (0, 2), (2, 0)]
+    assert arm_pixels(image, 8, 6, 1) == [(8, 6), (8, 5), (7, 6)]
+
+
+@pytest.mark.parametrize("x, y, size", [(4, 3, 2), (0, 0, 3), (8, 6, 4), (2, 6, 10), (4, 3, 0)])
+def test_negative_colors_match_each_pixel(image, x, y, size):
+    colors = negative_colors(image, x, y, size)
+    pixels = arm_pixels(image, x, y, size)
+    assert set(colors) == set(pixels)
+    for px, py in pixels:
+        assert colors[(px, py)] == negative_of(image, px, py)
+
+
+def test_negative_of_a_known_strip():
+    strip = Image.new("RGB", (3, 1))
+    strip.putdata([(0, 0, 0), (255, 128, 1), (255, 255, 255)])
+    assert negative_colors(strip, 1, 0, 1) == {(0, 0): "#ffffff", (1, 0): "#007ffe", (2, 0): "#000000"}
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.items = {}
+
+    def create_rectangle(self, *coords, **options):
+        item = len(self.items) + 1
+        self.items[item] = dict(options, coords=coords)
+        return item
+
+    def find_withtag(self, tag):
+        return [item for item, options in self.items.items() if tag in options.get("tags", ())]
+
+    def coords(self, item, *coords):
+        self.items[item]["coords"] = coords
+
+    def itemconfigure(self, item, **options):
+        self.items[item].update(options)
+
+    def tag_raise(self, tag):
+        pass
+
+
+def test_pool_reuses_items_and_skips_unchanged_keys():
+    canvas = FakeCanvas()
+    pool = CrosshairPool(canvas)
+    assert pool.draw("a", [(0, 0, 1, 1, "#fff"), (1, 1, 2, 2, "#000")])
+    assert not pool.draw("a", [(0, 0, 1, 1, "#fff")])
+    assert pool.draw("b", [(5, 5, 6, 6, "#fff")])
+    assert len(canvas.items) == 2
+    assert canvas.items[1]["coords"] == (5, 5, 6, 6)
+    assert canvas.items[2]["state"] == "hidden"
@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+
+import pytest
+
+from export_ledger import LEDGER_FILENAME, ExportLedger, find_next_changed, hash_file, render_params
+
+
+@pytest.fixture
+def setup(tmp_path):
+    source = tmp_path / "src" / "frame.png"
+    source.parent.mkdir()
+    source.write_bytes(b"frame data")
+    out_folder = tmp_path / "out"
+    output = out_folder / "32x32" / "frame.bmp"
+    output.parent.mkdir(parents=True)
+    output.write_bytes(b"rendered")
+    return str(source), str(out_folder), str(output)
+
+
+def bump_mtime(path, seconds=10):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 1_000_000_000))
+
+
+PARAMS = render_params((10, 12), (255, 0, 255, 255), (32, 32))
+
+
+def test_render_params_normalises_values():
+    assert PARAMS == {"center": [10, 12], "bg": [255, 0, 255], "size": [32, 32]}
+    assert render_params("auto", "detect", ("32", "32")) == {"center": "auto", "bg": "detect", "size": [32, 32]}
+
+
+def test_recorded_output_is_current(setup):
+    source, out_folder, output = setup
+    ledger = ExportLedger(out_folder)
+    assert not ledger.is_current(output, source, PARAMS)
+    ledger.record(output, source, PARAMS)
+    assert ledger.is_current(output, source, PARAMS)
+    assert not ledger.needs_export(source, [output])
+
+
+def test_different_params_replay(setup):
+    source, out_folder, output = setup
+    ledger = ExportLedger(out_folder)
+    ledger.record(output, source, PARAMS)
+    assert not ledger.is_current(output, source, render_params((11, 12), (255, 0, 255), (32, 32)))
+    assert not ledger.is_current(output, source, render_params((10, 12), (0, 0, 0), (32, 32)))
+
+
+def test_changed_source_content_replays(setup):
+    source, out_folder, output = setup
+    ledger = ExportLedger(out_folder)
+    ledger.record(output, source, PARAMS)
+    with open(source, "wb") as f:
+        f.write(b"frame DATA")  # Same size, new content
+    bump_mtime(source)
+    assert not ledger.is_current(output, source, PARAMS)
+    assert ledger.needs_export(source, [output])
+
+
+def test_touched_but_identical_source_is_skipped(setup):
+    source, out_folder, output = setup
+    ledger = ExportLedger(out_folder)
+    ledger.record(output, source, PARAMS)
+    bump_mtime(source)  # Re-imported: new mtime, same bytes
+    assert ledger.is_current(output, source, PARAMS)
+    assert ledger.sources[os.path.abspath(source)]["hash"] == hash_file(source)
+
+
+def test_modified_or_missing_output_replays(setup):
+    source, out_folder, output = setup
+    ledger = ExportLedger(out_folder)
+    ledger.record(output, source, PARAMS)
+    bump_mtime(output)
+    assert not ledger.is_current(output, source, PARAMS)
+    assert ledger.needs_export(source, [output])
+    os.remove(output)
+    assert not ledger.is_current(output, source, PARAMS)
+    assert ledger.needs_export(source, [output])
+
+
+def test_unrecorded_output_needs_export(setup):
+    source, out_folder, output = setup
+    ledger = ExportLedger(out_folder)
+    ledger.record(output, source, PARAMS)
+    other = os.path.join(out_folder, "64x64", "frame.bmp")
+    assert ledger.needs_export(source, [output, other])
+
+
+def test_missing_source_needs_export(setup):
+    _, out_folder, output = setup
+    ledger = ExportLedger(out_folder)
+    assert ledger.needs_export(os.path.join(out_folder, "gone.png"), [output])
+
+
+def test_hash_is_cached_by_size_and_mtime(setup, monkeypatch):
+    source, out_folder, _ = setup
+    ledger = ExportLedger(out_folder)
+    first = ledger.source_hash(source)
+    monkeypatch.setattr("export_ledger.hash_file", lambda path: pytest.fail("rehashed an unchanged source"))
+    assert ledger.source_hash(source) == first
+
+
+def test_cached_source_hash_never_hashes(setup, monkeypatch):
+    source, out_folder, _ = setup
+    ledger = ExportLedger(out_folder)
+    assert ledger.cached_source_hash(source) is None
+    content_hash = ledger.source_hash(source)
+    monkeypatch.setattr("export_ledger.hash_file", lambda path: pytest.fail("hashed again"))
+    assert ledger.cached_source_hash(source) == content_hash
+    bump_mtime(source)
+    assert ledger.cached_source_hash(source) is None
+
+
+def test_find_next_changed_skips_up_to_date_sources(setup, tmp_path):
+    source, out_folder, output = setup
+    ledger = ExportLedger(out_folder)
+    ledger.record(output, source, PARAMS)
+    changed = tmp_path / "src" / "other.png"
+    changed.write_bytes(b"other")
+    outputs_for = lambda path: [os.path.join(out_folder, "32x32", os.path.basename(path)[:-4] + ".bmp")]
+    sources = [source, source, str(changed)]
+    assert find_next_changed(ledger, sources, 0, outputs_for) == 2
+    assert find_next_changed(ledger, sources[:2], 0, outputs_for) is None
+
+
+def test_find_next_changed_stops_when_cancelled(setup):
+    source, out_folder, _ = setup
+    cancel = threading.Event()
+    cancel.set()
+    assert find_next_changed(ExportLedger(out_folder), [source], 0, lambda path: [], cancel) is None
+
+
+def test_save_and_reload(setup):
+    source, out_folder, output = setup
+    ledger = ExportLedger(out_folder)
+    ledger.record(output, source, PARAMS)
+    ledger.save()
+    assert not ledger.dirty
+    reloaded = ExportLedger(out_folder)
+    assert reloaded.is_current(output, source, PARAMS)
+    assert not [name for name in os.listdir(out_folder) if name.endswith(".tmp")]
+
+
+def test_other_version_or_corrupt_file_starts_empty(setup):
+    _, out_folder, _ = setup
+    path = os.path.join(out_folder, LEDGER_FILENAME)
+    with open(path, "w") as f:
+        json.dump({"version": 999, "outputs": {"x": {}}, "sources": {}}, f)
+    assert ExportLedger(out_folder).outputs == {}
+    with open(path, "w") as f:
+        f.write("{not json")
+    assert ExportLedger(out_folder).outputs == {}
@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+
+import pytest
+
+import folder_scan
+from folder_scan import FolderIndex, FolderScanner, get_index_path, iter_images
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "art"
+    (root / "b").mkdir(parents=True)
+    (root / "a" / "deep").mkdir(parents=True)
+    for path in ("1.png", "notes.txt", "a/2.PNG", "a/deep/3.bmp", "b/4.jpg"):
+        (root / path).write_bytes(b"x")
+    return str(root)
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "index" / "art.json")
+
+
+def bump_mtime(path, seconds=10):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 1_000_000_000))
+
+
+def names(paths, root):
+    return [os.path.relpath(p, root).replace(os.sep, "/") for p in paths]
+
+
+def test_walks_top_down_in_name_order(tree, index_path):
+    paths = list(iter_images(tree, FolderIndex(tree, index_path)))
+    assert names(paths, tree) == ["1.png", "a/2.PNG", "a/deep/3.bmp", "b/4.jpg"]
+
+
+def test_each_root_gets_its_own_index_file(tmp_path):
+    assert get_index_path(str(tmp_path / "one")) != get_index_path(str(tmp_path / "two"))
+    assert get_index_path(str(tmp_path / "one")) == get_index_path(str(tmp_path / "one") + os.sep)
+
+
+def test_unchanged_directory_uses_the_cached_listing(tree, index_path):
+    index = FolderIndex(tree, index_path)
+    list(iter_images(tree, index))
+    index.save()
+    index = FolderIndex(tree, index_path).load()
+    (index.dirs[tree]["files"]).append("ghost.png")  # Only visible if the cache is used
+    assert "ghost.png" in names(iter_images(tree, index), tree)
+    assert not index.dirty
+
+
+def test_directory_mtime_change_invalidates_the_listing(tree, index_path):
+    index = FolderIndex(tree, index_path)
+    list(iter_images(tree, index))
+    index.save()
+    open(os.path.join(tree, "b", "5.png"), "wb").close()
+    bump_mtime(os.path.join(tree, "b"))
+    index = FolderIndex(tree, index_path).load()
+    assert "b/5.png" in names(iter_images(tree, index), tree)
+    assert index.dirty
+
+
+def test_complete_scan_prunes_deleted_directories(tree, index_path):
+    index = FolderIndex(tree, index_path)
+    list(iter_images(tree, index))
+    index.save()
+    deep = os.path.join(tree, "a", "deep")
+    os.remove(os.path.join(deep, "3.bmp"))
+    os.rmdir(deep)
+    bump_mtime(os.path.join(tree, "a"))
+    index = FolderIndex(tree, index_path).load()
+    list(iter_images(tree, index))
+    index.save()
+    assert deep not in FolderIndex(tree, index_path).load().dirs
+
+
+def test_save_merges_with_a_concurrent_scan(tree, index_path):
+    first = FolderIndex(tree, index_path).load()
+    second = FolderIndex(tree, index_path).load()
+    first.list_dir(os.path.join(tree, "a"))
+    second.list_dir(os.path.join(tree, "b"))
+    first.save()
+    second.save()
+    assert set(FolderIndex(tree, index_path).load().dirs) == {os.path.join(tree, "a"), os.path.join(tree, "b")}
+
+
+def test_index_for_another_root_is_ignored(tree, index_path, tmp_path):
+    index = FolderIndex(tree, index_path)
+    list(iter_images(tree, index))
+    index.save()
+    assert FolderIndex(str(tmp_path), index_path).load().dirs == {}
+
+
+def test_cancelled_scan_stops_yielding(tree, index_path):
+    cancel = threading.Event()
+    scan = iter_images(tree, FolderIndex(tree, index_path), cancel)
+    assert names([next(scan)], tree) == ["1.png"]
+    cancel.set()
+    assert list(scan) == []
+
+
+def test_cancelled_scan_does_not_prune(tree, index_path):
+    index = FolderIndex(tree, index_path)
+    list(iter_images(tree, index))
+    cancel = threading.Event()
+    cancel.set()
+    list(iter_images(tree, index, cancel))
+    assert len(index.dirs) == 4
+
+
+def poll_until_finished(scanner, timeout=5.0):
+    paths = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        found, finished = scanner.poll()
+        paths.extend(found)
+        if finished:
+            return paths
+        time.sleep(0.01)
+    raise AssertionError("scan did not finish")
+
+
+def test_scanner_drops_results_from_a_cancelled_scan(tree, tmp_path, monkeypatch):
+    monkeypatch.setattr(folder_scan, "get_index_path", lambda root: str(tmp_path / "index" / "scan.json"))
+    scanner = FolderScanner()
+    scanner.start(tree)
+    scanner.cancel()
+    assert scanner.poll() == ([], False)
+    scanner.start(os.path.join(tree, "b"))
+    assert names(poll_until_finished(scanner), tree) == ["b/4.jpg"]
+    assert scanner.error is None
@@ -0,0 +1,52 @@
+import logging
+import random
+
+import pytest
+from PIL import Image
+
+import image_analysis
+from image_analysis import detect_background
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def without_numpy(monkeypatch):
+    monkeypatch.setattr(image_analysis, "_numpy", False)
+
+
+def noisy_frame(seed, size=(40, 30)):
+    """A magenta-ish border with JPEG-like noise around a green subject."""
+    rng = random.Random(seed)
+    image = Image.new("RGBA", size)
+    image.putdata([(250 + rng.randint(-3, 3), rng.randint(0, 6), 250 + rng.randint(-3, 3), 255)
+                   for _ in range(size[0] * size[1])])
+    image.paste((0, 200, 0, 255), (10, 8, 30, 22))
+    return image
+
+
+@pytest.mark.parametrize("region", ["border", "corners"])
+@pytest.mark.parametrize("seed", range(5))
+def test_pil_fallback_matches_numpy(region, seed, without_numpy):
+    image = noisy_frame(seed)
+    fallback = detect_background(image, region)
+    image_analysis._numpy = None  # Import NumPy again
+    assert detect_background(image, region) == fallback
+    assert fallback in [color for _, color in image.convert("RGB").getcolors(image.width * image.height)]
+
+
+def test_transparent_border_gives_none_on_both_paths(without_numpy):
+    image = Image.new("RGBA", (20, 20), (0, 0, 0, 0))
+    image.paste((255, 0, 0, 255), (5, 5, 15, 15))
+    assert detect_background(image) is None
+    image_analysis._numpy = None
+    assert detect_background(image) is None
+
+
+def test_missing_numpy_is_logged_once(monkeypatch, caplog):
+    monkeypatch.setattr(image_analysis, "_numpy", None)
+    monkeypatch.setitem(__import__("sys").modules, "numpy", None)  # Makes the import fail
+    with caplog.at_level(logging.INFO, logger="ImageResizer"):
+        assert image_analysis._np() is None
+        assert image_analysis._np() is None
+    assert len([r for r in caplog.records if "NumPy" in r.getMessage()]) == 1
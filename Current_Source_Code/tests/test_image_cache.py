@@ -0,0 +1,75 @@
+import os
+
+import pytest
+from PIL import Image
+
+from image_cache import ImageCache
+
+ENTRY_BYTES = 10 * 10 * 4  # One 10x10 RGBA image, no thumbnail
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i, color in enumerate(["red", "green", "blue"]):
+        path = tmp_path / f"{i}.png"
+        Image.new("RGB", (10, 10), color).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def bump_mtime(path, seconds=10):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 1_000_000_000))
+
+
+def test_hit_returns_the_same_entry(images):
+    cache = ImageCache()
+    first = cache.get(images[0])
+    assert cache.get(images[0]) is first
+    assert first.image.mode == "RGBA"
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_least_recently_used_is_evicted_first(images):
+    cache = ImageCache(budget_bytes=2 * ENTRY_BYTES)
+    cache.get(images[0])
+    cache.get(images[1])
+    cache.get(images[0])  # images[1] is now the oldest
+    cache.get(images[2])
+    assert cache.contains(images[0]) and cache.contains(images[2])
+    assert not cache.contains(images[1])
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["bytes"] == 2 * ENTRY_BYTES
+
+
+def test_single_entry_over_budget_is_kept(images):
+    cache = ImageCache(budget_bytes=ENTRY_BYTES // 2)
+    entry = cache.get(images[0])
+    assert cache.contains(images[0])
+    assert cache.get(images[0]) is entry
+    cache.get(images[1])  # Pushes the first one out instead
+    assert not cache.contains(images[0]) and cache.contains(images[1])
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_changed_mtime_is_a_miss(images):
+    cache = ImageCache()
+    first = cache.get(images[0])
+    Image.new("RGB", (10, 10), "white").save(images[0])
+    bump_mtime(images[0])
+    assert not cache.contains(images[0])
+    second = cache.get(images[0])
+    assert second is not first
+    assert second.image.getpixel((0, 0)) == (255, 255, 255, 255)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_thumbnail_bytes_count_against_the_budget(images):
+    cache = ImageCache()
+    entry = cache.get(images[0], (5, 5))
+    assert entry.thumbnail.size == (5, 5)
+    assert cache.get_stats()["bytes"] == ENTRY_BYTES + 5 * 5 * 4
+    cache.get(images[0], (2, 2))
+    assert cache.get_stats()["bytes"] == ENTRY_BYTES + 2 * 2 * 4
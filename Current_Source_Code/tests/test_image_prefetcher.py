@@ -0,0 +1,57 @@
+import logging
+from concurrent.futures import Future
+
+import pytest
+from PIL import Image
+
+from image_cache import ImageCache
+from image_prefetcher import ImagePrefetcher
+
+
+class BrokenAnalyzer:
+    active = True
+
+    def analyse_now(self, path, image):
+        raise ValueError("analysis blew up")
+
+
+@pytest.fixture
+def paths(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"{i}.png"
+        Image.new("RGB", (8, 8), (i * 60, 0, 0)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_neighbours_are_decoded_into_the_cache(paths):
+    cache = ImageCache()
+    prefetcher = ImagePrefetcher(cache, ahead=2, behind=1)
+    prefetcher.schedule(paths, 1, (4, 4))
+    for path in (paths[0], paths[2], paths[3]):
+        prefetcher.wait(path, timeout=5)
+    prefetcher.shutdown()
+    assert [cache.contains(path) for path in paths] == [True, False, True, True]
+
+
+def test_failed_analysis_is_logged_and_the_image_still_cached(paths, caplog):
+    cache = ImageCache()
+    prefetcher = ImagePrefetcher(cache, ahead=1, behind=0, analyzer=BrokenAnalyzer())
+    with caplog.at_level(logging.ERROR, logger="ImageResizer"):
+        prefetcher.schedule(paths, 0, None)
+        prefetcher.wait(paths[1], timeout=5)
+    prefetcher.shutdown()
+    assert cache.contains(paths[1])
+    assert any("analysis" in r.getMessage() and r.exc_info for r in caplog.records)
+
+
+def test_wait_logs_a_failed_prefetch_at_debug(caplog):
+    prefetcher = ImagePrefetcher(ImageCache())
+    future = Future()
+    future.set_exception(OSError("cannot identify image file"))
+    prefetcher._futures["broken.png"] = future
+    with caplog.at_level(logging.DEBUG, logger="ImageResizer"):
+        prefetcher.wait("broken.png")  # Doesn't raise; the caller hits the error when it loads the file
+    prefetcher.shutdown()
+    assert [(r.levelno, "broken.png" in r.getMessage()) for r in caplog.records] == [(logging.DEBUG, True)]
@@ -0,0 +1,44 @@
+import logging
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from log_console import RingBufferHandler
+
+
+@pytest.fixture
+def logger():
+    handler = RingBufferHandler(capacity=3)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("test_log_console")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    yield logger, handler
+    logger.removeHandler(handler)
+
+
+def test_since_returns_only_unseen_lines(logger):
+    log, handler = logger
+    assert handler.since(0) == ([], 0, True)
+    log.info("one")
+    log.info("two")
+    assert handler.since(0) == (["one", "two"], 2, True)
+    assert handler.since(1) == (["two"], 2, True)
+    assert handler.since(2) == ([], 2, True)
+
+
+def test_since_reports_lines_that_fell_out_of_the_buffer(logger):
+    log, handler = logger
+    for i in range(5):
+        log.info("line %d", i)
+    assert handler.since(2) == (["line 2", "line 3", "line 4"], 5, True)
+    assert handler.since(1) == (["line 2", "line 3", "line 4"], 5, False)
+    assert handler.since(0) == (["line 2", "line 3", "line 4"], 5, False)
+
+
+def test_lazy_arguments_are_formatted_by_the_handler(logger):
+    log, handler = logger
+    log.debug("Suggested center for %s: %s (%s)", "frame.png", (3, 4), "alpha")
+    assert handler.since(0)[0] == ["Suggested center for frame.png: (3, 4) (alpha)"]
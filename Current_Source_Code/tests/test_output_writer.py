@@ -0,0 +1,94 @@
+import os
+import threading
+
+import pytest
+from PIL import Image
+
+from output_writer import OutputWriter
+
+
+class GatedImage:
+    """Stands in for a PIL image; save() waits until the gate opens."""
+
+    def __init__(self, data, gate=None, error=None):
+        self.data = data
+        self.gate = gate
+        self.error = error
+        self.started = threading.Event()
+
+    def save(self, path):
+        self.started.set()
+        if self.gate is not None:
+            assert self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        with open(path, "wb") as f:
+            f.write(self.data)
+
+
+@pytest.fixture
+def writer():
+    writer = OutputWriter(max_workers=1, max_pending=3)
+    yield writer
+    writer.shutdown()
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_writes_a_real_image(writer, tmp_path):
+    output = str(tmp_path / "32x32" / "frame.bmp")
+    image = Image.new("RGB", (4, 4), "red")
+    assert writer.submit(image, output).result(5) >= 0
+    with Image.open(output) as saved:
+        assert saved.getpixel((0, 0)) == (255, 0, 0)
+    assert writer.get_recent(output) is image
+    assert [name for name in os.listdir(tmp_path / "32x32")] == ["frame.bmp"]
+
+
+def test_newer_submit_supersedes_a_queued_one(writer, tmp_path):
+    gate = threading.Event()
+    blocker = GatedImage(b"blocker", gate)
+    writer.submit(blocker, str(tmp_path / "other.bmp"))
+    assert blocker.started.wait(5)
+    output = str(tmp_path / "frame.bmp")
+    old = writer.submit(GatedImage(b"old"), output)
+    new = writer.submit(GatedImage(b"new"), output)
+    gate.set()
+    assert old.result(5) is None
+    assert new.result(5) is not None
+    assert read(output) == b"new"
+    assert writer.drain_errors() == []
+
+
+def test_failed_write_is_reported_and_forgotten(writer, tmp_path):
+    output = str(tmp_path / "frame.bmp")
+    assert writer.submit(GatedImage(b"", error=OSError("disk full")), output).result(5) is None
+    errors = writer.drain_errors()
+    assert [(path, message) for path, message, _ in errors] == [(output, "disk full")]
+    assert "OSError" in errors[0][2]
+    assert writer.get_recent(output) is None
+    assert writer._latest == {}
+    assert os.listdir(tmp_path) == []  # Temp file removed
+    # The path still works afterwards
+    assert writer.submit(GatedImage(b"retry"), output).result(5) is not None
+    assert read(output) == b"retry"
+
+
+def test_submit_blocks_when_max_pending_writes_are_in_flight(writer, tmp_path):
+    gate = threading.Event()
+    for name in ("1", "2", "3"):
+        writer.submit(GatedImage(name.encode(), gate), str(tmp_path / f"{name}.bmp"))
+    submitted = threading.Event()
+    thread = threading.Thread(target=lambda: (writer.submit(GatedImage(b"4"), str(tmp_path / "4.bmp")),
+                                              submitted.set()))
+    thread.start()
+    assert not submitted.wait(0.2)
+    assert writer.pending_count() == 3
+    gate.set()
+    assert submitted.wait(5)
+    thread.join(5)
+    writer.flush(5)
+    assert sorted(os.listdir(tmp_path)) == ["1.bmp", "2.bmp", "3.bmp", "4.bmp"]
@@ -0,0 +1,72 @@
+import gc
+import random
+import weakref
+
+import pytest
+from PIL import Image, ImageChops
+
+from preview_engine import PreviewEngine
+from render_core import render_centered
+
+BG = (255, 0, 255)
+
+
+def make_source(width, height, seed=1):
+    """Noisy RGBA frame with partial transparency."""
+    rng = random.Random(seed)
+    return Image.frombytes("RGBA", (width, height), bytes(rng.getrandbits(8) for _ in range(width * height * 4)))
+
+
+def assert_same(a, b):
+    assert a.size == b.size and a.mode == b.mode
+    assert ImageChops.difference(a, b).getbbox() is None
+
+
+@pytest.mark.parametrize("center", [(40, 30), (0, 0), (79, 59), (3, 57), (-20, 100), (500, -7)])
+@pytest.mark.parametrize("size", [(32, 32), (33, 17), (200, 150), (1, 1)])
+def test_preview_is_pixel_identical_to_render_centered(center, size):
+    image = make_source(80, 60)
+    engine = PreviewEngine()
+    preview = engine.render(image, BG, center[0], center[1], *size, source_key=("frame.png", 1))
+    # The engine clamps the center to the image
+    cx, cy = max(0, min(center[0], 79)), max(0, min(center[1], 59))
+    assert_same(preview, render_centered(image, cx, cy, size[0], size[1], BG))
+
+
+def test_buffer_is_reused_and_grown_for_the_same_source():
+    image = make_source(80, 60)
+    engine = PreviewEngine()
+    engine.render(image, BG, 10, 10, 64, 64, source_key=("frame.png", 1))
+    engine.render(image, BG, 50, 20, 32, 32, source_key=("frame.png", 1))
+    assert engine.generation == 1
+    preview = engine.render(image, BG, 70, 50, 128, 96, source_key=("frame.png", 1))
+    assert engine.generation == 2
+    assert_same(preview, render_centered(image, 70, 50, 128, 96, BG))
+    # A smaller size after growing still fits the bigger buffer
+    assert_same(engine.render(image, BG, 5, 5, 64, 64, source_key=("frame.png", 1)),
+                render_centered(image, 5, 5, 64, 64, BG))
+    assert engine.generation == 2
+
+
+def test_new_source_key_or_colour_rebuilds():
+    engine = PreviewEngine()
+    old = make_source(80, 60, seed=1)
+    new = make_source(80, 60, seed=2)
+    engine.render(old, BG, 10, 10, 32, 32, source_key=("frame.png", 1))
+    # Same path, new mtime: the file was re-saved
+    assert_same(engine.render(new, BG, 10, 10, 32, 32, source_key=("frame.png", 2)),
+                render_centered(new, 10, 10, 32, 32, BG))
+    assert_same(engine.render(new, (0, 0, 0), 10, 10, 32, 32, source_key=("frame.png", 2)),
+                render_centered(new, 10, 10, 32, 32, (0, 0, 0)))
+    assert engine.generation == 3
+
+
+def test_engine_does_not_keep_the_source_alive():
+    engine = PreviewEngine()
+    image = make_source(40, 40)
+    ref = weakref.ref(image)
+    engine.render(image, BG, 10, 10, 32, 32, source_key=("frame.png", 1))
+    engine.render(image, BG, 10, 10, 32, 32)  # Keyed on the image object instead
+    del image
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+from PIL import Image, ImageChops
+
+from render_core import export_image, flatten_window, render_centered, render_centered_multi
+
+BG = (255, 0, 255, 255)
+
+
+def legacy_render(image, center_x, center_y, target_w, target_h, bg_color):
+    """The per-size render every output used before render_centered_multi (the reference)."""
+    r, g, b = bg_color[:3]
+    result = Image.new("RGBA", (target_w, target_h), (r, g, b, 255))
+    offset_x = target_w // 2 - center_x
+    offset_y = target_h // 2 - center_y
+    from_x = max(0, -offset_x)
+    from_y = max(0, -offset_y)
+    to_x = min(image.width, target_w - offset_x)
+    to_y = min(image.height, target_h - offset_y)
+    if from_x < to_x and from_y < to_y:
+        cropped = image.crop((from_x, from_y, to_x, to_y))
+        paste_x = max(0, offset_x)
+        paste_y = max(0, offset_y)
+        if cropped.mode == 'RGBA':
+            result.paste(cropped, (paste_x, paste_y), mask=cropped.split()[3])
+        else:
+            result.paste(cropped, (paste_x, paste_y))
+    return result
+
+
+def make_source(width, height, mode="RGBA", seed=1):
+    """Noisy frame with partial transparency, like a sprite with soft edges."""
+    rng = random.Random(seed)
+    channels = len(mode)
+    return Image.frombytes(mode, (width, height), bytes(rng.getrandbits(8) for _ in range(width * height * channels)))
+
+
+def assert_same(a, b):
+    assert a.size == b.size and a.mode == b.mode
+    assert ImageChops.difference(a, b).getbbox() is None
+
+
+CENTERS = [(40, 30), (0, 0), (79, 59), (5, 55), (-20, 100)]
+
+
+@pytest.mark.parametrize("center", CENTERS)
+@pytest.mark.parametrize("sizes", [
+    [(32, 32)],
+    [(32, 32), (48, 40), (64, 64), (100, 20)],
+    [(200, 4), (4, 200)],  # Too different for one shared buffer: rendered separately
+])
+def test_multi_matches_per_size_render(center, sizes):
+    image = make_source(80, 60)
+    rendered = render_centered_multi(image, center[0], center[1], sizes, BG)
+    assert set(rendered) == set(sizes)
+    for w, h in sizes:
+        assert_same(rendered[(w, h)], legacy_render(image, center[0], center[1], w, h, BG))
+
+
+def test_multi_matches_for_opaque_sources():
+    image = make_source(50, 50, mode="RGB")
+    sizes = [(20, 20), (31, 17)]
+    rendered = render_centered_multi(image, 10, 40, sizes, BG)
+    for w, h in sizes:
+        assert_same(rendered[(w, h)], legacy_render(image, 10, 40, w, h, BG))
+
+
+def test_duplicate_sizes_render_once():
+    image = make_source(20, 20)
+    rendered = render_centered_multi(image, 10, 10, [(8, 8), (8, 8), (12, 6)], BG)
+    assert sorted(rendered) == [(8, 8), (12, 6)]
+
+
+@pytest.mark.parametrize("left, top", [(0, 0), (-10, -5), (70, 50), (200, 200)])
+def test_flatten_window_matches_render_centered(left, top):
+    image = make_source(80, 60)
+    w, h = 24, 18
+    window = flatten_window(image, left, top, w, h, BG)
+    assert_same(window, render_centered(image, left + w // 2, top + h // 2, w, h, BG))
+    assert_same(window, legacy_render(image, left + w // 2, top + h // 2, w, h, BG))
+
+
+def test_output_is_opaque_background_outside_the_source():
+    image = Image.new("RGBA", (4, 4), (0, 0, 0, 0))
+    result = render_centered(image, 2, 2, 10, 10, (1, 2, 3))
+    assert result.getcolors() == [(100, (1, 2, 3, 255))]
+
+
+def test_export_image_writes_each_size(tmp_path):
+    image = make_source(60, 40)
+    sizes = [(16, 16), (30, 20)]
+    written = export_image(image, 30, 20, sizes, BG, str(tmp_path), "frame.bmp")
+    assert written == [str(tmp_path / "16x16" / "frame.bmp"), str(tmp_path / "30x20" / "frame.bmp")]
+    for (w, h), path in zip(sizes, written):
+        with Image.open(path) as saved:
+            expected = legacy_render(image, 30, 20, w, h, BG).convert(saved.mode)
+            assert_same(saved.convert(saved.mode), expected)
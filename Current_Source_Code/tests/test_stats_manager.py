@@ -0,0 +1,152 @@
+import json
+import os
+
+import pytest
+
+from stats_manager import STATS_VERSION, StatsManager
+
+
+@pytest.fixture
+def make_manager(tmp_path, monkeypatch):
+    """Factory for StatsManagers whose files live in tmp_path."""
+    stats_path = str(tmp_path / "app_statistics.json")
+    monkeypatch.setattr(StatsManager, "get_stats_path", lambda self: stats_path)
+    managers = []
+
+    def make(**kwargs):
+        manager = StatsManager(**kwargs)
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        if getattr(manager, "throughput", None) is not None:
+            manager.throughput.close()
+
+
+def read_journal(manager):
+    with open(manager.journal_file) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_snapshot(manager):
+    with open(manager.stats_file) as f:
+        return json.load(f)
+
+
+def add_files(manager, count, folder="frames"):
+    for i in range(count):
+        manager.add_processed_file(os.path.join(folder, f"f{i}.png"), [(32, 32), (64, 48)], (255, 0, 255))
+
+
+def test_changes_stay_in_memory_until_flush(make_manager):
+    manager = make_manager(flush_batch=100)
+    add_files(manager, 3)
+    assert read_journal(manager) == []
+    assert manager.stats["total_files_processed"] == 0
+
+    manager.flush()
+    (delta,) = read_journal(manager)
+    assert delta["seq"] == 1 and delta["files"] == 3
+    assert manager.stats["total_files_processed"] == 3
+    assert manager.stats["resolutions_used"] == {"32x32": 3, "64x48": 3}
+    assert manager.stats["background_colors"] == {"#ff00ff": 3}
+    assert manager.stats["pixels_processed"] == 3 * (32 * 32 + 64 * 48)
+    assert manager.stats["folders_extracted"] == ["frames"]
+
+
+def test_flush_batch_appends_one_line_per_batch(make_manager):
+    manager = make_manager(flush_batch=2)
+    add_files(manager, 5)
+    assert [delta["files"] for delta in read_journal(manager)] == [2, 2]
+    assert [delta["seq"] for delta in read_journal(manager)] == [1, 2]
+
+
+def test_journal_is_replayed_after_a_crash(make_manager):
+    manager = make_manager(flush_batch=100)
+    add_files(manager, 4)
+    manager.flush()  # Journal written, never compacted: the app died here
+
+    reloaded = make_manager()
+    assert reloaded.stats["total_files_processed"] == 4
+    assert reloaded.stats["resolutions_used"] == {"32x32": 4, "64x48": 4}
+    # Loading compacts: the snapshot holds everything and the journal is empty
+    assert read_journal(reloaded) == []
+    assert read_snapshot(reloaded)["total_files_processed"] == 4
+
+
+def test_entries_already_in_the_snapshot_are_not_replayed(make_manager):
+    manager = make_manager(flush_batch=100)
+    add_files(manager, 2)
+    manager.flush()
+    manager.save_stats()  # Snapshot written but the journal not yet truncated
+
+    reloaded = make_manager()
+    assert reloaded.stats["total_files_processed"] == 2
+
+
+def test_a_cut_short_journal_line_is_skipped(make_manager):
+    manager = make_manager(flush_batch=100)
+    add_files(manager, 2)
+    manager.flush()
+    with open(manager.journal_file, "a") as f:
+        f.write('{"seq": 2, "files": 5')  # Crash mid-write
+
+    reloaded = make_manager()
+    assert reloaded.stats["total_files_processed"] == 2
+
+
+def test_end_session_compacts(make_manager):
+    manager = make_manager(flush_batch=100)
+    add_files(manager, 3, folder="a")
+    add_files(manager, 1, folder="b")
+    manager.end_session()
+    assert read_journal(manager) == []
+    snapshot = read_snapshot(manager)
+    assert snapshot["total_files_processed"] == 4
+    assert snapshot["largest_batch"] == 4
+    assert snapshot["folders_extracted"] == ["a", "b"]
+    assert snapshot["journal_seq"] == 1
+
+
+def test_app_call_shape_records_the_source_folder(make_manager, tmp_path):
+    # process_image calls once per resolution with the source path and an RGBA background
+    source = str(tmp_path / "take_3" / "frame_0001.png")
+    manager = make_manager(flush_batch=100)
+    for size in [(32, 32), (64, 64)]:
+        manager.add_processed_file(source, [size], (255, 0, 255, 255))
+    manager.flush()
+    assert manager.get_folders_extracted() == [str(tmp_path / "take_3")]
+    assert manager.get_top_file_types() == [("png", 2)]
+    assert manager.get_top_colors()[0][0] == "#ff00ff"
+    assert manager.stats["last_file_processed"]["name"] == source
+
+
+def test_old_list_format_is_migrated(make_manager, tmp_path):
+    old = {
+        "total_files_processed": 3,
+        "total_time_spent": 12,
+        "session_count": 1,
+        "background_colors": ["#ff00ff", "#000000", "#ff00ff"],
+        "resolutions_used": ["32x32", "32x32", "64x64"],
+        "folders_extracted": ["a", "b", "a"],
+    }
+    with open(tmp_path / "app_statistics.json", "w") as f:
+        json.dump(old, f)
+
+    manager = make_manager()
+    assert manager.stats["background_colors"] == {"#ff00ff": 2, "#000000": 1}
+    assert manager.stats["resolutions_used"] == {"32x32": 2, "64x64": 1}
+    assert manager.stats["folders_extracted"] == ["a", "b"]
+    assert manager.stats["total_files_processed"] == 3
+    assert manager.stats["session_count"] == 2
+
+    snapshot = read_snapshot(manager)
+    assert snapshot["stats_version"] == STATS_VERSION
+    assert snapshot["background_colors"] == {"#ff00ff": 2, "#000000": 1}
+
+    # New files add to the migrated counters
+    add_files(manager, 1, folder="c")
+    manager.flush()
+    assert manager.stats["background_colors"]["#ff00ff"] == 3
+    assert manager.stats["folders_extracted"] == ["a", "b", "c"]
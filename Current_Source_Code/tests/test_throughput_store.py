@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from throughput_store import ThroughputStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ThroughputStore(str(tmp_path / "stats.sqlite3"))
+    yield store
+    store.close()
+
+
+def event(dwell, folder="take_1", session=1, ts=1000.0):
+    return {"ts": ts, "session": session, "folder": folder, "dwell": dwell,
+            "decode": None, "render": None, "save": None, "resolutions": 1}
+
+
+def test_empty_table_has_no_percentile(store):
+    assert store.dwell_percentile(0.5) is None
+    store.add_events([event(None)])  # Events without a dwell don't count either
+    assert store.dwell_percentile(0.5) is None
+
+
+def test_percentiles_of_a_known_distribution(store):
+    # Dwells 1..101 s in random order, plus events with no dwell that must be ignored
+    dwells = list(range(1, 102))
+    random.Random(3).shuffle(dwells)
+    store.add_events([event(float(d)) for d in dwells] + [event(None)] * 10)
+    assert store.dwell_percentile(0.0) == 1.0
+    assert store.dwell_percentile(0.5) == 51.0
+    assert store.dwell_percentile(0.95) == 96.0
+    assert store.dwell_percentile(1.0) == 101.0
+    assert store.dwell_percentile(2.0) == 101.0  # Clamped to the largest
+
+
+def test_percentile_rounds_to_the_nearest_rank(store):
+    store.add_events([event(d) for d in (4.0, 1.0, 3.0, 2.0)])
+    assert store.dwell_percentile(0.5) == 3.0  # Rank round(1.5) = 2 of 0..3
+    assert store.dwell_percentile(0.25) == 2.0
+    assert store.dwell_percentile(0.1) == 1.0
+
+
+def test_slowest_folders_need_enough_frames(store):
+    store.add_events([event(10.0, "slow")] * 2 + [event(2.0, "ok")] * 3 + [event(5.0, "mid")] * 3)
+    assert store.slowest_folders(min_frames=3) == [("mid", 3, 5.0), ("ok", 3, 2.0)]
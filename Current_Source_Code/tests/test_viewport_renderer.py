@@ -0,0 +1,99 @@
+import pytest
+from PIL import Image
+
+from viewport_renderer import LANCZOS, NEAREST, compute_viewport, draw_pixel_grid, render_viewport
+
+
+def checkerboard(size):
+    image = Image.new("RGBA", (size, size))
+    image.putdata([(255, 255, 255, 255) if (x + y) % 2 else (0, 0, 0, 255)
+                   for y in range(size) for x in range(size)])
+    return image
+
+
+@pytest.fixture
+def resizes(monkeypatch):
+    """Record the size and resample filter of every Image.resize call (RGBA resizes recurse once)."""
+    calls = []
+    original = Image.Image.resize
+
+    def resize(image, size, resample=None, box=None, *args, **kwargs):
+        calls.append((image.size, resample))
+        return original(image, size, resample, box, *args, **kwargs)
+    monkeypatch.setattr(Image.Image, "resize", resize)
+    return calls
+
+
+def test_whole_image_on_canvas():
+    assert compute_viewport(200, 100, 50, 20, 400, 300) == (0, 0, 200, 100)
+
+
+def test_zoomed_in_image_is_clipped_to_the_canvas():
+    # A 1000x800 image centred on a 400x300 canvas
+    assert compute_viewport(1000, 800, -300, -250, 400, 300) == (300, 250, 700, 550)
+
+
+def test_margin_extends_the_visible_rect():
+    assert compute_viewport(1000, 800, -300, -250, 400, 300, margin=50) == (250, 200, 750, 600)
+
+
+def test_panned_past_the_image_bounds():
+    # Image's right edge is 10 px inside the canvas's left edge
+    assert compute_viewport(200, 100, -190, 0, 400, 300) == (190, 0, 200, 100)
+    # Completely off to the left, the bottom, and off even with the margin
+    assert compute_viewport(200, 100, -200, 0, 400, 300) is None
+    assert compute_viewport(200, 100, 0, 300, 400, 300) is None
+    assert compute_viewport(200, 100, -260, 0, 400, 300, margin=50) is None
+    assert compute_viewport(200, 100, -240, 0, 400, 300, margin=50) == (190, 0, 200, 100)
+
+
+def test_fractional_offsets_round_outwards():
+    assert compute_viewport(100, 100, -10.5, -0.5, 50.2, 50) == (10, 0, 61, 51)
+
+
+def test_base_zoom_crops_the_thumbnail(resizes):
+    source = checkerboard(40)
+    thumb = source.resize((20, 20))
+    resizes.clear()
+    out = render_viewport(source, thumb, (20, 20), (5, 5, 15, 10))
+    assert out.size == (10, 5)
+    assert out.tobytes() == thumb.crop((5, 5, 15, 10)).tobytes()
+    assert resizes == []
+
+
+def test_magnifying_uses_nearest_on_the_source(resizes):
+    source = checkerboard(8)
+    thumb = source.copy()
+    thumb.thumbnail((4, 4))
+    resizes.clear()
+    out = render_viewport(source, thumb, (32, 32), (4, 8, 20, 24))
+    assert resizes[0] == ((8, 8), NEAREST)
+    # Every source pixel is a crisp 4x4 block
+    for y in range(out.height):
+        for x in range(out.width):
+            assert out.getpixel((x, y)) == source.getpixel(((x + 4) // 4, (y + 8) // 4))
+
+
+def test_zoomed_out_below_the_thumbnail_scales_the_thumbnail(resizes):
+    source = checkerboard(40)
+    thumb = source.resize((20, 20))
+    resizes.clear()
+    out = render_viewport(source, thumb, (10, 10), (0, 0, 10, 10))
+    assert out.size == (10, 10)
+    assert resizes[0] == ((20, 20), LANCZOS)
+
+
+def test_between_thumbnail_and_source_scales_the_source(resizes):
+    source = checkerboard(40)
+    thumb = source.resize((20, 20))
+    resizes.clear()
+    render_viewport(source, thumb, (30, 30), (0, 0, 30, 30))
+    assert resizes[0] == ((40, 40), LANCZOS)
+
+
+def test_pixel_grid_lines_follow_the_viewport_offset():
+    image = Image.new("RGB", (10, 10), "black")
+    draw_pixel_grid(image, (3, 0, 13, 10), 4, 4, "red")
+    # Cell boundaries at display x = 4, 8, 12 are x = 1, 5, 9 in the strip
+    assert [x for x in range(10) if image.getpixel((x, 2)) == (255, 0, 0)] == [1, 5, 9]
+    assert [y for y in range(10) if image.getpixel((2, y)) == (255, 0, 0)] == [0, 4, 8]
@@ -0,0 +1,180 @@
+import re
+
+import pytest
+
+from xml_bulk import bulk_edit, copy_column, find_replace, scale_offset, set_value
+from xml_table import ColumnStore
+
+
+def make_store(rows):
+    store = ColumnStore()
+    for row in rows:
+        for tag in row:
+            store.column_id(tag)
+    for row in rows:
+        store.append_chunk(1, {})
+        for tag, text in row.items():
+            store.set(store.row_count - 1, tag, text)
+    return store
+
+
+def column(store, tag):
+    return [store.raw(row, tag) for row in range(store.row_count)]
+
+
+ROWS = [
+    {"Name": "item_1", "Price": "100", "Rate": "0.5"},
+    {"Name": "item_2", "Price": "007", "Rate": "1.25"},
+    {"Name": "other", "Price": "+5"},
+    {"Name": "item_3", "Price": "n/a", "Rate": "x"},
+]
+
+
+def test_set_value_on_a_subset():
+    store = make_store(ROWS)
+    edit = bulk_edit(store, [0, 2, 3], "Rate", set_value("2"))
+    assert column(store, "Rate") == ["2", "1.25", "2", "2"]  # Row 2 had no Rate: it gets one
+    assert list(edit.rows) == [0, 2, 3]
+
+
+def test_find_replace_plain_and_regex():
+    store = make_store(ROWS)
+    bulk_edit(store, range(4), "Name", find_replace("item_", "thing-"))
+    assert column(store, "Name") == ["thing-1", "thing-2", "other", "thing-3"]
+    bulk_edit(store, range(4), "Name", find_replace(r"thing-(\d)", r"\1-thing", use_regex=True))
+    assert column(store, "Name") == ["1-thing", "2-thing", "other", "3-thing"]
+    with pytest.raises(re.error):
+        find_replace("(", "", use_regex=True)
+
+
+def test_find_replace_skips_missing_cells():
+    store = make_store(ROWS)
+    edit = bulk_edit(store, range(4), "Rate", find_replace("", "!"))
+    assert column(store, "Rate")[2] is None
+    assert 2 not in edit.rows
+
+
+def test_scale_offset():
+    store = make_store(ROWS)
+    edit = bulk_edit(store, [0, 1, 3], "Price", scale_offset(1.5, 1))
+    assert column(store, "Price") == ["151", "12", "+5", "n/a"]  # Text isn't a number
+    assert list(edit.rows) == [0, 1]
+    bulk_edit(store, range(4), "Rate", scale_offset(2))
+    assert column(store, "Rate") == ["1", "2.5", None, "x"]
+
+
+@pytest.mark.parametrize("text", ["007", "+5", " 5", "1_000", "1e3", "1.50", "-0", "abc"])
+def test_identity_scale_leaves_text_alone(text):
+    store = make_store([{"A": text}])
+    edit = bulk_edit(store, range(1), "A", scale_offset(1, 0))
+    assert len(edit) == 0
+    assert store.raw(0, "A") == text
+
+
+def test_unchanged_values_are_not_recorded():
+    store = make_store(ROWS)
+    edit = bulk_edit(store, range(4), "Price", set_value("100"))
+    assert list(edit.rows) == [1, 2, 3]
+
+
+def test_setting_empty_text_on_missing_cells_is_not_a_change():
+    store = make_store(ROWS)
+    edit = bulk_edit(store, range(4), "Rate", set_value(""))
+    # Row 2 has no <Rate>; an empty one wouldn't be written, so it isn't touched
+    assert list(edit.rows) == [0, 1, 3]
+    assert column(store, "Rate") == ["", "", None, ""]
+
+
+def test_copy_column():
+    store = make_store(ROWS)
+    edit = copy_column(store, range(4), "Rate", "Price")
+    assert column(store, "Rate") == ["100", "007", "+5", "n/a"]
+    assert list(edit.rows) == [0, 1, 2, 3]
+    store.set(0, "Price", "1")
+    store.columns[store.header_ids["Price"]][3] = 0  # Row 3 loses its Price element
+    edit = copy_column(store, range(4), "Rate", "Price")
+    assert list(edit.rows) == [0]  # Missing sources are skipped
+
+
+def test_transform_runs_once_per_distinct_value():
+    store = make_store([{"A": str(i % 3)} for i in range(300)])
+    calls = []
+
+    def transform(text):
+        calls.append(text)
+        return text + "!"
+    edit = bulk_edit(store, range(300), "A", transform)
+    assert sorted(calls) == ["0", "1", "2"]
+    assert len(edit) == 300
+
+
+def test_undo_restores_old_values():
+    store = make_store(ROWS)
+    before = column(store, "Name")
+    edit = bulk_edit(store, range(4), "Name", set_value("same"))
+    undone = edit.undo(store)
+    assert column(store, "Name") == before
+    assert list(undone.rows) == [0, 1, 2, 3]
+    # The undo is itself a BulkEdit from the bulk values back to the originals
+    assert list(undone.old_ids) == list(edit.new_ids) and list(undone.new_ids) == list(edit.old_ids)
+
+
+def test_undo_skips_cells_edited_since():
+    store = make_store(ROWS)
+    edit = bulk_edit(store, range(4), "Name", set_value("same"))
+    store.set(1, "Name", "hand edited")
+    undone = edit.undo(store)
+    assert column(store, "Name") == ["item_1", "hand edited", "other", "item_3"]
+    assert list(undone.rows) == [0, 2, 3]
+
+
+class Stub:
+    """Absorbs the editor's widget and index calls."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@pytest.fixture
+def editor():
+    pytest.importorskip("tkinter")
+    from readxml import TricksterXMLEditor
+
+    class Editor:
+        _record_bulk_edit = TricksterXMLEditor._record_bulk_edit
+        undo_bulk_edit = TricksterXMLEditor.undo_bulk_edit
+        _handle_cell_edit = TricksterXMLEditor._handle_cell_edit
+
+    editor = Editor()
+    editor.store = make_store(ROWS)
+    editor.edited_rows, editor.unsaved_rows = set(), set()
+    editor.bulk_first_edits, editor.bulk_first_unsaved = set(), set()
+    editor.last_bulk_edit = None
+    editor.search_index = editor.edit_menu = editor.table = editor.status_label = Stub()
+    return editor
+
+
+def test_undo_leaves_rows_only_the_bulk_edit_touched_clean(editor):
+    editor._handle_cell_edit(0, "Price", "1")
+    editor._record_bulk_edit(bulk_edit(editor.store, range(4), "Name", set_value("same")), "Set value")
+    assert editor.edited_rows == editor.unsaved_rows == {0, 1, 2, 3}
+    editor.undo_bulk_edit()
+    assert editor.edited_rows == editor.unsaved_rows == {0}
+
+
+def test_undo_keeps_rows_edited_by_hand_since(editor):
+    editor._record_bulk_edit(bulk_edit(editor.store, range(4), "Name", set_value("same")), "Set value")
+    editor._handle_cell_edit(2, "Price", "9")
+    editor.undo_bulk_edit()
+    assert editor.edited_rows == editor.unsaved_rows == {2}
+
+
+def test_undo_after_a_save_leaves_the_rows_unsaved(editor):
+    editor._record_bulk_edit(bulk_edit(editor.store, range(2), "Name", set_value("same")), "Set value")
+    editor.unsaved_rows.clear()  # What save_xml does
+    editor.bulk_first_unsaved = set()
+    editor.undo_bulk_edit()
+    # The saved file has the bulk values, so restoring them is an unsaved change; the rows are
+    # no longer edited, so the next save writes them back as in the source
+    assert editor.edited_rows == set()
+    assert editor.unsaved_rows == {0, 1}
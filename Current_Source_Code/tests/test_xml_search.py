@@ -0,0 +1,181 @@
+import time
+
+import pytest
+
+from xml_search import SearchIndex, parse_range
+from xml_table import ColumnStore
+
+ROWS = [
+    {"ID": "1", "Name": "Fire Sword", "Level": "10"},
+    {"ID": "2", "Name": "Ice Sword", "Level": "25.5"},
+    {"ID": "3", "Name": "fireball", "Level": "-3"},
+    {"ID": "4", "Name": "Shield"},
+    {"ID": "5", "Name": "SWORD", "Level": "n/a"},
+]
+
+
+def make_store(rows=ROWS):
+    store = ColumnStore()
+    for row in rows:
+        for tag in row:
+            store.column_id(tag)
+    for row in rows:
+        store.append_chunk(1, {})
+        for tag, text in row.items():
+            store.set(store.row_count - 1, tag, text)
+    return store
+
+
+def build(store):
+    index = SearchIndex(store)
+    index.start_build()
+    deadline = time.monotonic() + 10
+    while not index.poll():
+        assert time.monotonic() < deadline, "index build didn't finish"
+        time.sleep(0.01)
+    return index
+
+
+def brute_force(store, query, column, mode):
+    """What search() should return, computed cell by cell."""
+    bounds = parse_range(query)
+    query = query.lower()
+    hits = []
+    for row in range(store.row_count):
+        for tag in ([column] if column else store.headers):
+            text = store.raw(row, tag)
+            if text is None:
+                continue
+            text = text.lower()
+            if mode == "contains":
+                hit = query in text
+            elif mode == "exact":
+                hit = text == query
+            elif mode == "prefix":
+                hit = text.startswith(query)
+            else:
+                try:
+                    hit = bounds is not None and bounds[0] <= float(text) <= bounds[1]
+                except ValueError:
+                    hit = False
+            if hit:
+                hits.append(row)
+                break
+    return hits
+
+
+@pytest.fixture(params=["index", "scan"])
+def searcher(request):
+    """The same store searched through a built index and through the fallback scan."""
+    store = make_store()
+    return store, build(store) if request.param == "index" else SearchIndex(store)
+
+
+@pytest.mark.parametrize("query, column, mode, expected", [
+    ("sword", None, "contains", [0, 1, 4]),
+    ("SWORD", "Name", "contains", [0, 1, 4]),
+    ("ir", "Name", "contains", [0, 2]),
+    ("fire", None, "prefix", [0, 2]),
+    ("sword", "Name", "exact", [4]),
+    ("1", None, "exact", [0]),
+    ("0..20", "Level", "range", [0]),
+    ("..0", None, "range", [2]),
+    ("5", "ID", "range", [4]),
+    ("20..", None, "range", [1]),
+    ("abc", None, "range", []),
+    ("zzz", None, "contains", []),
+])
+def test_queries(searcher, query, column, mode, expected):
+    store, index = searcher
+    assert index.search(query, column, mode) == expected
+    assert brute_force(store, query, column, mode) == expected
+
+
+def test_parse_range():
+    assert parse_range("1..5") == (1.0, 5.0)
+    assert parse_range("3") == (3.0, 3.0)
+    assert parse_range("..2")[1] == 2.0 and parse_range("..2")[0] == float("-inf")
+    assert parse_range("x..y") is None
+
+
+def test_refining_a_contains_query():
+    index = build(make_store())
+    assert index.search("s", None, "contains") == [0, 1, 3, 4]
+    assert index.search("sw", None, "contains") == [0, 1, 4]
+    assert index.search("swo", None, "contains") == [0, 1, 4]
+    assert index.search("ield", None, "contains") == [3]  # Not an extension of "swo"
+    assert index.search("s", None, "contains") == [0, 1, 3, 4]  # Widening starts over
+
+
+def edit(store, index, row, tag, text):
+    old_id = store.set(row, tag, text)
+    column_id = store.header_ids[tag]
+    index.cell_changed(row, column_id, old_id, store.columns[column_id][row])
+
+
+def test_edits_update_the_index():
+    store = make_store()
+    index = build(store)
+    edit(store, index, 3, "Name", "Lightning Sword")
+    edit(store, index, 0, "Name", "Axe")
+    assert index.search("sword", "Name") == [1, 3, 4]
+    assert index.search("axe", "Name", "exact") == [0]
+    edit(store, index, 2, "Level", "15")
+    assert index.search("10..20", "Level", "range") == [0, 2]
+    edit(store, index, 3, "Level", "12")  # A cell the row didn't have
+    assert index.search("10..20", "Level", "range") == [0, 2, 3]
+
+
+def test_edits_during_a_build_are_applied_when_it_finishes():
+    store = make_store()
+    index = SearchIndex(store)
+    index.start_build()
+    edit(store, index, 1, "Name", "Wooden Club")  # Queued if the build hasn't been adopted yet
+    index._thread.join(10)
+    assert index.poll()
+    assert index.search("sword", "Name") == [0, 4]
+    assert index.search("club", None) == [1]
+
+
+def test_batch_edits_match_a_fresh_build():
+    rows = [{"A": str(i % 7), "B": f"name{i % 5}"} for i in range(300)]
+    store = make_store(rows)
+    index = build(store)
+    column_id = store.header_ids["A"]
+    changed, old_ids, new_ids = [], [], []
+    for row in range(0, 300, 4):
+        old_ids.append(store.set(row, "A", "x"))
+        changed.append(row)
+        new_ids.append(store.columns[column_id][row])
+    index.cells_changed(column_id, changed, old_ids, new_ids)
+
+    fresh = build(store)
+    for column in range(len(store.columns)):
+        assert {k: sorted(v) for k, v in index.postings[column].items()} == \
+               {k: sorted(v) for k, v in fresh.postings[column].items()}
+    assert index.search("x", "A", "exact") == changed
+
+
+def test_short_all_fields_query_matches_brute_force():
+    rows = [{"ID": str(i), "Name": f"item {i % 50}", "Flag": "yes" if i % 3 else "no"} for i in range(500)]
+    store = make_store(rows)
+    index = build(store)
+    for query in ("e", "1", "s", "9", "o"):
+        assert index.search(query, None) == brute_force(store, query, None, "contains")
+
+
+def test_edits_without_a_build_coming_are_not_queued():
+    store = make_store()
+    index = SearchIndex(store)  # Never built, e.g. the load failed
+    edit(store, index, 1, "Name", "Wooden Club")
+    assert index._pending == []
+    assert index.search("club", None) == [1]
+
+
+def test_cancel_drops_queued_edits():
+    store = make_store()
+    index = SearchIndex(store)
+    index.start_build()
+    index._pending.append((0, (0,), (1,), (2,)))  # As if edited before the build was adopted
+    index.cancel()
+    assert index._pending == []
@@ -0,0 +1,117 @@
+import threading
+import time
+from array import array
+
+from xml_table import ColumnStore, XMLLoader, iter_row_chunks
+
+
+def write_rows(path, rows, extra=""):
+    """Write a Trickster-style file with one <ROW> per dict in rows."""
+    body = "".join("<ROW>" + "".join(f"<{tag}>{text}</{tag}>" for tag, text in row.items()) + "</ROW>\n"
+                   for row in rows)
+    path.write_text(f'<?xml version="1.0" encoding="utf-8"?>\n<ROOT>\n{extra}{body}</ROOT>\n', encoding="utf-8")
+    return str(path)
+
+
+def load(path, **kwargs):
+    store = ColumnStore()
+    chunk_sizes = []
+    for count, chunk in iter_row_chunks(path, store, **kwargs):
+        store.append_chunk(count, chunk)
+        chunk_sizes.append(count)
+    return store, chunk_sizes
+
+
+def test_values_are_interned_once():
+    store = ColumnStore()
+    first = store.intern("0")
+    assert store.intern("0") == first
+    assert store.intern("1") != first
+    assert store.values[first] == "0"
+    assert store.values[0] is None  # Id 0 is "no element"
+
+
+def test_new_columns_are_padded_for_existing_rows():
+    store = ColumnStore()
+    store.append_chunk(2, {"A": array("I", [store.intern("x")] * 2)})
+    column_id = store.column_id("B")
+    assert store.headers == ["A", "B"]
+    assert list(store.columns[column_id]) == [0, 0]
+    assert store.get(0, "B") == "" and store.raw(0, "B") is None
+
+
+def test_set_returns_previous_value_id():
+    store = ColumnStore()
+    store.column_id("A")
+    store.append_chunk(1, {})
+    assert store.set(0, "A", "new") == 0
+    assert store.set(0, "A", "new") is None  # Unchanged
+    assert store.set(0, "A", "newer") == store.intern("new")
+    assert store.get(0, "A") == "newer"
+
+
+def test_load_keeps_every_row_and_cell(tmp_path):
+    rows = [{"ID": str(i), "Name": f"item{i % 3}", "Icon": ""} for i in range(250)]
+    store, chunk_sizes = load(write_rows(tmp_path / "a.xml", rows), first_chunk=10, chunk_rows=100)
+    assert store.row_count == 250
+    assert chunk_sizes == [10, 100, 100, 40]
+    assert store.headers == ["ID", "Name", "Icon"]
+    for i in (0, 9, 10, 249):
+        assert store.row_items(i) == [("ID", str(i)), ("Name", f"item{i % 3}"), ("Icon", "")]
+    # "item0".."item2" and "" are each stored once
+    assert len(set(store.columns[store.header_ids["Name"]])) == 3
+
+
+def test_rows_with_different_tags(tmp_path):
+    rows = [{"A": "1"}, {"A": "2", "B": "x"}, {"C": "y"}, {"B": "z", "A": "4"}]
+    store, _ = load(write_rows(tmp_path / "a.xml", rows), first_chunk=2, chunk_rows=2)
+    assert store.headers == ["A", "B", "C"]  # First-seen order
+    assert [store.raw(r, "A") for r in range(4)] == ["1", "2", None, "4"]
+    assert [store.raw(r, "B") for r in range(4)] == [None, "x", None, "z"]
+    assert [store.raw(r, "C") for r in range(4)] == [None, None, "y", None]
+
+
+def test_non_row_elements_are_skipped(tmp_path):
+    path = write_rows(tmp_path / "a.xml", [{"A": "1"}, {"A": "2"}], extra="<META><ROW><A>no</A></ROW></META>\n")
+    store, _ = load(path)
+    assert store.row_count == 2
+    assert [store.get(r, "A") for r in range(2)] == ["1", "2"]
+
+
+def test_progress_and_cancel(tmp_path):
+    path = write_rows(tmp_path / "a.xml", [{"A": str(i)} for i in range(500)])
+    seen = []
+    load(path, first_chunk=50, chunk_rows=50, progress=seen.append)
+    assert seen[-1] == 1.0 and seen == sorted(seen)
+
+    cancel = threading.Event()
+    cancel.set()
+    store, chunk_sizes = load(path, first_chunk=50, chunk_rows=50, cancel_event=cancel)
+    assert chunk_sizes == [50]
+
+
+def test_loader_streams_chunks_to_the_caller(tmp_path):
+    path = write_rows(tmp_path / "a.xml", [{"A": str(i), "B": "b"} for i in range(3000)])
+    store = ColumnStore()
+    loader = XMLLoader()
+    loader.start(path, store)
+    deadline = time.monotonic() + 10
+    finished = False
+    while not finished and time.monotonic() < deadline:
+        chunks, finished = loader.poll()
+        for count, chunk in chunks:
+            store.append_chunk(count, chunk)
+        time.sleep(0.01)
+    assert finished and loader.error is None
+    assert store.row_count == 3000
+    assert store.get(2999, "A") == "2999"
+
+
+def test_loader_reports_parse_errors(tmp_path):
+    path = tmp_path / "bad.xml"
+    path.write_text("<ROOT><ROW><A>1</A></ROW><ROW>", encoding="utf-8")
+    loader = XMLLoader()
+    loader.start(str(path), ColumnStore())
+    loader._thread.join(10)
+    _, finished = loader.poll()
+    assert finished and loader.error is not None
@@ -0,0 +1,190 @@
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import xml_writer
+from xml_table import ColumnStore, iter_row_chunks
+from xml_writer import RowOffsets, write_edited, write_patch
+
+SOURCE = '''<?xml version="1.0" encoding="utf-8"?>
+<!-- Exported table. <ROW>in a comment</ROW> -->
+<ROOT>
+  <ROW id="a&gt;b" note='x>y'><ID>1</ID><Name>héllo</Name></ROW>
+  <ROW/>
+  <ROW>
+    <ID>3</ID>
+    <Text><![CDATA[</ROW> inside CDATA]]></Text>
+  </ROW>
+  <?pi <ROW> in a processing instruction ?>
+  <ROW><ID>4</ID><Name>four</Name></ROW>
+</ROOT>
+'''
+
+
+def load(path):
+    store = ColumnStore()
+    for count, chunk in iter_row_chunks(path, store):
+        store.append_chunk(count, chunk)
+    return store
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "table.xml"
+    path.write_bytes(SOURCE.encode("utf-8"))
+    return str(path)
+
+
+def spans(offsets):
+    return list(zip(offsets.starts, offsets.ends))
+
+
+def test_offsets_find_only_real_rows(source):
+    offsets = RowOffsets(source)
+    assert len(offsets) == load(source).row_count == 4
+    data = SOURCE.encode("utf-8")
+    rows = [data[start:end] for start, end in spans(offsets)]
+    assert rows[0].startswith(b'<ROW id="a&gt;b"') and rows[0].endswith(b"</ROW>")
+    assert rows[1] == b"<ROW/>"
+    assert b"CDATA" in rows[2] and rows[2].endswith(b"</ROW>")
+    assert rows[3] == b"<ROW><ID>4</ID><Name>four</Name></ROW>"
+    assert offsets.encoding == "utf-8"
+
+
+def test_unchanged_rows_are_copied_byte_for_byte(source, tmp_path):
+    store = load(source)
+    store.set(0, "Name", "wörld")
+    store.set(1, "ID", "2")
+    offsets = RowOffsets(source)
+    out = str(tmp_path / "out.xml")
+    write_edited(offsets, out, store, {0, 1})
+
+    data = SOURCE.encode("utf-8")
+    written = open(out, "rb").read()
+    (s0, e0), (s1, e1), (s2, _), _ = spans(offsets)
+    # Everything before row 0 and from row 2 on is untouched
+    assert written.startswith(data[:s0])
+    assert written.endswith(data[s2:])
+    assert data[e0:s1] in written  # Whitespace between the edited rows too
+
+    rows = ET.parse(out).getroot().findall("ROW")
+    assert rows[0].find("Name").text == "wörld" and rows[0].get("id") == "a>b"
+    assert rows[0].get("processed") == "true"
+    assert rows[1].find("ID").text == "2" and rows[1].get("processed") == "true"
+    assert rows[2].get("processed") is None
+    assert rows[2].find("Text").text == "</ROW> inside CDATA"
+
+
+def test_no_edits_copies_the_file(source, tmp_path):
+    out = str(tmp_path / "out.xml")
+    write_edited(RowOffsets(source), out, load(source), set())
+    assert open(out, "rb").read() == SOURCE.encode("utf-8")
+
+
+def test_declared_encoding_is_kept(tmp_path):
+    path = tmp_path / "latin.xml"
+    path.write_bytes('<?xml version="1.0" encoding="iso-8859-1"?>\n<ROOT><ROW><A>café</A></ROW></ROOT>\n'
+                     .encode("iso-8859-1"))
+    store = load(str(path))
+    store.set(0, "A", "crème €")  # € isn't in Latin-1: written as a character reference
+    offsets = RowOffsets(str(path))
+    assert offsets.encoding == "iso-8859-1"
+    out = str(tmp_path / "out.xml")
+    write_edited(offsets, out, store, {0})
+    assert ET.parse(out).getroot().find("ROW/A").text == "crème €"
+
+
+def test_failed_write_leaves_the_old_output(source, tmp_path, monkeypatch):
+    out = tmp_path / "out.xml"
+    out.write_bytes(b"previous save")
+    store = load(source)
+    store.set(3, "Name", "changed")
+
+    def fail(*args):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(xml_writer, "edited_row", fail)
+    with pytest.raises(RuntimeError):
+        write_edited(RowOffsets(source), str(out), store, {3})
+    assert out.read_bytes() == b"previous save"
+    assert sorted(os.listdir(tmp_path)) == ["out.xml", "table.xml"]  # No temp file left behind
+
+
+def test_output_gets_the_source_permissions(source, tmp_path):
+    os.chmod(source, 0o640)
+    out = str(tmp_path / "out.xml")
+    write_edited(RowOffsets(source), out, load(source), set())
+    assert os.stat(out).st_mode & 0o777 == 0o640
+
+
+def test_patch_lists_only_changed_rows(source, tmp_path):
+    store = load(source)
+    store.set(3, "Name", "FOUR")
+    store.set(0, "ID", "100")
+    out = str(tmp_path / "changes.xml")
+    write_patch(RowOffsets(source), out, store, {3, 0})
+    patch = ET.parse(out).getroot()
+    assert patch.tag == "PATCH" and patch.get("source") == "table.xml" and patch.get("rows") == "2"
+    changes = patch.findall("CHANGE")
+    assert [change.get("row") for change in changes] == ["0", "3"]
+    assert changes[0].find("ROW/ID").text == "100"
+    assert changes[1].find("ROW/Name").text == "FOUR"
+
+
+def test_offsets_notice_a_changed_file(source):
+    offsets = RowOffsets(source)
+    assert offsets.is_current()
+    with open(source, "ab") as f:
+        f.write(b"\n")
+    assert not offsets.is_current()
+
+
+def test_offsets_skip_rows_the_loader_skips(tmp_path):
+    path = tmp_path / "nested.xml"
+    path.write_bytes(b'<ROOT>\n'
+                     b'  <META><ROW><ID>meta</ID></ROW></META>\n'
+                     b'  <ROW><ID>1</ID><ROW><ID>nested</ID></ROW></ROW>\n'
+                     b'  <META/>\n'
+                     b'  <ROW><ID>2</ID></ROW>\n'
+                     b'</ROOT>\n')
+    store = load(str(path))
+    offsets = RowOffsets(str(path))
+    assert len(offsets) == store.row_count == 2
+    data = path.read_bytes()
+    assert [data[start:end] for start, end in spans(offsets)] == [
+        b"<ROW><ID>1</ID><ROW><ID>nested</ID></ROW></ROW>", b"<ROW><ID>2</ID></ROW>"]
+
+    store.set(1, "ID", "two")
+    out = str(tmp_path / "out.xml")
+    write_edited(offsets, out, store, {1})
+    root = ET.parse(out).getroot()
+    assert root.find("META/ROW/ID").text == "meta"
+    assert [row.find("ID").text for row in root.findall("ROW")] == ["1", "two"]
+
+
+NAMESPACED = b'''<?xml version="1.0" encoding="utf-8"?>
+<ROOT xmlns:t="urn:trickster" xmlns:x='urn:extra'>
+  <ROW><t:ID>1</t:ID><Name>one</Name></ROW>
+  <ROW><t:ID>2</t:ID><Name>two</Name></ROW>
+</ROOT>
+'''
+
+
+def test_rows_using_root_prefixes_can_be_rewritten(tmp_path):
+    path = tmp_path / "ns.xml"
+    path.write_bytes(NAMESPACED)
+    store = load(str(path))
+    offsets = RowOffsets(str(path))
+    assert offsets.namespaces == {"t": "urn:trickster", "x": "urn:extra"}
+    store.set(1, "{urn:trickster}ID", "20")
+    out = str(tmp_path / "out.xml")
+    write_edited(offsets, out, store, {1})
+    written = open(out, "rb").read()
+    assert written.startswith(NAMESPACED[:NAMESPACED.index(b"  <ROW><t:ID>2")])
+    assert b"<t:ID>20</t:ID>" in written  # Same prefix as the source
+    rows = ET.parse(out).getroot().findall("ROW")
+    assert rows[1].find("{urn:trickster}ID").text == "20" and rows[1].get("processed") == "true"
+
+    patch_path = str(tmp_path / "changes.xml")
+    write_patch(offsets, patch_path, store, {1})
+    assert ET.parse(patch_path).getroot().find("CHANGE/ROW/{urn:trickster}ID").text == "20"
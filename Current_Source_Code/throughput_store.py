@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL,
+    startup REAL                -- seconds from launch until the main window was built
+);
+CREATE TABLE IF NOT EXISTS events (
+    ts REAL NOT NULL,           -- when the image was clicked (epoch seconds)
+    session INTEGER NOT NULL,
+    folder TEXT NOT NULL,
+    dwell REAL,                 -- seconds from the image being shown to the click
+    decode REAL,                -- seconds to decode the source
+    render REAL,                -- seconds to render every target size
+    save REAL,                  -- seconds spent encoding and writing, summed over sizes
+    resolutions INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_session ON events (session);
+CREATE INDEX IF NOT EXISTS events_dwell ON events (dwell);
+"""
+
+
+class ThroughputStore:
+    """SQLite log of one row per processed image, for measured throughput.
+
+    StatsManager buffers events in memory and inserts them in batches with
+    add_events(); everything else here is a read-only aggregation query.
+    Used from the Tk thread only.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(sessions)")]
+        if "startup" not in columns:  # Stores created before startup times were recorded
+            self.conn.execute("ALTER TABLE sessions ADD COLUMN startup REAL")
+        self.conn.commit()
+
+    def start_session(self, started=None):
+        cursor = self.conn.execute("INSERT INTO sessions (started) VALUES (?)", (started or time.time(),))
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def end_session(self, session_id, ended=None):
+        self.conn.execute("UPDATE sessions SET ended = ? WHERE id = ?", (ended or time.time(), session_id))
+        self.conn.commit()
+
+    def set_startup(self, session_id, seconds):
+        self.conn.execute("UPDATE sessions SET startup = ? WHERE id = ?", (seconds, session_id))
+        self.conn.commit()
+
+    def startup_times(self, limit=20):
+        """Startup seconds of the most recent sessions that recorded one, newest first."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT startup FROM sessions WHERE startup IS NOT NULL ORDER BY id DESC LIMIT ?", (limit,))]
+
+    def add_events(self, events):
+        """Insert event dicts (keys as the events columns) in one transaction."""
+        if not events:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO events (ts, session, folder, dwell, decode, render, save, resolutions) "
+                "VALUES (:ts, :session, :folder, :dwell, :decode, :render, :save, :resolutions)", events)
+
+    def frame_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def dwell_percentile(self, fraction):
+        """Seconds per frame (show to click) at the given percentile, e.g. 0.5 or 0.95."""
+        count = self.conn.execute("SELECT COUNT(*) FROM events WHERE dwell IS NOT NULL").fetchone()[0]
+        if not count:
+            return None
+        offset = min(count - 1, int(round(fraction * (count - 1))))
+        return self.conn.execute("SELECT dwell FROM events WHERE dwell IS NOT NULL ORDER BY dwell "
+                                 "LIMIT 1 OFFSET ?", (offset,)).fetchone()[0]
+
+    def mean_durations(self):
+        """Average decode/render/save seconds per frame, as a dict."""
+        row = self.conn.execute("SELECT AVG(decode), AVG(render), AVG(save) FROM events").fetchone()
+        return {"decode": row[0], "render": row[1], "save": row[2]}
+
+    def frames_per_hour_by_session(self, limit=5):
+        """[(session id, started, frames, frames per hour)] for the most recent sessions with work."""
+        rows = self.conn.execute(
+            "SELECT s.id, s.started, COUNT(e.ts), MAX(e.ts), s.ended FROM sessions s "
+            "JOIN events e ON e.session = s.id GROUP BY s.id ORDER BY s.id DESC LIMIT ?", (limit,)).fetchall()
+        result = []
+        for session_id, started, frames, last_event, ended in rows:
+            hours = ((ended or last_event) - started) / 3600
+            result.append((session_id, started, frames, frames / hours if hours > 0 else None))
+        return result
+
+    def slowest_folders(self, limit=5, min_frames=3):
+        """[(folder, frames, mean seconds per frame)] for the folders with the highest dwell."""
+        return self.conn.execute(
+            "SELECT folder, COUNT(*), AVG(dwell) FROM events WHERE dwell IS NOT NULL "
+            "GROUP BY folder HAVING COUNT(*) >= ? ORDER BY AVG(dwell) DESC LIMIT ?",
+            (min_frames, limit)).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def get_store_path(stats_file):
+    return os.path.splitext(stats_file)[0] + ".sqlite3"
@@ -0,0 +1,90 @@
+import math
+
+from PIL import Image, ImageColor
+
+try:
+    NEAREST = Image.Resampling.NEAREST
+    LANCZOS = Image.Resampling.LANCZOS
+except AttributeError:
+    NEAREST = Image.NEAREST
+    LANCZOS = Image.ANTIALIAS
+
+
+def compute_viewport(display_w, display_h, img_left, img_top, canvas_w, canvas_h, margin=0):
+    """Return the visible part of the zoomed image as (x0, y0, x1, y1).
+
+    The coordinates are in display (zoomed) pixels relative to the top-left of
+    the virtual zoomed image, whose top-left sits at (img_left, img_top) on the
+    canvas. margin extends the canvas on every side so short pans can move the
+    rendered bitmap without exposing unrendered pixels. Returns None if no part
+    of the image is on the (extended) canvas.
+    """
+    x0 = max(0, math.floor(-margin - img_left))
+    y0 = max(0, math.floor(-margin - img_top))
+    x1 = min(display_w, math.ceil(canvas_w + margin - img_left))
+    y1 = min(display_h, math.ceil(canvas_h + margin - img_top))
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return (x0, y0, x1, y1)
+
+
+def render_viewport(source, thumbnail, display_size, viewport):
+    """Render only the visible rectangle of the zoomed image.
+
+    source is the full-resolution image and thumbnail its base display
+    thumbnail. The result is at most canvas-sized whatever the zoom level:
+    the matching source rectangle is cropped and scaled in one resize call.
+    Magnified views use nearest-neighbour so source pixels stay crisp squares.
+    """
+    display_w, display_h = display_size
+    x0, y0, x1, y1 = viewport
+    out_size = (x1 - x0, y1 - y0)
+
+    if display_w == thumbnail.width and display_h == thumbnail.height:
+        # Base zoom: the thumbnail already is the display image
+        return thumbnail.crop(viewport)
+
+    if display_w >= source.width:
+        # Magnifying source pixels
+        base, resample = source, NEAREST
+    elif display_w <= thumbnail.width:
+        # Zoomed out below the thumbnail: downscale from it, it's smaller
+        base, resample = thumbnail, LANCZOS
+    else:
+        base, resample = source, LANCZOS
+
+    scale_x = base.width / display_w
+    scale_y = base.height / display_h
+    box = (x0 * scale_x, y0 * scale_y, x1 * scale_x, y1 * scale_y)
+    return base.resize(out_size, resample, box=box)
+
+
+def _line_positions(length, offset, cell):
+    """Pixel offsets within a strip starting at offset where a cell boundary falls."""
+    i = math.ceil(offset / cell)
+    while True:
+        pos = int(i * cell - offset)
+        if pos >= length:
+            return
+        yield pos
+        i += 1
+
+
+def draw_pixel_grid(image, viewport, cell_w, cell_h, color):
+    """Draw a 1 px line at every source pixel boundary into a rendered viewport, in place.
+
+    viewport is the (x0, y0, x1, y1) the image was rendered for and cell_w /
+    cell_h the on-screen size of one source pixel. Lines are filled straight
+    into the bitmap, so there are no canvas items to create or delete; with
+    cells of at least 2 px the work is bounded by the viewport size.
+    """
+    from PIL import ImageDraw  # Pulls in ImageFont; only needed once the grid is shown
+
+    width, height = image.size
+    fill = ImageColor.getcolor(color, image.mode)
+    draw = ImageDraw.Draw(image)
+    for x in _line_positions(width, viewport[0], cell_w):
+        draw.line([(x, 0), (x, height - 1)], fill=fill)
+    for y in _line_positions(height, viewport[1], cell_h):
+        draw.line([(0, y), (width - 1, y)], fill=fill)
+    return image
@@ -0,0 +1,127 @@
+import math
+import re
+from array import array
+
+
+class BulkEdit:
+    """One bulk change to a column: the cells it changed, with their value ids before and after.
+
+    Enough to undo the change and to update a SearchIndex in one batch.
+    """
+
+    def __init__(self, column_id, rows, old_ids, new_ids):
+        self.column_id = column_id
+        self.rows = rows
+        self.old_ids = old_ids
+        self.new_ids = new_ids
+
+    def __len__(self):
+        return len(self.rows)
+
+    def undo(self, store):
+        """Put the old values back, skipping cells edited since. Returns the undo as a BulkEdit."""
+        column = store.columns[self.column_id]
+        rows, old_ids, new_ids = array("I"), array("I"), array("I")
+        for row, old_id, new_id in zip(self.rows, self.old_ids, self.new_ids):
+            if column[row] == new_id:
+                column[row] = old_id
+                rows.append(row)
+                old_ids.append(new_id)
+                new_ids.append(old_id)
+        return BulkEdit(self.column_id, rows, old_ids, new_ids)
+
+
+def bulk_edit(store, rows, tag, transform):
+    """Apply transform to tag's cell in each of rows, in one pass over the column.
+
+    transform gets the cell's text (None if the row has no such element) and
+    returns the new text, or None to leave the cell alone. Only cells whose
+    value actually changes are recorded. It's called once
+    per distinct value, not once per row, so even a regex over 100k rows
+    costs only as much as the column has different values.
+    """
+    column_id = store.column_id(tag)
+    column = store.columns[column_id]
+    values = store.values
+    new_id_of = {}  # Old value id -> new value id
+    changed, old_ids, new_ids = array("I"), array("I"), array("I")
+    for row in rows:
+        old_id = column[row]
+        new_id = new_id_of.get(old_id)
+        if new_id is None:
+            text = transform(values[old_id])
+            # "" for a row without the element changes nothing: saving wouldn't create an empty one
+            unchanged = text is None or (not old_id and not text)
+            new_id = new_id_of[old_id] = old_id if unchanged else store.intern(text)
+        if new_id != old_id:
+            column[row] = new_id
+            changed.append(row)
+            old_ids.append(old_id)
+            new_ids.append(new_id)
+    return BulkEdit(column_id, changed, old_ids, new_ids)
+
+
+def copy_column(store, rows, tag, source_tag):
+    """Copy source_tag's cell into tag's for each of rows that has a source_tag element."""
+    column_id = store.column_id(tag)
+    column = store.columns[column_id]
+    source = store.columns[store.column_id(source_tag)]
+    changed, old_ids, new_ids = array("I"), array("I"), array("I")
+    for row in rows:
+        new_id = source[row]
+        old_id = column[row]
+        if new_id and new_id != old_id:
+            column[row] = new_id
+            changed.append(row)
+            old_ids.append(old_id)
+            new_ids.append(new_id)
+    return BulkEdit(column_id, changed, old_ids, new_ids)
+
+
+# --- Transforms for bulk_edit ---
+
+def set_value(value):
+    return lambda text: value
+
+
+def find_replace(find, replacement, use_regex=False):
+    """Replace every occurrence of find; raises re.error for a bad pattern."""
+    if use_regex:
+        pattern = re.compile(find)
+        return lambda text: None if text is None else pattern.sub(replacement, text)
+    return lambda text: None if text is None else text.replace(find, replacement)
+
+
+_INTEGER = re.compile(r"-?[0-9]+")
+_DECIMAL = re.compile(r"-?(?:[0-9]+\.[0-9]*|\.[0-9]+)")
+
+
+def scale_offset(factor=1.0, offset=0.0):
+    """text * factor + offset for numeric cells; others are left alone.
+
+    Only plain numbers ("12", "-3", "0.5") count, so text like "+5" or
+    "1_000" is never reformatted, and a cell whose value doesn't change
+    keeps its exact text ("007" stays "007"). Whole-number cells stay whole
+    numbers (rounded), since most Trickster fields are integers.
+    """
+    def transform(text):
+        if text is None:
+            return None
+        is_int = _INTEGER.fullmatch(text) is not None
+        if is_int:
+            number = int(text)
+        elif _DECIMAL.fullmatch(text):
+            number = float(text)
+        else:
+            return None
+        result = number * factor + offset
+        if not math.isfinite(result):
+            return None
+        if is_int:
+            result = round(result)
+        if result == number:
+            return None
+        if is_int:
+            return str(result)
+        return format(result, ".10f").rstrip("0").rstrip(".")
+    return transform
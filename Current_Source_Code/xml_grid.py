@@ -0,0 +1,384 @@
+import tkinter as tk
+
+ROW_HEIGHT = 22
+HEADER_HEIGHT = 24
+COLUMN_WIDTH = 150
+CELL_PAD = 4
+CHAR_WIDTH = 7  # Rough width of one character, for cutting off text that won't fit
+WHEEL_ROWS = 3
+
+
+class VirtualTable(tk.Frame):
+    """A spreadsheet view over any number of rows that only draws what's on screen.
+
+    Cells are canvas text items from a pool sized to the viewport. Scrolling
+    changes their text, and only a resize or horizontal scroll moves them.
+    The cost of scrolling or changing columns therefore doesn't depend on how
+    many rows or columns there are.
+
+    get_cell(row, column) supplies the text, where row is an entry of rows
+    and column an entry of columns. One Entry placed over the current cell
+    does the editing, and on_edit(row, column, text) is called when it's
+    committed. on_view_change(first, last, total) is called after each redraw.
+    """
+
+    def __init__(self, master, get_cell, on_edit, on_view_change=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.get_cell = get_cell
+        self.on_edit = on_edit
+        self.on_view_change = on_view_change
+        self.rows = range(0)  # Row keys in display order
+        self.columns = []
+        self.top = 0  # Index in rows of the first row shown
+        self.x_offset = 0  # Horizontal scroll, in pixels
+        self.current = None  # (row index, column index) of the selected cell
+        self.editing = None  # (row index, column index) while the editor is open
+        self.max_chars = (COLUMN_WIDTH - 2 * CELL_PAD) // CHAR_WIDTH
+
+        self.canvas = tk.Canvas(self, background="white", highlightthickness=0, takefocus=True)
+        self.v_scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.h_scrollbar = tk.Scrollbar(self, orient="horizontal", command=self.xview)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.v_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.h_scrollbar.grid(row=1, column=0, sticky="ew")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # Item pools, grown to fit the viewport and never shrunk
+        self._header_items = []  # Per column slot: (rectangle, text)
+        self._row_lines = []  # Per row slot
+        self._column_lines = []  # Per column slot
+        self._cell_items = []  # Per row slot: list of text items, one per column slot
+        self._shown = {}  # Item -> text it currently shows
+        self._layout = None  # Viewport geometry the pool is positioned for
+        self._redraw_job = None
+        self._selection = self.canvas.create_rectangle(0, 0, 0, 0, outline="#1e66d0", width=2, state="hidden")
+
+        self.editor = tk.Entry(self.canvas, relief="solid", borderwidth=1)
+        self._editor_window = self.canvas.create_window(0, 0, anchor="nw", window=self.editor, state="hidden")
+        self.editor.bind("<Return>", lambda e: self._finish_edit(move=1))
+        self.editor.bind("<Tab>", lambda e: self._finish_edit(move=0, column_move=1))
+        self.editor.bind("<Escape>", lambda e: self.cancel_edit())
+        self.editor.bind("<FocusOut>", lambda e: self.commit_edit())
+
+        self.canvas.bind("<Configure>", lambda e: self.schedule_redraw())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Double-Button-1>", self._on_double_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self._on_wheel(-1 if e.delta > 0 else 1, e))
+        self.canvas.bind("<Button-4>", lambda e: self._on_wheel(-1, e))
+        self.canvas.bind("<Button-5>", lambda e: self._on_wheel(1, e))
+        self.canvas.bind("<Key>", self._on_key)
+
+    # --- Data ---
+
+    def set_rows(self, rows, keep_position=False):
+        """Show rows (a sequence of row keys). Cheap; nothing is copied.
+
+        keep_position is for rows that only grew at the end (a file still
+        loading): the view, selection and any open editor stay as they are.
+        """
+        if not keep_position:
+            self.commit_edit()  # The editor's row index means nothing in the new rows
+        self.rows = rows
+        if not keep_position:
+            self.top = 0
+            self.current = None
+        self.top = max(0, min(self.top, len(rows) - 1))
+        if self.current and self.current[0] >= len(rows):
+            self.current = None
+        self.schedule_redraw()
+
+    def set_columns(self, columns):
+        self.commit_edit()
+        self.columns = list(columns)
+        self.x_offset = max(0, min(self.x_offset, self._max_x_offset()))
+        if self.current and self.current[1] >= len(self.columns):
+            self.current = None
+        self.schedule_redraw()
+
+    def refresh(self):
+        """Redraw after the underlying values changed."""
+        self.schedule_redraw()
+
+    # --- Scrolling ---
+
+    def _visible_row_count(self):
+        return max(1, (self.canvas.winfo_height() - HEADER_HEIGHT) // ROW_HEIGHT)
+
+    def _max_x_offset(self):
+        return max(0, len(self.columns) * COLUMN_WIDTH - self.canvas.winfo_width())
+
+    def scroll_to_row(self, top):
+        top = max(0, min(top, len(self.rows) - self._visible_row_count()))
+        if top != self.top:
+            self.top = top
+            self.schedule_redraw()
+
+    def yview(self, *args):
+        """Scrollbar protocol, in rows."""
+        self.commit_edit()
+        page = self._visible_row_count()
+        if args[0] == "moveto":
+            self.scroll_to_row(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (page if args[2] == "pages" else 1)
+            self.scroll_to_row(self.top + step)
+
+    def xview(self, *args):
+        """Scrollbar protocol, in pixels."""
+        self.commit_edit()
+        total = len(self.columns) * COLUMN_WIDTH
+        if args[0] == "moveto":
+            offset = int(float(args[1]) * total)
+        else:
+            unit = self.canvas.winfo_width() if args[2] == "pages" else COLUMN_WIDTH // 3
+            offset = self.x_offset + int(args[1]) * unit
+        offset = max(0, min(offset, self._max_x_offset()))
+        if offset != self.x_offset:
+            self.x_offset = offset
+            self.schedule_redraw()
+
+    def _on_wheel(self, direction, event):
+        if event.state & 0x0001:  # Shift: scroll sideways
+            self.xview("scroll", direction, "units")
+        else:
+            self.yview("scroll", direction * WHEEL_ROWS, "units")
+
+    # --- Drawing ---
+
+    def schedule_redraw(self):
+        # Coalesce bursts (wheel, scrollbar drags, loader chunks) into one redraw
+        if self._redraw_job is None:
+            self._redraw_job = self.after_idle(self._redraw)
+
+    def _set_text(self, item, text):
+        if self._shown.get(item) != text:
+            self.canvas.itemconfigure(item, text=text)
+            self._shown[item] = text
+
+    def _fit(self, text):
+        if len(text) > self.max_chars:
+            return text[:self.max_chars - 1] + "…"
+        return text
+
+    def _grow_pool(self, row_slots, column_slots):
+        canvas = self.canvas
+        while len(self._header_items) < column_slots:
+            self._header_items.append((
+                canvas.create_rectangle(0, 0, 0, 0, fill="#e8e8e8", outline="#a0a0a0"),
+                canvas.create_text(0, 0, anchor="w", font=("Arial", 10, "bold"))))
+            self._column_lines.append(canvas.create_line(0, 0, 0, 0, fill="#d0d0d0"))
+            for cells in self._cell_items:
+                cells.append(canvas.create_text(0, 0, anchor="w"))
+        while len(self._row_lines) < row_slots:
+            self._row_lines.append(canvas.create_line(0, 0, 0, 0, fill="#e0e0e0"))
+            self._cell_items.append([canvas.create_text(0, 0, anchor="w") for _ in self._header_items])
+        # Keep the header above the cells and the selection/editor above everything
+        for rect, text in self._header_items:
+            canvas.tag_raise(rect)
+            canvas.tag_raise(text)
+        canvas.tag_raise(self._selection)
+        canvas.tag_raise(self._editor_window)
+
+    def _position_pool(self, row_slots, column_slots, x_shift, width, height):
+        canvas = self.canvas
+        for c, (rect, text) in enumerate(self._header_items):
+            x = x_shift + c * COLUMN_WIDTH
+            canvas.coords(rect, x, 0, x + COLUMN_WIDTH, HEADER_HEIGHT)
+            canvas.coords(text, x + CELL_PAD, HEADER_HEIGHT / 2)
+            canvas.coords(self._column_lines[c], x + COLUMN_WIDTH, HEADER_HEIGHT, x + COLUMN_WIDTH, height)
+        for r, cells in enumerate(self._cell_items):
+            y = HEADER_HEIGHT + r * ROW_HEIGHT
+            canvas.coords(self._row_lines[r], 0, y + ROW_HEIGHT, width, y + ROW_HEIGHT)
+            for c, item in enumerate(cells):
+                canvas.coords(item, x_shift + c * COLUMN_WIDTH + CELL_PAD, y + ROW_HEIGHT / 2)
+
+    def _redraw(self):
+        self._redraw_job = None
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        row_slots = (height - HEADER_HEIGHT) // ROW_HEIGHT + 1
+        column_slots = width // COLUMN_WIDTH + 2
+        first_column = self.x_offset // COLUMN_WIDTH
+        x_shift = -(self.x_offset % COLUMN_WIDTH)
+
+        layout = (row_slots, column_slots, x_shift, width, height)
+        if layout != self._layout:
+            self._grow_pool(row_slots, column_slots)
+            self._position_pool(row_slots, column_slots, x_shift, width, height)
+            self._layout = layout
+
+        columns = self.columns
+        shown_columns = [columns[first_column + c] if c < column_slots and first_column + c < len(columns) else None
+                         for c in range(len(self._header_items))]
+        for c, column in enumerate(shown_columns):
+            rect, text = self._header_items[c]
+            self._set_text(text, "" if column is None else self._fit(column))
+            state = "hidden" if column is None else "normal"
+            if self._shown.get(rect) != state:
+                self.canvas.itemconfigure(rect, state=state)
+                self.canvas.itemconfigure(self._column_lines[c], state=state)
+                self._shown[rect] = state
+
+        get_cell = self.get_cell
+        rows = self.rows
+        for r, cells in enumerate(self._cell_items):
+            index = self.top + r
+            row = rows[index] if r < row_slots and index < len(rows) else None
+            for c, item in enumerate(cells):
+                column = shown_columns[c]
+                if row is None or column is None:
+                    self._set_text(item, "")
+                else:
+                    self._set_text(item, self._fit(get_cell(row, column)))
+
+        self._place_selection()
+        total = len(rows)
+        visible = self._visible_row_count()
+        if total:
+            self.v_scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+        else:
+            self.v_scrollbar.set(0, 1)
+        total_width = len(columns) * COLUMN_WIDTH
+        if total_width:
+            self.h_scrollbar.set(self.x_offset / total_width, min(1.0, (self.x_offset + width) / total_width))
+        else:
+            self.h_scrollbar.set(0, 1)
+        if self.on_view_change:
+            self.on_view_change(self.top, min(total, self.top + visible), total)
+
+    def _cell_box(self, row_index, column_index):
+        """Canvas box of a cell, or None if it's scrolled out of view."""
+        r = row_index - self.top
+        if r < 0 or r >= self._visible_row_count():
+            return None
+        x = column_index * COLUMN_WIDTH - self.x_offset
+        if x + COLUMN_WIDTH <= 0 or x >= self.canvas.winfo_width():
+            return None
+        y = HEADER_HEIGHT + r * ROW_HEIGHT
+        return x, y, x + COLUMN_WIDTH, y + ROW_HEIGHT
+
+    def _place_selection(self):
+        box = self._cell_box(*self.current) if self.current else None
+        if box is None:
+            self.canvas.itemconfigure(self._selection, state="hidden")
+        else:
+            self.canvas.coords(self._selection, *box)
+            self.canvas.itemconfigure(self._selection, state="normal")
+
+    # --- Selection and editing ---
+
+    def _hit(self, event):
+        if event.y < HEADER_HEIGHT:
+            return None
+        row_index = self.top + (event.y - HEADER_HEIGHT) // ROW_HEIGHT
+        column_index = (event.x + self.x_offset) // COLUMN_WIDTH
+        if row_index >= len(self.rows) or column_index >= len(self.columns):
+            return None
+        return row_index, column_index
+
+    def _on_click(self, event):
+        self.commit_edit()
+        self.canvas.focus_set()
+        hit = self._hit(event)
+        if hit:
+            self.select(*hit)
+
+    def _on_double_click(self, event):
+        hit = self._hit(event)
+        if hit:
+            self.begin_edit(*hit)
+
+    def select(self, row_index, column_index):
+        """Make a cell current, scrolling it into view."""
+        if not self.rows or not self.columns:
+            return
+        row_index = max(0, min(row_index, len(self.rows) - 1))
+        column_index = max(0, min(column_index, len(self.columns) - 1))
+        self.current = (row_index, column_index)
+        visible = self._visible_row_count()
+        if row_index < self.top:
+            self.scroll_to_row(row_index)
+        elif row_index >= self.top + visible:
+            self.scroll_to_row(row_index - visible + 1)
+        x = column_index * COLUMN_WIDTH
+        width = self.canvas.winfo_width()
+        if x < self.x_offset or x + COLUMN_WIDTH > self.x_offset + width:
+            self.x_offset = max(0, min(x if x < self.x_offset else x + COLUMN_WIDTH - width, self._max_x_offset()))
+            self.schedule_redraw()
+        self._place_selection()
+
+    def _on_key(self, event):
+        if self.current is None:
+            if event.keysym in ("Up", "Down", "Left", "Right", "Return"):
+                self.select(self.top, 0)
+            return
+        row_index, column_index = self.current
+        page = self._visible_row_count()
+        moves = {
+            "Up": (-1, 0), "Down": (1, 0), "Left": (0, -1), "Right": (0, 1),
+            "Prior": (-page, 0), "Next": (page, 0),
+        }
+        if event.keysym in moves:
+            dr, dc = moves[event.keysym]
+            self.select(row_index + dr, column_index + dc)
+        elif event.keysym == "Home":
+            self.select(0 if event.state & 0x0004 else row_index, 0)
+        elif event.keysym == "End":
+            self.select(len(self.rows) - 1 if event.state & 0x0004 else row_index, len(self.columns) - 1)
+        elif event.keysym in ("Return", "F2"):
+            self.begin_edit(row_index, column_index)
+        elif event.char and event.char.isprintable() and not event.state & 0x0004:
+            self.begin_edit(row_index, column_index, initial=event.char)  # Start typing to replace
+        else:
+            return
+        return "break"
+
+    def begin_edit(self, row_index, column_index, initial=None):
+        self.commit_edit()
+        self.select(row_index, column_index)
+        self.update_idletasks()  # Let a scroll from select() land so the box is known
+        if self._redraw_job is not None:
+            self.after_cancel(self._redraw_job)
+            self._redraw()
+        box = self._cell_box(row_index, column_index)
+        if box is None:
+            return
+        self.editing = (row_index, column_index)
+        text = self.get_cell(self.rows[row_index], self.columns[column_index]) if initial is None else initial
+        self.editor.delete(0, tk.END)
+        self.editor.insert(0, text)
+        if initial is None:
+            self.editor.select_range(0, tk.END)
+        self.canvas.coords(self._editor_window, box[0], box[1])
+        self.canvas.itemconfigure(self._editor_window, width=COLUMN_WIDTH, height=ROW_HEIGHT, state="normal")
+        self.editor.focus_set()
+
+    def commit_edit(self):
+        if self.editing is None:
+            return
+        row_index, column_index = self.editing
+        self.editing = None
+        text = self.editor.get()
+        self.canvas.itemconfigure(self._editor_window, state="hidden")
+        try:
+            if self.focus_get() is self.editor:
+                self.canvas.focus_set()  # Don't leave keystrokes going to the hidden editor
+        except KeyError:
+            pass  # focus_get can't name some transient widgets
+        if row_index < len(self.rows) and column_index < len(self.columns):
+            self.on_edit(self.rows[row_index], self.columns[column_index], text)
+        self.schedule_redraw()
+
+    def cancel_edit(self):
+        self.editing = None
+        self.canvas.itemconfigure(self._editor_window, state="hidden")
+        self.canvas.focus_set()
+
+    def _finish_edit(self, move=0, column_move=0):
+        current = self.editing
+        self.commit_edit()
+        self.canvas.focus_set()
+        if current:
+            self.select(current[0] + move, current[1] + column_move)
+        return "break"
@@ -0,0 +1,284 @@
+import bisect
+import math
+import threading
+from array import array
+
+SEARCH_MODES = ("contains", "exact", "prefix", "range")
+
+
+def parse_range(query):
+    """Parse "min..max" (either side optional) or a single number into (low, high); None if invalid."""
+    low_text, sep, high_text = query.partition("..")
+    try:
+        low = float(low_text) if low_text.strip() else -math.inf
+        high = (float(high_text) if high_text.strip() else math.inf) if sep else low
+    except ValueError:
+        return None
+    return low, high
+
+
+def _number(text):
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return None if math.isnan(value) else value
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Search over a ColumnStore through its table of distinct values.
+
+    A query is first matched against the distinct values (lowercased once
+    and indexed by trigram, exact text, sorted text for prefixes and number
+    for ranges). Matching value ids are then turned into rows through a
+    per-column inverted index. Each query therefore costs roughly the number
+    of matches, not rows x columns.
+
+    The index is built on a background thread after loading. Until it's
+    ready, search() scans the value table and the columns instead. Edits are
+    applied incrementally with cell_changed(), or cells_changed() for bulk
+    edits (queued while a build runs). A contains query that extends the
+    previous one only re-checks the previous matches.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.ready = False
+        self._thread = None
+        self._cancel = threading.Event()
+        self._built = None  # Structures from the build thread, adopted by poll()
+        self._pending = []  # (column id, rows, old value ids, new value ids) edits made during a build
+        self._last = None  # (mode, query, value count, matching value ids) of the previous contains query
+        self._reset()
+
+    def _reset(self):
+        self.lower = [None]  # Value id -> lowercased text
+        self.grams = {}  # Trigram -> set of value ids
+        self.by_lower = {}  # Lowercased text -> set of value ids
+        self.sorted_lower = []  # Sorted [(lowercased text, value id)], for prefix queries
+        self.numbers = []  # Sorted [(number, value id)], for range queries
+        self.postings = []  # Per column id: {value id: array of rows}
+
+    # --- Building ---
+
+    def start_build(self):
+        self.cancel()
+        self.ready = False
+        self._built = None
+        self._pending = []
+        self._last = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._build, args=(self._cancel,), name="xml-index", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+        self._pending = []  # No build will adopt them now
+
+    def _build(self, cancel_event):
+        store = self.store
+        built = SearchIndex.__new__(SearchIndex)
+        SearchIndex._reset(built)
+        built._add_values(store.values, 1, len(store.values))
+        for column in list(store.columns):
+            if cancel_event.is_set():
+                return
+            postings = {}
+            for row, value_id in enumerate(column[:store.row_count]):
+                if value_id:
+                    rows = postings.get(value_id)
+                    if rows is None:
+                        postings[value_id] = array("I", (row,))
+                    else:
+                        rows.append(row)
+            built.postings.append(postings)
+        self._built = built
+
+    def _add_values(self, values, start, end):
+        """Index value ids start..end-1."""
+        new_sorted = []
+        new_numbers = []
+        for value_id in range(start, end):
+            text = values[value_id].lower()
+            self.lower.append(text)
+            for gram in _trigrams(text):
+                ids = self.grams.get(gram)
+                if ids is None:
+                    self.grams[gram] = {value_id}
+                else:
+                    ids.add(value_id)
+            self.by_lower.setdefault(text, set()).add(value_id)
+            new_sorted.append((text, value_id))
+            number = _number(text)
+            if number is not None:
+                new_numbers.append((number, value_id))
+        if end - start > 64:
+            self.sorted_lower = sorted(self.sorted_lower + new_sorted)
+            self.numbers = sorted(self.numbers + new_numbers)
+        else:
+            for entry in new_sorted:
+                bisect.insort(self.sorted_lower, entry)
+            for entry in new_numbers:
+                bisect.insort(self.numbers, entry)
+
+    def poll(self):
+        """Adopt a finished build (Tk thread). Returns True once the index is ready."""
+        if not self.ready and self._built is not None:
+            built, self._built = self._built, None
+            for name in ("lower", "grams", "by_lower", "sorted_lower", "numbers", "postings"):
+                setattr(self, name, getattr(built, name))
+            self.ready = True
+            self._catch_up()
+            for edits in self._pending:
+                self._apply_edits(*edits)
+            self._pending = []
+        return self.ready
+
+    @property
+    def building(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _catch_up(self):
+        """Index values interned (by edits) since the index last looked."""
+        if len(self.lower) < len(self.store.values):
+            self._add_values(self.store.values, len(self.lower), len(self.store.values))
+        while len(self.postings) < len(self.store.columns):
+            self.postings.append({})
+
+    # --- Updates ---
+
+    def cell_changed(self, row, column_id, old_value_id, new_value_id):
+        """Keep the index in step with one edited cell."""
+        self.cells_changed(column_id, (row,), (old_value_id,), (new_value_id,))
+
+    def cells_changed(self, column_id, rows, old_value_ids, new_value_ids):
+        """Keep the index in step with a batch of edited cells in one column (a bulk edit)."""
+        if not self.ready:
+            # Queue only for a build that's still coming; any later build reads the store as it is then
+            if self.building or self._built is not None:
+                self._pending.append((column_id, rows, old_value_ids, new_value_ids))
+            else:
+                self._pending = []
+            return
+        self._catch_up()
+        self._apply_edits(column_id, rows, old_value_ids, new_value_ids)
+
+    def _apply_edits(self, column_id, rows, old_value_ids, new_value_ids):
+        # Idempotent, since a build may or may not have seen the edits. Each
+        # posting list is rewritten once per batch, not once per row.
+        postings = self.postings[column_id]
+        removed = {}  # Value id -> rows leaving it
+        added = {}  # Value id -> rows joining it
+        for row, old_value_id, new_value_id in zip(rows, old_value_ids, new_value_ids):
+            removed.setdefault(old_value_id, set()).add(row)
+            if new_value_id:
+                added.setdefault(new_value_id, []).append(row)
+        for value_id, leaving in removed.items():
+            current = postings.get(value_id)
+            if current is not None:
+                kept = array("I", [row for row in current if row not in leaving])
+                if kept:
+                    postings[value_id] = kept
+                else:
+                    del postings[value_id]
+        for value_id, joining in added.items():
+            current = postings.get(value_id)
+            if current is None:
+                postings[value_id] = array("I", joining)
+            else:
+                present = set(current)
+                current.extend(row for row in joining if row not in present)
+
+    # --- Queries ---
+
+    def _match_values(self, query, mode):
+        """Ids of the distinct values matching query (already lowercased)."""
+        if mode == "exact":
+            return set(self.by_lower.get(query, ()))
+        if mode == "prefix":
+            # Values with the prefix are contiguous in sorted order, so this
+            # only touches the matches; no need to narrow the previous query
+            sorted_lower = self.sorted_lower
+            matched = set()
+            for index in range(bisect.bisect_left(sorted_lower, (query,)), len(sorted_lower)):
+                text, value_id = sorted_lower[index]
+                if not text.startswith(query):
+                    break
+                matched.add(value_id)
+            return matched
+        if mode == "range":
+            bounds = parse_range(query)
+            if bounds is None:
+                return set()
+            start = bisect.bisect_left(self.numbers, (bounds[0], -1))
+            end = bisect.bisect_right(self.numbers, (bounds[1], len(self.lower)))
+            return {value_id for _, value_id in self.numbers[start:end]}
+        # contains
+        last = self._last
+        if last and last[0] == mode and last[1] in query and last[2] == len(self.lower):
+            candidates = last[3]  # Refining the previous query: only its matches can still match
+        elif len(query) >= 3:
+            gram_sets = sorted((self.grams.get(gram, set()) for gram in _trigrams(query)), key=len)
+            candidates = gram_sets[0].intersection(*gram_sets[1:])
+        else:
+            candidates = range(1, len(self.lower))
+        lower = self.lower
+        return {value_id for value_id in candidates if query in lower[value_id]}
+
+    def _scan_values(self, query, mode):
+        """_match_values without the index, straight over the value table."""
+        bounds = parse_range(query) if mode == "range" else None
+        matched = set()
+        for value_id in range(1, len(self.store.values)):
+            text = self.store.values[value_id].lower()
+            if mode == "exact":
+                hit = text == query
+            elif mode == "prefix":
+                hit = text.startswith(query)
+            elif mode == "range":
+                number = _number(text)
+                hit = bounds is not None and number is not None and bounds[0] <= number <= bounds[1]
+            else:
+                hit = query in text
+            if hit:
+                matched.add(value_id)
+        return matched
+
+    def search(self, query, column=None, mode="contains"):
+        """Rows (ascending) whose cell in column, or any cell if column is None, matches query."""
+        query = query.lower().strip() if mode != "range" else query.strip()
+        store = self.store
+        if self.ready:
+            self._catch_up()
+            matched = self._match_values(query, mode)
+            if mode == "contains":
+                self._last = (mode, query, len(self.lower), matched)
+        else:
+            matched = self._scan_values(query, mode)
+        if not matched:
+            return []
+
+        column_ids = [store.header_ids[column]] if column is not None else range(len(store.columns))
+        if self.ready:
+            hits = array("I")
+            for column_id in column_ids:
+                postings = self.postings[column_id]
+                # Walk whichever side is smaller: a short query can match most values, while
+                # a column usually holds only a few of them
+                if len(postings) < len(matched):
+                    for value_id, rows in postings.items():
+                        if value_id in matched:
+                            hits.extend(rows)
+                else:
+                    for value_id in matched:
+                        rows = postings.get(value_id)
+                        if rows is not None:
+                            hits.extend(rows)
+        else:
+            hits = [row for column_id in column_ids
+                    for row, value_id in enumerate(store.columns[column_id]) if value_id in matched]
+        return sorted(set(hits)) if column is None else sorted(hits)
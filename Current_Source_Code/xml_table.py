@@ -0,0 +1,213 @@
+import os
+import queue
+import threading
+import time
+import xml.etree.ElementTree as ET
+from array import array
+
+ROW_TAG = "ROW"
+
+
+class ColumnStore:
+    """The <ROW> table of a Trickster XML file, stored column by column.
+
+    Each column is an array of 32-bit value ids into one shared table of
+    distinct strings, so a value repeated across thousands of rows (0, "",
+    the same icon name) is stored once and a cell costs 4 bytes. Id 0 means
+    the row has no element for that column. Rows are addressed by their
+    index in the file.
+
+    Only the Tk thread adds rows and columns. The loader thread interns
+    values concurrently, which is what the lock is for.
+    """
+
+    def __init__(self):
+        self.headers = []  # Tags in first-seen order; the index is the column id
+        self.header_ids = {}
+        self.columns = []  # Per column id: array('I') of value ids, one per row
+        self.values = [None]  # Value id -> string; id 0 is "no element"
+        self.value_ids = {}
+        self.row_count = 0
+        self._lock = threading.Lock()
+
+    def intern(self, text):
+        value_id = self.value_ids.get(text)
+        if value_id is None:
+            with self._lock:
+                value_id = self.value_ids.get(text)
+                if value_id is None:
+                    value_id = len(self.values)
+                    self.values.append(text)
+                    self.value_ids[text] = value_id
+        return value_id
+
+    def column_id(self, tag):
+        """Id of tag's column, adding an empty one if it's new."""
+        column_id = self.header_ids.get(tag)
+        if column_id is None:
+            column_id = len(self.headers)
+            self.headers.append(tag)
+            self.header_ids[tag] = column_id
+            self.columns.append(array("I", bytes(4 * self.row_count)))
+        return column_id
+
+    def append_chunk(self, count, chunk):
+        """Add count rows given as {tag: array of value ids}; tags not in chunk get 0."""
+        for tag in chunk:
+            self.column_id(tag)
+        padding = None
+        for tag, column in zip(self.headers, self.columns):
+            values = chunk.get(tag)
+            if values is None:
+                if padding is None:
+                    padding = array("I", bytes(4 * count))
+                values = padding
+            column.extend(values)
+        self.row_count += count
+
+    def get(self, row, tag):
+        """Text of a cell, "" if the row has no such element."""
+        column_id = self.header_ids.get(tag)
+        if column_id is None:
+            return ""
+        return self.values[self.columns[column_id][row]] or ""
+
+    def raw(self, row, tag):
+        """Text of a cell, None if the row has no such element."""
+        column_id = self.header_ids.get(tag)
+        if column_id is None:
+            return None
+        return self.values[self.columns[column_id][row]]
+
+    def set(self, row, tag, text):
+        """Set a cell; returns the value id it had before, or None if it already had that value."""
+        column = self.columns[self.column_id(tag)]
+        value_id = self.intern(text)
+        old_value_id = column[row]
+        if old_value_id == value_id:
+            return None
+        column[row] = value_id
+        return old_value_id
+
+    def row_items(self, row):
+        """[(tag, text)] for the elements the row has, in column order."""
+        return [(tag, self.values[column[row]]) for tag, column in zip(self.headers, self.columns) if column[row]]
+
+
+def iter_row_chunks(path, store, first_chunk=100, chunk_rows=2000, cancel_event=None, progress=None):
+    """Stream path with iterparse, yielding (row count, {tag: array of value ids}) chunks.
+
+    Every <ROW> directly under the root becomes one row; its child elements
+    are its cells. Elements are cleared as soon as their row is read, so
+    memory use doesn't grow with the file beyond the store itself. The first
+    chunk is small so a page can be shown straight away. progress, if
+    given, is called with the fraction of the file read so far.
+    """
+    size = os.path.getsize(path) or 1
+    value_ids = store.value_ids  # Lock-free lookup for values already seen
+    intern = store.intern
+    with open(path, "rb") as f:
+        depth = 0
+        root = None
+        chunk = {}
+        count = 0
+        limit = first_chunk
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if depth == 0:
+                    root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue  # Cells are read with their row
+            if elem.tag == ROW_TAG:
+                row = {}
+                for child in elem:
+                    text = child.text or ""
+                    row[child.tag] = value_ids.get(text) or intern(text)
+                if row.keys() != chunk.keys():
+                    for tag in row:
+                        if tag not in chunk:  # Keep first-seen column order
+                            chunk[tag] = array("I", bytes(4 * count))
+                    for tag, column in chunk.items():
+                        column.append(row.get(tag, 0))
+                else:
+                    for tag, column in chunk.items():
+                        column.append(row[tag])
+                count += 1
+            root.clear()  # Drop the finished row (or stray element) from the tree
+            if count >= limit:
+                yield count, chunk
+                chunk, count, limit = {}, 0, chunk_rows
+                if progress:
+                    progress(min(1.0, f.tell() / size))
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+        if count:
+            yield count, chunk
+        if progress:
+            progress(1.0)
+
+
+class XMLLoader:
+    """Runs iter_row_chunks on a background thread and hands chunks to the Tk thread.
+
+    The Tk side calls poll() from after() and appends what it returns to the
+    store, so the table can show the first rows while the rest is parsed.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = None
+        self.path = None
+        self.error = None
+        self.progress = 0.0
+        self.started = None
+
+    def start(self, path, store):
+        self.cancel()
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self.path = path
+        self.error = None
+        self.progress = 0.0
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, args=(path, store, self._queue, self._cancel),
+                                        name="xml-load", daemon=True)
+        self._thread.start()
+
+    def _run(self, path, store, out_queue, cancel_event):
+        try:
+            for chunk in iter_row_chunks(path, store, cancel_event=cancel_event, progress=self._set_progress):
+                out_queue.put(chunk)
+        except Exception as e:
+            self.error = e
+        finally:
+            out_queue.put(None)  # Done
+
+    def _set_progress(self, fraction):
+        self.progress = fraction
+
+    def poll(self):
+        """Return ([(row count, chunk)] since the last call, finished)."""
+        chunks = []
+        finished = False
+        while True:
+            try:
+                chunk = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if chunk is None:
+                finished = True
+                break
+            chunks.append(chunk)
+        return chunks, finished
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
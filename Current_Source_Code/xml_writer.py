@@ -0,0 +1,214 @@
+import mmap
+import os
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+from array import array
+from xml.sax.saxutils import quoteattr, unescape
+
+from xml_table import ROW_TAG
+
+COPY_BLOCK = 1 << 20
+
+# Any start or end tag, plus the constructs that may contain text looking like
+# one (comments, CDATA, processing instructions, the doctype); used between rows
+_TAG_TOKENS = re.compile(
+    rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>|<!DOCTYPE(?:[^\[>]|\[.*?\])*>|</[^\s>]+\s*>"
+    rb"""|<([^\s/>!?]+)(?:\s(?:[^>"']|"[^"]*"|'[^']*')*)?/?>""",
+    re.S,
+)
+# Just what can open or close a <ROW>, plus the same constructs; used to find a row's end
+_ROW_TOKENS = re.compile(
+    rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>|</" + ROW_TAG.encode() + rb"\s*>"
+    rb"|<" + ROW_TAG.encode() + rb"""(?:\s(?:[^>"']|"[^"]*"|'[^']*')*)?/?>""",
+    re.S,
+)
+_DECLARED_ENCODING = re.compile(rb"""^\s*<\?xml[^>]*?encoding\s*=\s*["']([A-Za-z0-9._-]+)""")
+_NAMESPACE_DECLARATION = re.compile(rb"""\sxmlns(?::([^\s=]+))?\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+
+
+class RowOffsets:
+    """Byte span of every <ROW> directly under the root of an XML file.
+
+    Found with one regex pass over a memory map of the file rather than a
+    parse, which takes well under a second for files expat needs several
+    seconds for. Element depth is tracked between rows, so a <ROW> nested in
+    a row or wrapped in another element (say <META>) is skipped, just as
+    iter_row_chunks skips it; spans are in file order, matching ColumnStore
+    row indices. The root's namespace declarations are kept so rows using
+    its prefixes can be re-parsed on their own.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        stat = os.stat(path)
+        self._stamp = (stat.st_size, stat.st_mtime_ns)
+        self.size = stat.st_size
+        self.starts = array("Q")
+        self.ends = array("Q")  # Just past the row's end tag
+        self.encoding = "utf-8"
+        self.namespaces = {}  # Prefix ("" for the default) -> URI, as declared on the root
+        if not self.size:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            declared = _DECLARED_ENCODING.match(data[:256])
+            if declared:
+                self.encoding = declared.group(1).decode("ascii")
+            row_tag = ROW_TAG.encode()
+            depth = 0  # Open elements, the root included
+            position = 0
+            while True:
+                match = _TAG_TOKENS.search(data, position)
+                if match is None:
+                    break
+                position = match.end()
+                token = match.group()
+                if token[1:2] in (b"!", b"?"):
+                    continue
+                if token[1:2] == b"/":
+                    depth -= 1
+                    continue
+                if depth == 0:
+                    self._read_namespaces(token)
+                elif depth == 1 and match.group(1) == row_tag:
+                    self.starts.append(match.start())
+                    if not token.endswith(b"/>"):
+                        position = _row_end(data, position)
+                    self.ends.append(position)
+                    continue
+                if not token.endswith(b"/>"):
+                    depth += 1
+
+    def _read_namespaces(self, root_tag):
+        for prefix, double_quoted, single_quoted in _NAMESPACE_DECLARATION.findall(root_tag):
+            uri = (double_quoted or single_quoted).decode(self.encoding)
+            self.namespaces[prefix.decode(self.encoding)] = unescape(uri, {"&quot;": '"', "&apos;": "'"})
+
+    def __len__(self):
+        return len(self.ends)
+
+    def is_current(self):
+        """False if the file changed since it was scanned."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self._stamp
+
+
+def _row_end(data, position):
+    """Offset just past the end tag of the <ROW> whose start tag ends at position."""
+    depth = 1
+    for match in _ROW_TOKENS.finditer(data, position):
+        token = match.group()
+        if token[1:2] in (b"!", b"?"):
+            continue
+        if token[1:2] == b"/":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+        elif not token.endswith(b"/>"):
+            depth += 1
+    return len(data)  # Unterminated; the loader won't have accepted the file either
+
+
+def _parse_row(text, namespaces):
+    """Parse one row's source; namespaces are the root's declarations, which the fragment relies on."""
+    if not namespaces:
+        return ET.fromstring(text)
+    declarations = "".join(f" xmlns{':' if prefix else ''}{prefix}={quoteattr(uri)}"
+                           for prefix, uri in namespaces.items())
+    for prefix, uri in namespaces.items():
+        if not prefix:
+            continue  # A default namespace is written back as an ns<N> prefix
+        try:
+            ET.register_namespace(prefix, uri)  # Written back out with the source's prefixes
+        except ValueError:
+            pass  # Reserved ns<N> prefix; ElementTree picks its own
+    return ET.fromstring(f"<wrapper{declarations}>{text}</wrapper>")[0]
+
+
+def edited_row(raw, store, row, encoding, namespaces=None):
+    """The source bytes of one <ROW> with the store's values applied, marked processed.
+
+    A row using prefixes declared on the root gets those declarations written
+    onto it, since the fragment has to stand on its own.
+    """
+    el = _parse_row(raw.decode(encoding), namespaces)
+    for tag, value_str in store.row_items(row):
+        child = el.find(tag)
+        if child is None and value_str: # Create if doesn't exist and has content
+            child = ET.SubElement(el, tag)
+        if child is not None: # Update if exists (or was just created)
+            child.text = value_str
+    el.set("processed", "true")
+    return ET.tostring(el, encoding="unicode").encode(encoding, "xmlcharrefreplace")
+
+
+def _copy(src, out, start, end):
+    src.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        block = src.read(min(COPY_BLOCK, remaining))
+        if not block:
+            break
+        out.write(block)
+        remaining -= len(block)
+
+
+def _write_atomically(out_path, write, mode_from):
+    """Call write(file) on a temp file next to out_path, then rename it over out_path.
+
+    The result gets mode_from's permissions (mkstemp creates files owner-only).
+    """
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(out_path) + ".", suffix=".tmp", dir=out_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            write(out)
+        os.chmod(temp_path, os.stat(mode_from).st_mode & 0o777)
+        os.replace(temp_path, out_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_edited(offsets, out_path, store, rows):
+    """Write offsets.path to out_path with rows re-emitted from the store.
+
+    Everything else, including formatting, comments and the declaration, is
+    copied byte for byte, so the cost is a file copy plus the edited rows.
+    """
+    def write(out):
+        with open(offsets.path, "rb") as src:
+            position = 0
+            for row in sorted(rows):
+                start, end = offsets.starts[row], offsets.ends[row]
+                _copy(src, out, position, start)
+                src.seek(start)
+                out.write(edited_row(src.read(end - start), store, row, offsets.encoding, offsets.namespaces))
+                position = end
+            _copy(src, out, position, offsets.size)
+
+    _write_atomically(out_path, write, offsets.path)
+
+
+def write_patch(offsets, out_path, store, rows):
+    """Write only the edited rows, each wrapped in <CHANGE row="index">, to out_path."""
+    def write(out):
+        encoding = offsets.encoding
+        source = quoteattr(os.path.basename(offsets.path))
+        out.write(f'<?xml version="1.0" encoding="{encoding}"?>\n<PATCH source={source} rows="{len(rows)}">\n'.encode(encoding))
+        with open(offsets.path, "rb") as src:
+            for row in sorted(rows):
+                start, end = offsets.starts[row], offsets.ends[row]
+                src.seek(start)
+                out.write(f'  <CHANGE row="{row}">'.encode(encoding))
+                out.write(edited_row(src.read(end - start), store, row, encoding, offsets.namespaces))
+                out.write("</CHANGE>\n".encode(encoding))
+        out.write("</PATCH>\n".encode(encoding))
+
+    _write_atomically(out_path, write, offsets.path)